@@ -0,0 +1,166 @@
+import heapq
+import time
+from datetime import datetime, timedelta
+
+from recurrence import WEEKDAYS
+
+# 定时播报：配置中的 announcements 是规则列表，例如
+#   {"at": "07:30", "say": "nearest"}                                      每天 7:30 播报最近的考试
+#   {"every": 60, "from": "19:00", "to": "21:30", "say": "encouragement"}  晚自习期间每 60 分钟一句加油语
+#   {"at": "12:00", "days": "MO,TU,WE,TH,FR", "text": "午休时间到了"}
+# say 为 nearest（最近的考试）、selected（当前显示的考试）或 encouragement（加油语）；
+# 给出 text 时直接朗读 text。days 省略时每天都播报，every 的单位是分钟，from/to 默认为全天。
+# 全部规则的下一次播报时间放在一个最小堆里，只为最早的一个安排定时器，
+# 每次播报后重新安排这条规则的代价是 O(log n)，不需要每秒逐条检查。
+# 每次醒来都比较单调时钟和系统时钟走过的时间：相差较多说明系统休眠过或时钟被调整过，
+# 这时按现在的时间重新计算全部规则；错过太久的播报直接跳过，不会在唤醒后集中补播。
+
+SAYINGS = ("nearest", "selected", "encouragement")
+# 最长睡眠时间：休眠唤醒或调整时钟后最晚这么久就能发现；不超过 GRACE_SECONDS，
+# 唤醒后一分钟内到期的播报不会因为定时器晚醒而被跳过
+MAX_SLEEP_MS = 60 * 1000
+# 比预定时间晚了这么久以内仍然播报，再晚就跳过
+GRACE_SECONDS = 60
+# 单调时钟和系统时钟走过的时间相差超过这么多秒，视为时钟跳变
+JUMP_TOLERANCE = 2.0
+# 定时器可能提前几毫秒触发，这么近的播报视为已经到期
+EARLY_SECONDS = 0.02
+
+
+def parse_clock(text):
+    try:
+        return datetime.strptime(text, "%H:%M").time()
+    except (TypeError, ValueError):
+        raise ValueError(f"时间格式应为 时:分，例如 07:30: {text}")
+
+
+class Rule:
+    def __init__(self, item):
+        if not isinstance(item, dict) or ("at" in item) == ("every" in item):
+            raise ValueError(f"每条定时播报必须包含 at 或 every 之一: {item}")
+        self.text = item.get("text")
+        self.say = item.get("say", "nearest")
+        if self.text is None and self.say not in SAYINGS:
+            raise ValueError(f"say 只能是 {'、'.join(SAYINGS)}: {self.say}")
+        days = item.get("days")
+        if days is None:
+            self.days = None
+        else:
+            try:
+                self.days = {WEEKDAYS[day.strip().upper()] for day in days.split(",")}
+            except (AttributeError, KeyError):
+                raise ValueError(f"days 应为 MO,TU,... 形式: {days}")
+        if "at" in item:
+            self.at = parse_clock(item["at"])
+            self.every = None
+        else:
+            self.at = None
+            if not isinstance(item["every"], (int, float)) or item["every"] <= 0:
+                raise ValueError(f"every 必须是正数（分钟）: {item['every']}")
+            self.every = timedelta(minutes=item["every"])
+            self.start = parse_clock(item.get("from", "00:00"))
+            self.end = parse_clock(item.get("to", "23:59"))
+            if self.end < self.start:
+                raise ValueError(f"to 不能早于 from: {item}")
+        # 最近一次处理过的播报时间；时钟往回调时不会重复播报
+        self.last = None
+
+    def next_after(self, moment):
+        # moment 之后（不含）的第一次播报时间，一周之内总能找到
+        day = moment.date()
+        for i in range(8):
+            current = day + timedelta(days=i)
+            if self.days is not None and current.weekday() not in self.days:
+                continue
+            if self.at is not None:
+                candidate = datetime.combine(current, self.at)
+                if candidate > moment:
+                    return candidate
+                continue
+            first = datetime.combine(current, self.start)
+            if moment < first:
+                return first
+            candidate = first + ((moment - first) // self.every + 1) * self.every
+            if candidate <= datetime.combine(current, self.end):
+                return candidate
+        raise ValueError("找不到下一次播报时间")
+
+
+class AnnouncementScheduler:
+    """widget 只需要提供 after/after_cancel；announce(rule) 在界面线程中朗读。
+
+    clock 和 monotonic 可以替换，便于测量和模拟时钟跳变。
+    """
+
+    def __init__(self, widget, rules, announce, max_sleep=MAX_SLEEP_MS, clock=time.time, monotonic=time.monotonic):
+        # 先解析全部规则，有错误时在安排任何定时器之前抛出 ValueError
+        self.rules = [Rule(item) for item in rules]
+        self.widget = widget
+        self.announce = announce
+        self.max_sleep = max_sleep
+        self.clock = clock
+        self.monotonic = monotonic
+        self.heap = []  # (系统时间戳, 规则下标)
+        self.pending = None
+        self.armed = None  # 安排定时器时的 (系统时间, 单调时间)
+        self.wakeups = 0
+        self.announced = 0
+        self.skipped = 0
+        self.jumps = 0
+
+    def start(self):
+        self.stop()
+        self.rebuild()
+        self.arm()
+
+    def stop(self):
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+        self.pending = None
+
+    def due_after(self, i, now):
+        rule = self.rules[i]
+        moment = now if rule.last is None or rule.last < now else rule.last
+        return rule.next_after(moment).timestamp()
+
+    def rebuild(self):
+        now = datetime.fromtimestamp(self.clock())
+        self.heap = [(self.due_after(i, now), i) for i in range(len(self.rules))]
+        heapq.heapify(self.heap)
+
+    def arm(self):
+        if not self.heap:
+            return
+        wall = self.clock()
+        delay = min(max(0.0, self.heap[0][0] - wall), self.max_sleep / 1000)
+        self.armed = (wall, self.monotonic())
+        self.pending = self.widget.after(int(delay * 1000) + 1, self.fire)
+
+    def fire(self):
+        self.pending = None
+        self.wakeups += 1
+        wall = self.clock()
+        wall_start, mono_start = self.armed
+        jumped = abs((wall - wall_start) - (self.monotonic() - mono_start)) > JUMP_TOLERANCE
+        try:
+            now = datetime.fromtimestamp(wall)
+            while self.heap and self.heap[0][0] <= wall + EARLY_SECONDS:
+                due, i = self.heap[0]
+                rule = self.rules[i]
+                rule.last = datetime.fromtimestamp(due)
+                heapq.heapreplace(self.heap, (self.due_after(i, now), i))
+                if wall - due <= GRACE_SECONDS:
+                    self.announced += 1
+                    self.announce(rule)
+                else:
+                    self.skipped += 1
+            if jumped:
+                # 时钟往前跳时上面已经跳过了错过的播报，往回调时按现在的时间重新安排
+                self.jumps += 1
+                self.rebuild()
+        finally:
+            self.arm()
+
+    def upcoming(self, count):
+        # 接下来的若干次播报 [(时间, 规则)]，用于显示和调试
+        return [(datetime.fromtimestamp(due), self.rules[i]) for due, i in heapq.nsmallest(count, self.heap)]
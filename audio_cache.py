@@ -0,0 +1,168 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict, deque
+
+from speech import SpeechBackend
+
+AUDIO_SUFFIX = ".wav"
+
+
+def cache_key(text, voice="", rate=0):
+    return hashlib.sha256(f"{voice}\0{rate}\0{text}".encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """按 (文字, 声音, 语速) 的哈希保存合成好的音频，超过 max_bytes 时按 LRU 淘汰。"""
+
+    def __init__(self, directory, max_bytes=50 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> 文件大小，越靠后越新
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        os.makedirs(directory, exist_ok=True)
+        self.scan()
+
+    def scan(self):
+        # 按修改时间恢复上次运行时的使用顺序（命中时会更新修改时间）
+        found = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(AUDIO_SUFFIX) and entry.is_file():
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name[:-len(AUDIO_SUFFIX)], stat.st_size))
+        for _, key, size in sorted(found):
+            self.entries[key] = size
+            self.total_bytes += size
+        self.evict()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key + AUDIO_SUFFIX)
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            with self.lock:
+                self.forget(key)
+            return None
+        return path
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def temp_path(self, key):
+        return os.path.join(self.directory, f"{key}.{threading.get_ident()}.tmp")
+
+    def commit(self, key, temp_path):
+        path = self.path_for(key)
+        os.replace(temp_path, path)
+        size = os.path.getsize(path)
+        with self.lock:
+            self.forget(key)
+            self.entries[key] = size
+            self.total_bytes += size
+            self.evict()
+        return path
+
+    def forget(self, key):
+        size = self.entries.pop(key, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    def evict(self):
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            key, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            self.stats["evictions"] += 1
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                pass  # 文件可能正在播放，下次扫描时再处理
+
+    def report(self):
+        with self.lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            hit_rate = self.stats["hits"] / lookups if lookups else 0.0
+            return dict(self.stats, entries=len(self.entries), bytes=self.total_bytes, hit_rate=hit_rate)
+
+
+class CachedBackend(SpeechBackend):
+    """先查音频缓存，未命中时用后端合成到文件再播放；后台可以预先合成常用句子。"""
+
+    def __init__(self, backend, cache, voice="", rate=0):
+        self.backend = backend
+        self.cache = cache
+        self.voice = voice
+        self.rate = rate
+        self.lock = threading.Lock()  # 后端同一时间只能处理一个请求
+        self.warm_queue = deque()
+        self.warm_cond = threading.Condition()
+        self.warm_thread = None
+
+    def render(self, text, path):
+        with self.lock:
+            self.backend.render(text, path)
+
+    def play(self, path):
+        with self.lock:
+            self.backend.play(path)
+
+    def render_cached(self, text, key):
+        temp_path = self.cache.temp_path(key)
+        self.render(text, temp_path)
+        return self.cache.commit(key, temp_path)
+
+    def speak(self, text):
+        key = cache_key(text, self.voice, self.rate)
+        path = self.cache.get(key)
+        if path is None:
+            try:
+                path = self.render_cached(text, key)
+            except Exception as e:
+                print(f"语音合成到缓存失败: {str(e)}")
+                with self.lock:
+                    self.backend.speak(text)
+                return
+        self.play(path)
+
+    def warm(self, texts):
+        # 替换掉尚未处理的预热任务，只保留最新的一批
+        with self.warm_cond:
+            self.warm_queue.clear()
+            self.warm_queue.extend(dict.fromkeys(texts))
+            if self.warm_thread is None:
+                self.warm_thread = threading.Thread(target=self.run_warm, name="speech-warm", daemon=True)
+                self.warm_thread.start()
+            self.warm_cond.notify()
+
+    def run_warm(self):
+        while True:
+            with self.warm_cond:
+                while not self.warm_queue:
+                    self.warm_cond.wait()
+                text = self.warm_queue.popleft()
+            key = cache_key(text, self.voice, self.rate)
+            if key in self.cache:
+                continue
+            try:
+                self.render_cached(text, key)
+            except Exception as e:
+                print(f"语音预热失败: {str(e)}")
+
+    def cancel(self):
+        self.backend.cancel()
+
+    def close(self):
+        with self.warm_cond:
+            self.warm_queue.clear()
+        self.backend.close()
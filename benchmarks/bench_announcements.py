@@ -0,0 +1,93 @@
+# 定时播报：每秒逐条检查全部规则（在 update_label 里轮询的做法）与最小堆只在最早的播报时醒来的对比
+# 用法: python benchmarks/bench_announcements.py
+# 用模拟的时钟跑完一整天，统计醒来次数、计算下一次播报时间的次数和耗时。
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from announcements import AnnouncementScheduler, Rule
+
+RULE_COUNTS = [10, 100, 1_000]
+DAY = 24 * 3600
+
+
+class FakeClock:
+    def __init__(self, start):
+        self.wall = start
+        self.mono = 0.0
+
+    def advance(self, seconds):
+        self.wall += seconds
+        self.mono += seconds
+
+
+class FakeWidget:
+    def __init__(self):
+        self.callback = None
+        self.delay = None
+
+    def after(self, ms, callback):
+        self.callback = callback
+        self.delay = ms / 1000
+        return 1
+
+    def after_cancel(self, event):
+        self.callback = None
+
+
+def make_rules(n):
+    rules = []
+    for i in range(n):
+        if i % 2:
+            rules.append({"at": f"{i % 24:02d}:{i * 7 % 60:02d}", "say": "nearest"})
+        else:
+            rules.append({"every": 30 + i % 90, "from": f"{i % 12:02d}:00", "to": "22:00", "say": "encouragement"})
+    return rules
+
+
+def run_heap(rules, start):
+    clock = FakeClock(start)
+    widget = FakeWidget()
+    fired = []
+    scheduler = AnnouncementScheduler(widget, rules, fired.append, clock=lambda: clock.wall, monotonic=lambda: clock.mono)
+    t0 = time.perf_counter()
+    scheduler.start()
+    end = start + DAY
+    while clock.wall + widget.delay <= end:
+        clock.advance(widget.delay)
+        widget.callback()
+    return time.perf_counter() - t0, scheduler.wakeups, len(fired)
+
+
+def run_polling(rules, start, seconds):
+    # 对照：每秒检查每条规则的下一次播报时间是否已到（只跑 seconds 秒再按比例换算成一天）
+    parsed = [Rule(item) for item in rules]
+    now = datetime.fromtimestamp(start)
+    due = [rule.next_after(now) for rule in parsed]
+    fired = 0
+    t0 = time.perf_counter()
+    for second in range(seconds):
+        now += timedelta(seconds=1)
+        for i, rule in enumerate(parsed):
+            if due[i] <= now:
+                fired += 1
+                due[i] = rule.next_after(now)
+    return (time.perf_counter() - t0) * DAY / seconds, DAY, fired
+
+
+def main():
+    start = datetime(2026, 10, 19).timestamp()
+    print(f"{'规则数':>8} {'方式':<6} {'醒来次数':>10} {'一天耗时':>12}")
+    for n in RULE_COUNTS:
+        rules = make_rules(n)
+        elapsed, wakeups, fired = run_heap(rules, start)
+        print(f"{n:>8} {'最小堆':<6} {wakeups:>10} {elapsed * 1000:>10.1f} ms  （播报 {fired} 次）")
+        elapsed, wakeups, _ = run_polling(rules, start, 3600 if n <= 100 else 600)
+        print(f"{n:>8} {'轮询':<6} {wakeups:>10} {elapsed * 1000:>10.1f} ms  （按部分时段换算）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# 音频缓存：首次合成与命中缓存后播放的延迟对比（使用 FakeBackend，不发声）
+# 用法: python benchmarks/bench_audio_cache.py [每句合成秒数]
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_cache import AudioCache, CachedBackend, cache_key
+from speech import FakeBackend
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start) * 1e3
+
+
+def main():
+    render_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 0.3
+    encouragements = [f"加油{i}" for i in range(20)]
+    labels = [f"距离考试{i}还有 {i} 天" for i in range(30)]
+    with tempfile.TemporaryDirectory() as directory:
+        backend = CachedBackend(FakeBackend(render_seconds=render_seconds), AudioCache(directory, max_bytes=2 * 1024 * 1024))
+        miss = timed(backend.speak, "没有预热过的句子")
+        start = time.perf_counter()
+        backend.warm(labels + encouragements)
+        keys = [cache_key(text) for text in labels + encouragements]
+        while not all(key in backend.cache for key in keys):
+            time.sleep(0.01)
+        warm_total = time.perf_counter() - start
+        hits = [timed(backend.speak, text) for text in encouragements]
+        print(f"未命中（现场合成）: {miss:.1f} ms")
+        print(f"预热 {len(labels) + len(encouragements)} 句: {warm_total:.2f} s（后台进行）")
+        print(f"命中缓存: 平均 {sum(hits) / len(hits):.2f} ms, 最大 {max(hits):.2f} ms")
+        print(f"统计: {backend.cache.report()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# countdown_core 的基准测试：配置加载、标签计算、索引建立、设置项增删
+# 用法: python benchmarks/bench_core.py [--json 结果.json] [--baseline 基准.json] [--tolerance 0.5]
+# 指定 --baseline 时，任何一项比基准慢超过 tolerance（默认 50%）都会以非零状态退出，便于在 CI 中使用。
+import argparse
+import json
+import os
+import sys
+import tempfile
+import timeit
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import countdown_core
+from countdown_index import CountdownIndex
+from entry_store import EntryStore
+
+SIZES = [10, 1_000, 100_000]
+
+
+def make_info(n):
+    start = date(2025, 1, 1)
+    info = countdown_core.default_config()
+    info["countdowns"] = [{"name": f"考试{i}", "date": (start + timedelta(days=i % 3650)).strftime("%Y/%m/%d")} for i in range(n)]
+    return info
+
+
+def best(func, number, repeat=5):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def bench_size(n, directory):
+    info = make_info(n)
+    path = os.path.join(directory, f"config-{n}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(info, f, ensure_ascii=False, indent=4)
+    loops = max(1, 10_000 // n)
+    index = CountdownIndex(info["countdowns"])
+    selected = info["countdowns"][-1]["name"]
+    now = datetime.now()
+    countdowns = EntryStore(info["countdowns"])
+    encouragements = EntryStore(info["encouragements"])
+    countdown_core.track_countdowns(countdowns, index)
+
+    def settings_ops():
+        key = countdown_core.add_countdown(countdowns, "新考试", "2026/6/7")
+        countdown_core.update_countdown(countdowns, key, "改名考试", "2026/6/8")
+        countdown_core.delete_countdown(countdowns, key)
+        key = countdown_core.add_encouragement(encouragements, "新加油")
+        countdown_core.delete_encouragement(encouragements, key)
+
+    return {
+        "config_load": best(lambda: countdown_core.load_config(path), loops, repeat=3),
+        "label_text": best(lambda: countdown_core.label_text(index, selected, now), 100_000),
+        "index_build": best(lambda: CountdownIndex(info["countdowns"]), loops, repeat=3),
+        "settings_ops": best(settings_ops, loops, repeat=3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--json", help="把结果（秒）写入 JSON 文件")
+    parser.add_argument("--baseline", help="与之前保存的 JSON 结果比较")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for n in SIZES:
+            results[str(n)] = bench_size(n, directory)
+
+    names = list(next(iter(results.values())))
+    print(f"{'n':>8} " + " ".join(f"{name + '(us)':>16}" for name in names))
+    for n, row in results.items():
+        print(f"{n:>8} " + " ".join(f"{row[name] * 1e6:>16.2f}" for name in names))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = [
+            f"n={n} {name}: {baseline[n][name] * 1e6:.2f}us -> {value * 1e6:.2f}us"
+            for n, row in results.items() if n in baseline
+            for name, value in row.items()
+            if name in baseline[n] and value > baseline[n][name] * (1 + args.tolerance)
+        ]
+        for line in regressions:
+            print(f"性能回退: {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# 大型加油语库：把语句放在配置 JSON 中（每次启动整体解析、常驻内存）与外部文件加行偏移索引的对比
+# 用法: python benchmarks/bench_corpus.py
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from phrase_corpus import INDEX_SUFFIX, PhraseCorpus, ShuffleBag
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def make_phrases(n):
+    return [f"第{i}句加油语：坚持就是胜利，今天也要认真复习！" for i in range(n)]
+
+
+def measure(func):
+    # 计时和内存分开测量，tracemalloc 会让分配密集的代码变慢
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = func()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, held
+
+
+def main():
+    print(f"{'n':>9} {'JSON 解析(ms)':>14} {'常驻(KB)':>10} {'建立索引(ms)':>13} {'打开(ms)':>9} {'常驻(KB)':>9} {'choice(us)':>11} {'抽取(us)':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for n in SIZES:
+            phrases = make_phrases(n)
+            json_path = os.path.join(directory, f"config{n}.json")
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump({"encouragements": phrases}, f, ensure_ascii=False)
+            text_path = os.path.join(directory, f"phrases{n}.txt")
+            with open(text_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(phrases))
+            del phrases
+
+            def load_json():
+                with open(json_path, "r", encoding="utf-8") as f:
+                    return json.load(f)["encouragements"]
+            inline, t_json, m_json = measure(load_json)
+
+            start = time.perf_counter()
+            PhraseCorpus(text_path).close()
+            t_build = time.perf_counter() - start
+            corpus, t_open, m_open = measure(lambda: PhraseCorpus(text_path))
+            bag = ShuffleBag(len(corpus))
+            assert corpus[n - 1] == inline[n - 1]
+
+            choice_us = min(timeit.repeat(lambda: random.choice(inline), number=10_000, repeat=3)) / 10_000 * 1e6
+            pick_us = min(timeit.repeat(lambda: corpus[bag.next()], number=10_000, repeat=3)) / 10_000 * 1e6
+            print(f"{n:>9} {t_json * 1e3:>14.1f} {m_json / 1024:>10.0f} {t_build * 1e3:>13.1f} {t_open * 1e3:>9.2f} {m_open / 1024:>9.1f} {choice_us:>11.2f} {pick_us:>9.2f}")
+            corpus.close()
+            os.remove(text_path + INDEX_SUFFIX)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# 看板模式每次刷新的计算开销：逐行 strptime 并每次重新排序，与 CountdownIndex.upcoming_days 的对比
+# 用法: python benchmarks/bench_dashboard.py
+# 只测量不依赖 Tk 的计算部分；标签只在文字变化时才修改，见 dashboard.py。
+import os
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from countdown_index import CountdownIndex
+
+SIZES = [100, 1_000, 100_000]
+VISIBLE = [10, 100, 500]
+
+
+def make_countdowns(n):
+    start = date(2025, 1, 1)
+    return [{"name": f"考试{i}", "date": (start + timedelta(days=(i * 7919) % 3650)).strftime("%Y/%m/%d")} for i in range(n)]
+
+
+def naive_tick(countdowns, now, count):
+    rows = []
+    for exam in countdowns:
+        target = datetime.strptime(exam["date"], "%Y/%m/%d")
+        if target.date() >= now.date():
+            rows.append((target, exam["name"]))
+    rows.sort()
+    return [(name, max((target - now).days, 0)) for target, name in rows[:count]]
+
+
+def per_call(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main():
+    now = datetime.now()
+    print(f"{'n':>8} {'可见行':>6} {'逐行解析排序(us/tick)':>22} {'upcoming_days(us/tick)':>24}")
+    for n in SIZES:
+        countdowns = make_countdowns(n)
+        index = CountdownIndex(countdowns)
+        for count in VISIBLE:
+            assert [days for _, days in naive_tick(countdowns, now, count)] == [days for _, days in index.upcoming_days(now, count)]
+            naive = per_call(lambda: naive_tick(countdowns, now, count), max(1, 10_000 // n)) * 1e6
+            fast = per_call(lambda: index.upcoming_days(now, count), 1_000) * 1e6
+            print(f"{n:>8} {count:>6} {naive:>22.1f} {fast:>24.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# 日期解析与带时区的剩余天数：手写解析器与 strptime 的对比，
+# 以及每次刷新直接用整数时间戳计算与每次都构造带时区的 datetime 再相减的对比
+# 用法: python benchmarks/bench_datetimes.py [条目数]
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from countdown_index import CountdownIndex
+from exam_time import parse_when, zone
+
+ZONES = ["Asia/Shanghai", "America/New_York", "Europe/London", "Australia/Sydney"]
+FORMATS = [
+    ("2025/3/1", "%Y/%m/%d", lambda d: f"{d.year}/{d.month}/{d.day}"),
+    ("2025-03-01 09:00", "%Y-%m-%d %H:%M", lambda d: d.strftime("%Y-%m-%d 09:00")),
+    ("ISO-8601", "%Y-%m-%dT%H:%M:%S%z", lambda d: d.strftime("%Y-%m-%dT09:00:00+08:00")),
+]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def make_exams(n):
+    start = date(2027, 1, 1)
+    return [{"name": f"考试{i}", "date": (start + timedelta(days=i % 500)).strftime("%Y-%m-%d"),
+             "time": f"{8 + i % 10:02d}:30", "tz": ZONES[i % len(ZONES)]} for i in range(n)]
+
+
+def aware_days(exams, now):
+    # 对照：每次刷新都用时区对象构造考试时刻，再和当前时间相减
+    result = []
+    for exam in exams:
+        d = datetime.strptime(f"{exam['date']} {exam['time']}", "%Y-%m-%d %H:%M").replace(tzinfo=zone(exam["tz"]))
+        result.append((exam["name"], max((d - now).days, 0)))
+    return result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    days = [date(2025, 1, 1) + timedelta(days=i % 3000) for i in range(n)]
+    print(f"解析 {n} 个日期")
+    for label, fmt, render in FORMATS:
+        texts = [render(d) for d in days]
+        strptime, _ = timed(lambda: [datetime.strptime(text, fmt) for text in texts])
+        fast, _ = timed(lambda: [parse_when(text) for text in texts])
+        print(f"  {label:<18} strptime {strptime * 1000:8.1f} ms   手写解析器 {fast * 1000:8.1f} ms")
+
+    exams = make_exams(n)
+    build, index = timed(lambda: CountdownIndex(exams))
+    print(f"{n} 个带时间和时区的考试，建立索引（含换算时间戳）{build * 1000:.1f} ms")
+    now = datetime(2026, 10, 18, 8, 0)
+    tick, rows = timed(lambda: index.upcoming_days(now))
+    aware_now = now.astimezone()
+    slow, expected = timed(lambda: aware_days(exams, aware_now))
+    assert sorted(rows) == sorted(expected)
+    print(f"  一次刷新全部剩余天数：时间戳 {tick * 1000:8.1f} ms   每次构造带时区的 datetime {slow * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
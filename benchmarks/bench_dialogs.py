@@ -0,0 +1,99 @@
+# 提示框的开销：每次新建 Toplevel（原来的 show_message）与只创建一次、之后显示/隐藏的对比
+# 用法: python benchmarks/bench_dialogs.py [次数]
+# 需要图形界面；装有 customtkinter 时同时测量 CTkToplevel（dialogs.MessageToast）。
+import os
+import sys
+import time
+import tracemalloc
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def settle(root):
+    root.update()
+    root.update_idletasks()
+
+
+def pending_callbacks(root):
+    return len(root.tk.splitlist(root.tk.call("after", "info")))
+
+
+def measure(root, name, show, count):
+    settle(root)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    callbacks = pending_callbacks(root)
+    times = []
+    for i in range(count):
+        start = time.perf_counter()
+        show(f"第 {i} 条提示")
+        settle(root)
+        times.append(time.perf_counter() - start)
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    times.sort()
+    print(f"{name:<28} p50 {times[len(times) // 2] * 1e3:>7.2f} ms  p95 {times[int(len(times) * 0.95)] * 1e3:>7.2f} ms  "
+          f"新增内存 {held / 1024:>8.0f} KB  窗口 {len(root.winfo_children()):>4}  新增定时回调 {pending_callbacks(root) - callbacks:>4}")
+
+
+def tk_factory(root):
+    # 与原来的 show_message 相同：每条提示新建一个窗口，点"确定"才销毁（这里模拟没有点）
+    def show(message):
+        box = tk.Toplevel(root)
+        box.overrideredirect(True)
+        tk.Label(box, text=message).pack(pady=20)
+        tk.Button(box, text="确定", command=box.destroy).pack(pady=10)
+    return show
+
+
+def tk_pooled(root):
+    box = tk.Toplevel(root)
+    box.withdraw()
+    box.overrideredirect(True)
+    label = tk.Label(box, text="")
+    label.pack(pady=20)
+    tk.Button(box, text="确定", command=box.withdraw).pack(pady=10)
+
+    def show(message):
+        label.configure(text=message)
+        box.deiconify()
+        box.lift()
+    return show
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    try:
+        import customtkinter as ctk
+    except ImportError:
+        ctk = None
+    try:
+        root = ctk.CTk() if ctk is not None else tk.Tk()
+    except tk.TclError as e:
+        print(f"无法创建窗口（需要图形界面）: {e}")
+        return
+    measure(root, "tk.Toplevel 每次新建", tk_factory(root), count)
+    for child in root.winfo_children():
+        child.destroy()
+    measure(root, "tk.Toplevel 复用", tk_pooled(root), count)
+    if ctk is not None:
+        from dialogs import MessageToast
+
+        def ctk_factory(message):
+            box = ctk.CTkToplevel(root)
+            box.overrideredirect(True)
+            ctk.CTkLabel(box, text=message).pack(pady=20)
+            ctk.CTkButton(box, text="确定", command=box.destroy).pack(pady=10)
+        for child in root.winfo_children():
+            child.destroy()
+        measure(root, "CTkToplevel 每次新建", ctk_factory, count)
+        for child in root.winfo_children():
+            child.destroy()
+        toast = MessageToast(root)
+        measure(root, "MessageToast 复用", lambda message: toast.open("提示", message), count)
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# 密码校验的约数和：原来的试除法与分解质因数的对比，覆盖不同位数的密码
+# 用法: python benchmarks/bench_divisor_sum.py
+# 试除法只测到 12 位，更大的数要几秒到几分钟，只给出按 sqrt(n) 推算的耗时。
+# 两个 15 位素数之积这样的 30 位密码，Pollard rho 也要十几秒，但那是在后台线程里。
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from divisor_sum import compute, is_prime
+
+DIGITS = [4, 8, 12, 15, 18, 24]
+TRIAL_LIMIT = 12
+SAMPLES = 20
+
+
+def trial_division(n):
+    total = 0
+    for i in range(1, int(math.isqrt(n)) + 1):
+        if n % i == 0:
+            if i == n // i:
+                total += i
+            else:
+                total += i + n // i
+    return total
+
+
+def semiprime(digits, rng):
+    # 两个位数相近的大素数之积，是 Pollard rho 最慢的情形
+    while True:
+        p = rng.randrange(10 ** (digits // 2 - 1), 10 ** (digits // 2))
+        q = rng.randrange(10 ** (digits - digits // 2 - 1), 10 ** (digits - digits // 2))
+        if is_prime(p) and is_prime(q) and len(str(p * q)) == digits:
+            return p * q
+
+
+def worst(func, values):
+    times = []
+    for n in values:
+        start = time.perf_counter()
+        func(n)
+        times.append(time.perf_counter() - start)
+    return max(times)
+
+
+def main():
+    rng = random.Random(1)
+    print(f"{'位数':>6} {'试除法最慢(ms)':>16} {'分解随机数最慢(ms)':>20} {'分解半素数最慢(ms)':>20}")
+    trial_rate = None
+    for digits in DIGITS:
+        randoms = [rng.randrange(10 ** (digits - 1), 10 ** digits) for _ in range(SAMPLES)]
+        semiprimes = [semiprime(digits, rng) for _ in range(5)]
+        for n in randoms[:3]:
+            assert digits > TRIAL_LIMIT or compute(n) == trial_division(n)
+        if digits <= TRIAL_LIMIT:
+            trial = worst(trial_division, randoms[:3])
+            trial_rate = trial / math.isqrt(10 ** digits)
+            trial_text = f"{trial * 1e3:.2f}"
+        else:
+            trial_text = f"~{trial_rate * math.isqrt(10 ** digits) * 1e3:.0f}"
+        print(f"{digits:>6} {trial_text:>16} {worst(compute, randoms) * 1e3:>20.3f} {worst(compute, semiprimes) * 1e3:>20.3f}")
+
+
+if __name__ == "__main__":
+    main()
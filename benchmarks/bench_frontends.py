@@ -0,0 +1,91 @@
+# 各个前端的启动耗时和峰值内存：空解释器、终端版、两个图形界面
+# 用法: python benchmarks/bench_frontends.py [次数]
+# 图形界面在 mainloop 开始后立即退出；没有图形界面或没有安装 customtkinter 时跳过。
+# 峰值内存取子进程自己的 VmHWM（/proc/self/status），不是 Linux 时只报告耗时。
+# （os.wait4 的 ru_maxrss 会算上 fork 之后、exec 之前复制的父进程内存，不能用。）
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# 在子进程里运行脚本，退出时把峰值内存写到标准错误；
+# 第一个参数为 gui 时，第一次进入 mainloop 处理完待绘制的事件就返回
+RUNNER = """
+import atexit, runpy, sys
+def report():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    sys.stderr.write("PEAK_RSS_KB " + line.split()[1] + "\\n")
+    except OSError:
+        pass
+atexit.register(report)
+if sys.argv[1] == "gui":
+    import tkinter
+    def mainloop(self, n=0):
+        self.update()
+    tkinter.Misc.mainloop = mainloop
+sys.argv = sys.argv[2:]
+if sys.argv:
+    runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+PEAK = re.compile(r"^PEAK_RSS_KB (\d+)$", re.M)
+ERROR = re.compile(r"^\w+(\.\w+)*(Error|Exception): .*$", re.M)
+
+
+def run(args, env):
+    # 返回 (耗时秒, 峰值内存 KB 或 None, 返回码, 错误输出)
+    start = time.perf_counter()
+    proc = subprocess.run(args, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    elapsed = time.perf_counter() - start
+    stderr = proc.stderr.decode("utf-8", "replace")
+    match = PEAK.search(stderr)
+    return elapsed, int(match.group(1)) if match else None, proc.returncode, stderr
+
+
+def measure(label, args, env, repeat):
+    results = []
+    for _ in range(repeat):
+        elapsed, rss, code, stderr = run(args, env)
+        if code != 0:
+            # 取最先出现的异常，界面脚本在异常处理里还可能再出错
+            match = ERROR.search(stderr)
+            reason = match.group(0) if match else f"返回码 {code}"
+            print(f"{label:<24} 跳过: {reason}")
+            return
+        results.append((elapsed, rss))
+    best = min(elapsed for elapsed, _ in results)
+    rss = max((r for _, r in results if r is not None), default=None)
+    memory = f"{rss / 1024:8.1f} MB" if rss is not None else "       ?"
+    print(f"{label:<24} 启动 {best * 1000:8.1f} ms  峰值内存 {memory}")
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    from countdown_core import default_config
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.json")
+        info = default_config()
+        info["countdowns"] = [{"name": f"考试{i}", "date": f"{2030 + i // 365}/{i % 12 + 1}/{i % 28 + 1}"}
+                              for i in range(200)]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(info, f, ensure_ascii=False)
+        env = dict(os.environ, DAOJISHI_CONFIG=path, DAOJISHI_MULTI_INSTANCE="1")
+        python = sys.executable
+        print(f"{len(info['countdowns'])} 个考试，每项运行 {repeat} 次，耗时取最小值")
+        measure("空解释器", [python, "-c", RUNNER, "cli"], env, repeat)
+        measure("daojishi-cli.py", [python, "-c", RUNNER, "cli", "daojishi-cli.py"], env, repeat)
+        measure("daojishi-cli.py --all", [python, "-c", RUNNER, "cli", "daojishi-cli.py", "--all"], env, repeat)
+        for script in ("daojishi-new.py", "try.py"):
+            measure(script, [python, "-c", RUNNER, "gui", script], env, repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# 每次刷新的开销：原来的线性查找 + strptime 与 CountdownIndex 的对比
+# 用法: python benchmarks/bench_index.py
+import os
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from countdown_index import CountdownIndex, days_left
+
+SIZES = [10, 1_000, 100_000]
+
+
+def make_countdowns(n):
+    start = date(2025, 1, 1)
+    return [{"name": f"考试{i}", "date": (start + timedelta(days=i % 3650)).strftime("%Y/%m/%d")} for i in range(n)]
+
+
+def scan_tick(countdowns, selected, now):
+    target_exam = next((exam for exam in countdowns if exam["name"] == selected), None)
+    target_date = datetime.strptime(target_exam["date"], "%Y/%m/%d")
+    return max((target_date - now).days, 0)
+
+
+def index_tick(index, selected, now):
+    return days_left(index.get(selected), now)
+
+
+def per_call(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main():
+    now = datetime.now()
+    print(f"{'n':>8} {'build(ms)':>10} {'scan(us/tick)':>14} {'index(us/tick)':>15}")
+    for n in SIZES:
+        countdowns = make_countdowns(n)
+        selected = countdowns[-1]["name"]  # 最坏情况：选中最后一个
+        build = per_call(lambda: CountdownIndex(countdowns), 1) * 1e3
+        index = CountdownIndex(countdowns)
+        assert scan_tick(countdowns, selected, now) == index_tick(index, selected, now)
+        scan = per_call(lambda: scan_tick(countdowns, selected, now), max(1, 100_000 // n)) * 1e6
+        fast = per_call(lambda: index_tick(index, selected, now), 100_000) * 1e6
+        print(f"{n:>8} {build:>10.2f} {scan:>14.2f} {fast:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# 保存设置时界面线程的耗时：原来的同步缩进写入与 ConfigStore 的对比
+# 用法: python benchmarks/bench_persistence.py
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from persistence import ConfigStore, atomic_write_json
+
+SIZES = [10, 1_000, 100_000]
+EDITS = 50
+
+
+def make_info(n):
+    return {
+        "name": "倒计时",
+        "countdowns": [{"name": f"考试{i}", "date": "2025/3/1"} for i in range(n)],
+        "encouragements": [f"加油{i}" for i in range(100)],
+        "start_countdown_index": 0,
+        "password": "1000",
+    }
+
+
+def old_save(path, info):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(info, f, ensure_ascii=False, indent=4)
+
+
+def main():
+    print(f"{'n':>8} {'同步缩进写入(ms)':>16} {'原子写入(ms)':>12} {f'{EDITS}次编辑界面耗时(ms)':>22} {'实际写入次数':>12}")
+    for n in SIZES:
+        info = make_info(n)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "config.json")
+            start = time.perf_counter()
+            old_save(path, info)
+            old = (time.perf_counter() - start) * 1e3
+            start = time.perf_counter()
+            atomic_write_json(path, info)
+            atomic = (time.perf_counter() - start) * 1e3
+
+            store = ConfigStore(path, delay=0.2, journal=n > 1000)
+            start = time.perf_counter()
+            for i in range(EDITS):
+                info["encouragements"].append(f"新的加油{i}")
+                store.record(info, "add_encouragement", text=f"新的加油{i}")
+            ui = (time.perf_counter() - start) * 1e3
+            store.flush()
+            store.close()
+            print(f"{n:>8} {old:>16.2f} {atomic:>12.2f} {ui:>22.2f} {store.writes:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# 重复考试：把规则展开成整年的具体日期再排序，与 RecurringSchedule 最小堆按需生成的对比；
+# 以及流式读取一个大 .ics 文件的耗时
+# 用法: python benchmarks/bench_recurrence.py
+import io
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ics_import import import_events, read_events
+from recurrence import RecurringSchedule, occurrences, parse_rule
+from countdown_index import parse_date
+
+SERIES = [100, 1_000, 10_000]
+RULES = ["FREQ=WEEKLY;BYDAY=MO,TH", "FREQ=DAILY;INTERVAL=3", "FREQ=MONTHLY;BYDAY=-1FR", "FREQ=YEARLY"]
+HORIZON_DAYS = 365
+
+
+def make_series(n):
+    start = date(2020, 1, 1)
+    return [{"name": f"考试{i}", "start": (start + timedelta(days=i % 1000)).strftime("%Y/%m/%d"), "rule": RULES[i % len(RULES)]}
+            for i in range(n)]
+
+
+def expand_all(series, today):
+    # 对照：每个系列展开到一年以后，合并排序
+    end = today + timedelta(days=HORIZON_DAYS)
+    dates = []
+    for item in series:
+        for d in occurrences(parse_date(item["start"]), parse_rule(item["rule"]), after=today):
+            if d > end:
+                break
+            dates.append((d, item["name"]))
+    dates.sort()
+    return dates
+
+
+def make_ics(n):
+    out = ["BEGIN:VCALENDAR"]
+    for i in range(n):
+        d = date(2027, 1, 1) + timedelta(days=i % 3000)
+        out += ["BEGIN:VEVENT", f"SUMMARY:考试{i}", f"DTSTART;VALUE=DATE:{d:%Y%m%d}", "END:VEVENT"]
+    out.append("END:VCALENDAR")
+    return "\r\n".join(out) + "\r\n"
+
+
+def measure(func):
+    # 计时和内存分开测量，tracemalloc 会让分配密集的代码慢好几倍
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    today = date(2026, 10, 18)
+    print(f"{'系列数':>8} {'全部展开(ms)':>14} {'峰值(KB)':>10} {'最小堆(ms)':>12} {'峰值(KB)':>10} {'一年 advance(ms)':>18}")
+    for n in SERIES:
+        series = make_series(n)
+        expanded, t_expand, m_expand = measure(lambda: expand_all(series, today))
+        schedule, t_heap, m_heap = measure(lambda: RecurringSchedule(series, today))
+        assert min(day for _, day in schedule.entries()) == expanded[0][0]
+        start = time.perf_counter()
+        for day in range(1, HORIZON_DAYS + 1):
+            schedule.advance(today + timedelta(days=day))
+        t_advance = time.perf_counter() - start
+        print(f"{n:>8} {t_expand * 1e3:>14.1f} {m_expand / 1024:>10.0f} {t_heap * 1e3:>12.1f} {m_heap / 1024:>10.0f} {t_advance * 1e3:>18.1f}")
+
+    for n in [10_000, 100_000]:
+        text = make_ics(n)
+        counts, elapsed, peak = measure(lambda: import_events({"countdowns": [], "encouragements": []}, read_events(io.StringIO(text)), today))
+        print(f".ics {n} 个事件: {elapsed * 1e3:.1f} ms，峰值 {peak / 1024:.0f} KB（不含文件本身），导入 {counts['added']} 个")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# 其他程序获取倒计时的开销：每次重新读取并解析配置文件、建立索引，
+# 与轮询共享快照（只读 seq）以及内容变化后读取整份快照的对比
+# 用法: python benchmarks/bench_shared.py
+import json
+import os
+import sys
+import tempfile
+import timeit
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from countdown_core import label_text, read_config
+from countdown_index import CountdownIndex
+from shared_snapshot import Publisher, SnapshotReader
+
+SIZES = [100, 10_000, 100_000]
+
+
+def make_info(n):
+    start = date(2025, 1, 1)
+    return {
+        "name": "倒计时",
+        "countdowns": [{"name": f"考试{i}", "date": (start + timedelta(days=(i * 7919) % 3650)).strftime("%Y/%m/%d")} for i in range(n)],
+        "encouragements": ["加油"],
+        "start_countdown_index": 0,
+        "password": "1000",
+    }
+
+
+def reparse(path, now):
+    info = read_config(path)
+    index = CountdownIndex(info["countdowns"])
+    return label_text(index, info["countdowns"][0]["name"], now), index.upcoming_rows(now)
+
+
+def per_call(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main():
+    now = datetime.now()
+    print(f"{'n':>8} {'重新解析配置(ms)':>16} {'轮询 seq(us)':>14} {'读取整份快照(ms)':>18} {'发布(ms)':>10} {'只改标签(us)':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for n in SIZES:
+            info = make_info(n)
+            config_path = os.path.join(directory, f"config{n}.json")
+            with open(config_path, "w", encoding="utf-8") as f:
+                json.dump(info, f, ensure_ascii=False)
+            index = CountdownIndex(info["countdowns"])
+            publisher = Publisher(os.path.join(directory, f"countdowns{n}.shm"))
+            label = label_text(index, info["countdowns"][0]["name"], now)
+            publisher.publish(index, now, label)
+            reader = SnapshotReader(publisher.writer.path)
+            assert reader.read()[2] == reparse(config_path, now)[0]
+
+            number = max(1, 1_000 // n)
+            parse_ms = per_call(lambda: reparse(config_path, now), number) * 1e3
+            poll_us = per_call(reader.changed, 100_000) * 1e6
+            read_ms = per_call(reader.read, number * 10) * 1e3
+
+            def republish():
+                publisher.key = None
+                publisher.publish(index, now, label)
+            publish_ms = per_call(republish, number * 10) * 1e3
+            labels = [label + "!", label]
+            label_us = per_call(lambda: publisher.publish(index, now, labels.reverse() or labels[0]), 10_000) * 1e6
+            print(f"{n:>8} {parse_ms:>16.2f} {poll_us:>14.3f} {read_ms:>18.3f} {publish_ms:>10.2f} {label_us:>14.2f}")
+            reader.close()
+            publisher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# 批量导出倒计时图片：首次全部生成（单进程与进程池）、内容不变时再次导出、只改一个考试日期后再导出
+# 用法: python benchmarks/bench_signage.py [考试数] [天数]
+# 默认只测 SVG；装有 Pillow 并能找到中文字体时同时测 PNG。
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signage import export, find_font
+
+
+def make_countdowns(n):
+    return [{"name": f"考试{i}", "date": f"{2027 + i // 336}/{i % 12 + 1}/{i % 28 + 1}"} for i in range(n)]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run(countdowns, days, formats, jobs, first_day):
+    directory = tempfile.mkdtemp(prefix="signage-")
+    try:
+        cold, (made, _) = timed(lambda: export(countdowns, directory, first_day, days, formats, jobs))
+        warm, (remade, skipped) = timed(lambda: export(countdowns, directory, first_day, days, formats, jobs))
+        changed = list(countdowns)
+        changed[0] = dict(changed[0], date="2030/1/1")
+        edit, (edited, _) = timed(lambda: export(changed, directory, first_day, days, formats, jobs))
+    finally:
+        shutil.rmtree(directory)
+    print(f"{'/'.join(formats):<8} 进程 {jobs:>2}  首次 {made:>6} 个 {cold * 1000:8.1f} ms  "
+          f"不变 {skipped:>6} 个跳过 {warm * 1000:7.1f} ms  改一个考试后重画 {edited:>3} 个 {edit * 1000:7.1f} ms")
+    assert remade == 0
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    countdowns = make_countdowns(n)
+    first_day = date(2026, 9, 1)
+    cpus = os.cpu_count() or 1
+    print(f"{n} 个考试 × {days} 天，CPU {cpus} 个")
+    variants = [("svg",)]
+    if importlib.util.find_spec("PIL") is None:
+        print("没有安装 Pillow，跳过 PNG")
+    elif find_font() is None:
+        print("找不到中文字体，跳过 PNG")
+    else:
+        variants.append(("png",))
+    for formats in variants:
+        for jobs in sorted({1, cpus, max(2, cpus)}):
+            run(countdowns, days, formats, jobs, first_day)
+
+
+if __name__ == "__main__":
+    main()
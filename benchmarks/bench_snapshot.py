@@ -0,0 +1,54 @@
+# 启动时读取配置的耗时：完整解析 JSON 与读取配置快照的对比
+# 用法: python benchmarks/bench_snapshot.py
+import json
+import os
+import sys
+import tempfile
+import time
+import timeit
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config_snapshot
+import countdown_core
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def make_info(n):
+    start = date(2025, 1, 1)
+    info = countdown_core.default_config()
+    info["countdowns"] = [{"name": f"考试{i % 3000}", "date": (start + timedelta(days=i % 3650)).strftime("%Y/%m/%d")} for i in range(n)]
+    return info
+
+
+def best(func, repeat=5):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    print(f"{'n':>8} {'完整解析(ms)':>14} {'读取快照(ms)':>14} {'快照大小(KB)':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for n in SIZES:
+            path = os.path.join(directory, f"config-{n}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(make_info(n), f, ensure_ascii=False, indent=4)
+
+            def full():
+                # 删除快照，模拟第一次启动或配置文件刚被修改
+                try:
+                    os.remove(path + config_snapshot.SNAPSHOT_SUFFIX)
+                except OSError:
+                    pass
+                return countdown_core.load_config(path)
+            full_time = best(full)
+            while not os.path.exists(path + config_snapshot.SNAPSHOT_SUFFIX):
+                time.sleep(0.01)  # 快照在后台写入
+            snapshot_time = best(lambda: countdown_core.load_config(path))
+            size = os.path.getsize(path + config_snapshot.SNAPSHOT_SUFFIX) / 1024
+            print(f"{n:>8} {full_time * 1e3:>14.1f} {snapshot_time * 1e3:>14.1f} {size:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# 语音引擎的延迟与吞吐量（使用 FakeBackend，不发声）
+# 用法: python benchmarks/bench_speech.py [每句启动开销秒数] [每字朗读秒数]
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speech import FakeBackend, SpeechEngine
+
+
+def run(label, startup, per_char, texts, kind):
+    backend = FakeBackend(startup=startup, seconds_per_char=per_char)
+    engine = SpeechEngine(backend)
+    begin = time.perf_counter()
+    say_costs = []
+    for text in texts:
+        t = time.perf_counter()
+        engine.say(text, kind)
+        say_costs.append(time.perf_counter() - t)
+    engine.wait_idle()
+    total = time.perf_counter() - begin
+    engine.close()
+    latencies = sorted(engine.latencies)
+    print(f"{label}:")
+    print(f"  say() 平均耗时 {statistics.mean(say_costs) * 1e6:.1f} us, 总耗时 {total:.3f} s")
+    print(f"  入队到开始朗读 p50 {latencies[len(latencies) // 2] * 1e3:.2f} ms, max {latencies[-1] * 1e3:.2f} ms")
+    print(f"  朗读 {len(backend.spoken)} 句, 打断 {len(backend.interrupted)} 句, 统计 {engine.stats}")
+
+
+def main():
+    startup = float(sys.argv[1]) if len(sys.argv) > 1 else 1.5
+    per_char = float(sys.argv[2]) if len(sys.argv) > 2 else 0.002
+    texts = [f"距离考试{i}还有 {i} 天" for i in range(50)]
+
+    # 原来的实现：每句话都冷启动一个 PowerShell，并且互相重叠
+    print(f"原实现估算: 每句至少 {startup:.2f} s 冷启动，{len(texts)} 次切换启动 {len(texts)} 个进程")
+    run("快速切换考试（同类播报合并）", startup, per_char, texts, "countdown")
+    run("连续朗读（不合并）", startup, per_char, texts[:8], None)
+
+
+if __name__ == "__main__":
+    main()
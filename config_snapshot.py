@@ -0,0 +1,100 @@
+import marshal
+import os
+import struct
+import sys
+
+# 配置快照：<配置文件>.snapshot 保存已经验证过的配置、解析好的日期序数和密码的约数和。
+# 配置文件的修改时间、大小和 SHA-256 都一致时直接读取快照，跳过 JSON 解析、验证和 strptime。
+# 快照用 marshal 编码，一次读入整个文件即可解码；格式与 Python 版本有关，版本不同时视为无效。
+# hashlib、array、threading 只在确实读写快照时才导入，条目少、没有快照时启动不需要它们。
+
+SNAPSHOT_SUFFIX = ".snapshot"
+MAGIC = b"DJSS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHBB")
+# 条目少于这个数量时 JSON 解析本来就很快，不写快照
+MIN_ENTRIES = 1000
+
+
+def source_signature(path, data):
+    import hashlib
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size, hashlib.sha256(data).hexdigest()]
+
+
+def header():
+    return HEADER.pack(MAGIC, FORMAT_VERSION, sys.version_info[0], sys.version_info[1])
+
+
+def load(path):
+    # 快照有效时返回 (info, 日期序数列表, 约数和)，否则返回 None
+    try:
+        with open(path + SNAPSHOT_SUFFIX, "rb") as f:
+            blob = f.read()
+        if blob[:HEADER.size] != header():
+            return None
+        st = os.stat(path)
+        payload = marshal.loads(memoryview(blob)[HEADER.size:])
+        mtime_ns, size, digest = payload["signature"]
+        if (st.st_mtime_ns, st.st_size) != (mtime_ns, size):
+            return None
+        import hashlib
+        with open(path, "rb") as f:
+            if hashlib.sha256(f.read()).hexdigest() != digest:
+                return None
+    except (OSError, ValueError, EOFError, TypeError, KeyError):
+        return None
+    from array import array
+    ordinals = array("l")
+    ordinals.frombytes(payload["ordinals"])
+    info = payload["info"]
+    # 同名考试共用同一个字符串对象，建立索引时查字典更快
+    for exam in info["countdowns"]:
+        exam["name"] = sys.intern(exam["name"])
+    return info, ordinals, payload["divisor_sum"]
+
+
+def write(path, signature, info, ordinals, divisor_sum):
+    from array import array
+    payload = {
+        "signature": signature,
+        "info": info,
+        "ordinals": array("l", ordinals).tobytes(),
+        "divisor_sum": divisor_sum,
+    }
+    import tempfile
+    fd, temp_path = tempfile.mkstemp(prefix=".snapshot-", suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header())
+            f.write(marshal.dumps(payload))
+        os.replace(temp_path, path + SNAPSHOT_SUFFIX)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+writers = []
+
+
+def save_later(path, signature, info, ordinals, password_sum):
+    # 在后台线程写快照；password_sum() 可能要等约数和算完
+    import threading
+
+    def run():
+        try:
+            write(path, signature, info, ordinals, password_sum())
+        except (OSError, ValueError) as e:
+            print(f"写入配置快照失败: {str(e)}")
+    thread = threading.Thread(target=run, name="config-snapshot", daemon=True)
+    writers.append(thread)
+    thread.start()
+
+
+def wait(timeout=None):
+    # 很快就退出的进程（例如终端版）在退出前调用，避免快照写到一半被终止
+    for thread in writers:
+        thread.join(timeout)
@@ -0,0 +1,143 @@
+import os
+
+from countdown_core import read_config, seed_recurring, unload_recurring
+from exam_time import exam_target
+from recurrence import RecurringSchedule
+
+# 变化的考试超过这个数量（且超过索引的八分之一）时整体重建索引
+BULK_CHANGES = 256
+
+
+def group_dates(countdowns):
+    # 名称 -> 该名称的全部条目（日期以及可选的 time、tz 都参与比较）
+    groups = {}
+    for exam in countdowns:
+        groups.setdefault(exam["name"], []).append(exam)
+    return groups
+
+
+def diff_config(old, new):
+    # 按名称比较考试；只有变化了的考试需要重新解析日期
+    old_groups = group_dates(old["countdowns"])
+    new_groups = group_dates(new["countdowns"])
+    changed = {name: exams for name, exams in new_groups.items() if old_groups.get(name) != exams}
+    for exams in changed.values():
+        for exam in exams:
+            exam_target(exam)
+    old_encouragements = set(old["encouragements"])
+    return {
+        "removed": [name for name in old_groups if name not in new_groups],
+        "changed": changed,
+        "order_changed": [exam["name"] for exam in old["countdowns"]] != [exam["name"] for exam in new["countdowns"]],
+        "encouragements_added": [c for c in new["encouragements"] if c not in old_encouragements],
+        "encouragements_changed": old["encouragements"] != new["encouragements"],
+        "settings": diff_settings(old, new),
+    }
+
+
+def diff_settings(old, new):
+    # 变化了的设置项 -> 新的值；新配置中删掉的项也算变化，值为 None（相当于关闭该功能）
+    keys = (old.keys() | new.keys()) - {"countdowns", "encouragements"}
+    return {key: new.get(key) for key in keys if key not in old or key not in new or old[key] != new[key]}
+
+
+def diff_is_empty(diff):
+    return not (diff["removed"] or diff["changed"] or diff["order_changed"]
+                or diff["encouragements_changed"] or diff["settings"])
+
+
+def reload_config(info, index, recurring, new, today):
+    # 把外部修改的配置按差异更新到 info 和索引中，返回 (diff, 新的重复考试)；没有变化时返回 None。
+    # 先解析重复规则，出错时抛出 ValueError，当前状态保持不变
+    diff = diff_config(info, new)
+    if diff_is_empty(diff):
+        return None
+    schedule = RecurringSchedule(new.get("recurring", ()), today)
+    unload_recurring(recurring, index)
+    apply_diff(info, index, new, diff)
+    seed_recurring(schedule, index)
+    return diff, schedule
+
+
+def apply_diff(info, index, new, diff):
+    # 逐个插入要移动后面的全部条目；变化的考试很多时（例如导入了整本日历）一次重建更快
+    changed = len(diff["removed"]) + sum(len(exams) for exams in diff["changed"].values())
+    if changed > max(BULK_CHANGES, len(index) // 8):
+        index.reset(new["countdowns"])
+    else:
+        for name in diff["removed"]:
+            index.remove(name)
+        for name, exams in diff["changed"].items():
+            index.remove(name)
+            for exam in exams:
+                index.add(exam)
+    # 原地更新，其他地方持有的 info 引用仍然有效
+    info.clear()
+    info.update(new)
+
+
+class ConfigWatcher:
+    """用 Tk 的 after 定时检查配置文件的修改时间和大小，文件稳定后再重新读取。
+
+    on_change(new_info) 返回 False 表示暂时不能应用，下次检查时会重试。
+    """
+
+    def __init__(self, widget, path, on_change, interval=3000, debounce=300):
+        self.widget = widget
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.debounce = debounce
+        self.signature = self.stat()
+        self.candidate = None
+        self.pending = None
+
+    def stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def start(self):
+        self.stop()
+        self.pending = self.widget.after(self.interval, self.poll)
+
+    def stop(self):
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+            self.pending = None
+
+    def sync(self):
+        # 程序自己保存配置后调用，避免把自己的写入当成外部修改
+        self.signature = self.stat()
+
+    def poll(self):
+        self.pending = None
+        signature = self.stat()
+        if signature is not None and signature != self.signature:
+            self.candidate = signature
+            self.pending = self.widget.after(self.debounce, self.settle)
+        else:
+            self.start()
+
+    def settle(self):
+        self.pending = None
+        signature = self.stat()
+        if signature == self.signature:
+            # 等待期间程序自己保存了配置（sync 已经记下新的签名），或者文件又被改了回去
+            self.candidate = None
+            self.start()
+            return
+        if signature != self.candidate:
+            # 编辑器可能分多次写入，等文件不再变化后再读取
+            self.candidate = signature
+            self.pending = self.widget.after(self.debounce, self.settle)
+            return
+        try:
+            if self.on_change(read_config(self.path)) is not False:
+                self.signature = signature
+        except (OSError, ValueError) as e:
+            print(f"配置文件重新加载失败: {str(e)}")
+            self.signature = signature
+        self.start()
@@ -0,0 +1,333 @@
+import copy
+import json
+import os
+
+import config_snapshot
+import divisor_sum
+from countdown_index import CountdownIndex, format_label
+from exam_time import exam_target, parse_when
+from persistence import move_aside, replay_journal, snapshot
+from recurrence import RecurringSchedule
+
+# 不依赖 Tk 的倒计时核心：配置读写与验证、日期计算、设置项的增删、密码校验。
+# 所有函数都显式接收配置文件路径，导入本模块不会读写任何文件。
+
+SETTINGS_OPTION = "设置"
+REQUIRED_KEYS = ["name", "countdowns", "encouragements", "start_countdown_index", "password"]
+DEFAULT_CONFIG = {
+    "name": "倒计时",
+    "countdowns": [
+        {"name": "考试1", "date": "2025/3/1"},
+        {"name": "考试2", "date": "2025/3/2"},
+        {"name": "考试3", "date": "2025/3/3"}
+    ],
+    "encouragements": [
+        "加油1",
+        "加油2",
+        "加油3"
+    ],
+    "start_countdown_index": 0,
+    "password": "1000"
+}
+# 每天预热的倒计时播报条数（当前选中的考试总会预热）
+WARM_LABEL_LIMIT = 50
+# 使用加油语文件时，每天预热接下来要播放的这么多句
+WARM_ENCOURAGEMENT_LIMIT = 20
+
+
+class ConfigFormatError(ValueError):
+    """配置文件或日志的内容本身无法解析（JSON 格式错误、缺少字段、日志与配置对不上）。
+
+    只有这种错误才把原文件改名保留；读取失败（文件被占用）、日期或时区有误、重复规则不支持等
+    不会因为重启而消失，也不会因为改名而修好，这时原文件保持不变。
+    """
+
+
+def default_config():
+    return copy.deepcopy(DEFAULT_CONFIG)
+
+
+def calculate_divisor_sum(n):
+    # 分解质因数后计算，结果会被记住；界面上请用 divisor_sum.lookup 避免等待
+    return divisor_sum.divisor_sum(n)
+
+
+def ensure_config(path):
+    # 确保配置文件存在
+    if not os.path.exists(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(DEFAULT_CONFIG, f, ensure_ascii=False, indent=4)
+
+
+def validate_config(info):
+    # 检查必要字段
+    for key in REQUIRED_KEYS:
+        if key not in info:
+            raise ValueError(f"缺少必要配置项: {key}")
+
+    # 检查countdowns格式
+    if not isinstance(info["countdowns"], list):
+        raise ValueError("countdowns必须是列表")
+    for exam in info["countdowns"]:
+        if not isinstance(exam, dict) or "name" not in exam or "date" not in exam:
+            raise ValueError("countdowns中的每个考试必须包含name和date字段")
+
+    # 检查recurring格式（可选）
+    for item in info.get("recurring", []):
+        if not isinstance(item, dict) or "name" not in item or "start" not in item or "rule" not in item:
+            raise ValueError("recurring中的每个考试必须包含name、start和rule字段")
+
+    # 检查announcements格式（可选，时间等细节在 announcements.Rule 中检查）
+    for item in info.get("announcements", []):
+        if not isinstance(item, dict) or ("at" not in item and "every" not in item):
+            raise ValueError("announcements中的每条播报必须包含at或every字段")
+
+
+def read_config(path):
+    with open(path, "r", encoding="utf-8") as file:
+        info = json.load(file)
+    validate_config(info)
+    return info
+
+
+def load_config(path):
+    # 读取并验证配置，重放尚未整理进配置文件的修改，建立索引（同时验证日期）。
+    # 配置快照有效时直接使用快照中解析好的内容；条目很多而快照无效时，在后台重新写快照
+    loaded = config_snapshot.load(path)
+    if loaded is not None:
+        info, ordinals, password_sum = loaded
+        divisor_sum.remember(info["password"], password_sum)
+    else:
+        with open(path, "rb") as file:
+            data = file.read()
+        try:
+            info = json.loads(data)
+            validate_config(info)
+        except ValueError as e:
+            raise ConfigFormatError(str(e)) from e
+        ordinals = [snapshot_ordinal(exam) for exam in info["countdowns"]]
+    large = loaded is None and len(info["countdowns"]) + len(info["encouragements"]) >= config_snapshot.MIN_ENTRIES
+    base = snapshot(info) if large else None
+    try:
+        replayed = replay_journal(path, info)
+    except (ValueError, KeyError, TypeError) as e:
+        raise ConfigFormatError(f"配置日志无法重放: {str(e)}") from e
+    if replayed:
+        # 日志改动过考试列表，序数已经对不上；日志整理进配置文件之后下次启动再写快照
+        return info, CountdownIndex(info["countdowns"])
+    if large:
+        password = info["password"]
+        signature = config_snapshot.source_signature(path, data)
+        config_snapshot.save_later(path, signature, base, ordinals, lambda: divisor_sum.divisor_sum(password))
+    return info, CountdownIndex.from_ordinals(info["countdowns"], ordinals)
+
+
+def load_or_default(path, today, report):
+    # 启动时加载配置，失败时把提示交给 report 并改用默认配置。
+    # 返回 (info, index, recurring, loaded)；loaded 为 False 时使用的是默认配置，不能把它整理进配置文件
+    try:
+        info, index = load_config(path)
+        return info, index, load_recurring(info, index, today), True
+    except Exception as e:
+        report(fallback_message(path, e))
+        info = default_config()
+        index = CountdownIndex(info["countdowns"])
+        return info, index, load_recurring(info, index, today), False
+
+
+def fallback_message(path, error):
+    # 配置加载失败、改用默认配置时调用，返回给用户的提示。
+    # 只有内容本身无法解析时才把原文件改名保留，其余错误保持原文件不变，修好后重新启动即可
+    if isinstance(error, ConfigFormatError):
+        return f"配置文件格式错误: {str(error)}\n将使用默认配置{set_aside_config(path)}"
+    return f"配置文件加载失败: {str(error)}\n暂时使用默认配置，原配置文件保持不变，修改设置前请先解决这个问题并重新启动"
+
+
+def set_aside_config(path):
+    # 原来的配置文件和日志改名保留，不会被之后的保存覆盖；返回附加在错误提示后面的说明
+    if not os.path.exists(path):
+        return ""
+    try:
+        aside = move_aside(path)
+    except OSError as e:
+        return f"\n原配置文件无法改名保存（{str(e)}），修改设置前请先手动备份"
+    return f"\n原配置文件已另存为 {aside}"
+
+
+def snapshot_ordinal(exam):
+    # 快照中保存的日期序数；带时间或时区的考试记为 0，加载时重新换算（结果与本机时区有关）
+    target, instant = exam_target(exam)
+    return target.toordinal() if instant is None else 0
+
+
+def start_index(info):
+    return max(0, min(info.get("start_countdown_index", 0), len(info["countdowns"]) - 1))
+
+
+def start_exam(info):
+    # 没有考试时为空
+    return info["countdowns"][start_index(info)]["name"] if info["countdowns"] else ""
+
+
+def keep_selection(info, index, selected):
+    # 选中的考试被删除或重复考试系列结束后换回起始考试
+    return selected if selected in index else start_exam(info)
+
+
+def exam_options(info, index):
+    # 重复考试只列出索引中还有的系列；已经没有下一次日期的系列不在索引中，
+    # advance_recurring 报告变化后应重新生成选项
+    names = [exam["name"] for exam in info["countdowns"]]
+    known = set(names)
+    for item in info.get("recurring", ()):
+        if item["name"] not in known and item["name"] in index:
+            known.add(item["name"])
+            names.append(item["name"])
+    return names + [SETTINGS_OPTION]
+
+
+def label_text(index, selected, now):
+    if selected == SETTINGS_OPTION:
+        return ""
+    days = index.days_left(selected, now)
+    if days is None:
+        return "无效的考试"
+    return format_label(selected, days)
+
+
+def warm_texts(index, selected, picker, now):
+    # 每天预热一次的句子：当前考试的播报、加油语（使用加油语文件时只预热接下来的若干句）、最近的若干考试播报
+    names = [selected] + index.upcoming(now.date(), WARM_LABEL_LIMIT)
+    labels = [format_label(name, index.days_left(name, now)) for name in names if name in index]
+    return labels[:1] + picker.upcoming(WARM_ENCOURAGEMENT_LIMIT) + labels[1:]
+
+
+def announcement_text(rule, index, selected, picker, now):
+    # 定时播报的 (句子, 类别)，与点击标签、切换考试时的朗读内容相同；没有可读的内容时返回 None
+    if rule.text is not None:
+        return rule.text, "announcement"
+    if rule.say == "encouragement":
+        text, kind = picker.next(), "encouragement"
+    elif rule.say == "selected":
+        text, kind = label_text(index, selected, now), "countdown"
+    else:
+        nearest = index.upcoming_days(now, 1)
+        text, kind = format_label(*nearest[0]) if nearest else "", "countdown"
+    return (text, kind) if text else None
+
+
+def open_publisher(info, shared_path):
+    # 配置中 shared_snapshot 为 true 时把倒计时写进 shared_path 这个内存映射文件，api_port 不为 0 时开放查询端口。
+    # 两者都是可选的，用到时才导入；打开失败时只提示，返回 None
+    if not (info.get("shared_snapshot") or info.get("api_port")):
+        return None
+    from shared_snapshot import Publisher
+    try:
+        return Publisher(shared_path if info.get("shared_snapshot") else None, info.get("api_port", 0))
+    except OSError as e:
+        print(f"无法共享倒计时: {str(e)}")
+        return None
+
+
+def start_announcer(widget, info, announce):
+    # 配置了 announcements 时按时播报（见 announcements.py），用到时才导入；规则有误时只提示，不影响倒计时
+    if not info.get("announcements"):
+        return None
+    from announcements import AnnouncementScheduler
+    try:
+        announcer = AnnouncementScheduler(widget, info["announcements"], announce)
+    except ValueError as e:
+        print(f"定时播报配置有误: {str(e)}")
+        return None
+    announcer.start()
+    return announcer
+
+
+def make_countdown(name, date, time="", tz="", base=None):
+    # 由设置界面的输入得到考试条目：time、tz 为空时不写这两项；base 是修改前的条目，其余字段保留
+    if not name or not date:
+        raise ValueError("考试名称和日期不能为空！")
+    try:
+        parse_when(date)
+    except ValueError:
+        raise ValueError("日期格式不正确，请使用 YYYY/MM/DD 或 YYYY-MM-DD HH:MM 格式！")
+    exam = dict(base or (), name=name, date=date)
+    for field, value in (("time", time), ("tz", tz)):
+        if value:
+            exam[field] = value
+        else:
+            exam.pop(field, None)
+    exam_target(exam)  # 时间或时区不对时抛出 ValueError，提示中带有具体原因
+    return exam
+
+
+# 下面的设置项操作针对 EntryStore：每个条目有固定的编号，增删改只影响这一个条目
+
+def add_countdown(countdowns, name, date, time="", tz=""):
+    # 返回新条目的编号
+    return countdowns.add(make_countdown(name, date, time, tz))
+
+
+def update_countdown(countdowns, key, name, date, time="", tz=""):
+    # 返回 (修改前的条目, 修改后的条目)
+    exam = make_countdown(name, date, time, tz, base=countdowns.get(key))
+    return countdowns.update(key, exam), exam
+
+
+def delete_countdown(countdowns, key):
+    return countdowns.remove(key)
+
+
+def add_encouragement(encouragements, text):
+    if not text:
+        raise ValueError("加油语不能为空！")
+    return encouragements.add(text)
+
+
+def delete_encouragement(encouragements, key):
+    return encouragements.remove(key)
+
+
+def track_countdowns(countdowns, index):
+    # 让索引跟随 countdowns 的修改，每次只更新变化的那一个条目
+    def on_change(event, key, old, new):
+        if old is not None:
+            index.discard(old)
+        if new is not None:
+            index.add(new)
+    countdowns.subscribe(on_change)
+    return on_change
+
+
+def sync_info(info, countdowns, encouragements):
+    # 保存或比较配置之前，把 EntryStore 中的内容写回 info（列表只在修改后才重建）
+    info["countdowns"] = countdowns.values()
+    info["encouragements"] = encouragements.values()
+
+
+# 重复考试（配置中的 recurring）：索引里只放每个系列的下一次日期，日期过去后由 advance_recurring 换成下一次
+
+def load_recurring(info, index, today):
+    schedule = RecurringSchedule(info.get("recurring", ()), today)
+    seed_recurring(schedule, index)
+    return schedule
+
+
+def seed_recurring(schedule, index):
+    for name, target in schedule.entries():
+        index.add_date(name, target)
+
+
+def unload_recurring(schedule, index):
+    for name, target in schedule.entries():
+        index.discard_date(name, target)
+
+
+def advance_recurring(schedule, index, today):
+    # 返回是否有变化；没有日期过去时只比较一次堆顶
+    changes = schedule.advance(today)
+    for name, old, new in changes:
+        index.discard_date(name, old)
+        if new is not None:
+            index.add_date(name, new)
+    return bool(changes)
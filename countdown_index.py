@@ -0,0 +1,225 @@
+import bisect
+from datetime import date
+
+from exam_time import exam_target, midnight_epoch, parse_when
+
+DATE_FORMAT = "%Y/%m/%d"
+
+
+def parse_date(text):
+    # 只取日期部分；带时间和时区的考试用 exam_target
+    return parse_when(text)[0]
+
+
+def days_left(target, now):
+    # 与 (datetime(target) - now).days 的结果一致，但不需要构造 datetime
+    days = target.toordinal() - now.toordinal()
+    if now.hour or now.minute or now.second or now.microsecond:
+        days -= 1
+    return max(days, 0)
+
+
+def format_label(name, days):
+    return f'距离{name}还有 {days} 天'
+
+
+class DayBoundaries:
+    """尚未到来的考试时刻，用于快速找到下一次剩余天数变化的时刻。
+
+    考试的剩余天数在 时间戳 - k 天 处变化，只与时间戳除以一天的余数有关：
+    余数去重排序后，每次查询只需一次二分查找；考试时刻按先后排好，过去的逐个丢掉。
+    """
+
+    def __init__(self, instants, wall, version):
+        self.version = version
+        self.wall = wall
+        self.queue = sorted(instant for instant in instants if instant > wall)
+        self.passed = 0  # queue 中已经过去的个数
+        self.counts = {}
+        for instant in self.queue:
+            phase = instant % 86400
+            self.counts[phase] = self.counts.get(phase, 0) + 1
+        self.phases = sorted(self.counts)
+
+    def advance(self, wall):
+        queue = self.queue
+        while self.passed < len(queue) and queue[self.passed] <= wall:
+            phase = queue[self.passed] % 86400
+            self.passed += 1
+            self.counts[phase] -= 1
+            if not self.counts[phase]:
+                del self.counts[phase]
+                del self.phases[bisect.bisect_left(self.phases, phase)]
+        self.wall = wall
+
+    def next_after(self, wall):
+        phases = self.phases
+        if not phases:
+            return None
+        phase = wall % 86400
+        i = bisect.bisect_left(phases, phase)
+        if i == len(phases):
+            return wall - phase + 86400 + phases[0]
+        return wall - phase + phases[i]
+
+
+class CountdownIndex:
+    """countdowns 的内存索引：名称 -> 已解析日期，以及按日期排序的视图。
+
+    同名考试按出现顺序保存，查询时返回第一个（与原来的 next(...) 一致）；
+    remove 删除该名称的全部条目，discard 只删除一个名称和日期都相同的条目。
+    带时间或时区的考试另外在 instants 中按插入序号记下 UTC 时间戳，剩余天数按时间戳计算。
+    """
+
+    def __init__(self, countdowns=()):
+        self.version = 0  # 每次修改加一，调用方据此判断内容是否变化
+        self.reset(countdowns)
+
+    def reset(self, countdowns):
+        self.version += 1
+        by_name = {}
+        by_date = []  # (日期序数, 插入序号, 名称)
+        self.by_name = by_name
+        self.instants = {}
+        self.boundaries = None  # next_change 使用的 DayBoundaries
+        self.seq = 0
+        for exam in countdowns:
+            by_date.append(self.insert(exam["name"], *exam_target(exam)))
+        by_date.sort()
+        self.by_date = by_date
+
+    @classmethod
+    def from_ordinals(cls, countdowns, ordinals):
+        # 日期已经解析成序数（例如来自配置快照），不再解析日期；循环内联了 insert，相同日期共用一个对象。
+        # 序数为 0 的是带时间或时区的考试，时间戳与本机时区有关，在这里重新计算
+        index = cls()
+        by_name = index.by_name
+        by_date = index.by_date
+        dates = {}
+        for seq, (exam, ordinal) in enumerate(zip(countdowns, ordinals)):
+            if not ordinal:
+                target, index.instants[seq] = exam_target(exam)
+                ordinal = target.toordinal()
+            target = dates.get(ordinal)
+            if target is None:
+                target = dates[ordinal] = date.fromordinal(ordinal)
+            name = exam["name"]
+            key = (ordinal, seq, name)
+            by_name.setdefault(name, []).append((target, key))
+            by_date.append(key)
+        index.seq = len(by_date)
+        index.version += 1
+        by_date.sort()
+        return index
+
+    def __len__(self):
+        return len(self.by_date)
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+    def insert(self, name, target, instant=None):
+        key = (target.toordinal(), self.seq, name)
+        if instant is not None:
+            self.instants[self.seq] = instant
+        self.seq += 1
+        self.version += 1
+        self.by_name.setdefault(name, []).append((target, key))
+        return key
+
+    def add(self, exam):
+        # 先解析，日期格式错误时索引保持不变
+        self.add_date(exam["name"], *exam_target(exam))
+
+    def add_date(self, name, target, instant=None):
+        bisect.insort(self.by_date, self.insert(name, target, instant))
+
+    def remove(self, name):
+        self.version += 1
+        for _, key in self.by_name.pop(name, ()):
+            self.instants.pop(key[1], None)
+            i = bisect.bisect_left(self.by_date, key)
+            if i < len(self.by_date) and self.by_date[i] == key:
+                del self.by_date[i]
+
+    def discard(self, exam):
+        if exam["name"] in self.by_name:
+            self.discard_date(exam["name"], exam_target(exam)[0])
+
+    def discard_date(self, name, target):
+        entries = self.by_name.get(name)
+        if not entries:
+            return
+        for i, (entry_date, key) in enumerate(entries):
+            if entry_date == target:
+                self.version += 1
+                del entries[i]
+                if not entries:
+                    del self.by_name[name]
+                self.instants.pop(key[1], None)
+                j = bisect.bisect_left(self.by_date, key)
+                if j < len(self.by_date) and self.by_date[j] == key:
+                    del self.by_date[j]
+                return
+
+    def get(self, name):
+        entries = self.by_name.get(name)
+        return entries[0][0] if entries else None
+
+    def instant(self, name):
+        # 考试时刻的时间戳：带时间或时区的考试为加载时算好的值，其余为考试当天本地零点
+        entries = self.by_name.get(name)
+        if not entries:
+            return None
+        target, key = entries[0]
+        instant = self.instants.get(key[1])
+        return instant if instant is not None else midnight_epoch(target)
+
+    def days_left(self, name, now):
+        entries = self.by_name.get(name)
+        if not entries:
+            return None
+        target, key = entries[0]
+        instant = self.instants.get(key[1])
+        if instant is not None:
+            return max(int((instant - now.timestamp()) // 86400), 0)
+        return days_left(target, now)
+
+    def next_change(self, wall):
+        # 带时间戳的考试剩余天数不在零点变化：返回下一次有考试的天数变化的时间戳，没有时返回 None。
+        # 索引被修改（version 变化）或时钟往回调过时才重新整理，其余时候只丢掉已经过去的考试时刻
+        boundaries = self.boundaries
+        if boundaries is None or boundaries.version != self.version or wall < boundaries.wall:
+            boundaries = self.boundaries = DayBoundaries(self.instants.values(), wall, self.version)
+        else:
+            boundaries.advance(wall)
+        return boundaries.next_after(wall)
+
+    def upcoming_days(self, now, count=None):
+        # 一次算出最近若干个考试的剩余天数：日期已经解析成序数并按日期排好，
+        # 每个条目只需要一次减法，结果与逐个调用 days_left 相同
+        return [(name, days) for name, _, days in self.upcoming_rows(now, count)]
+
+    def upcoming_rows(self, now, count=None):
+        # 与 upcoming_days 相同，但同时给出日期序数：[(名称, 日期序数, 剩余天数)]
+        today = now.toordinal()
+        offset = today + (1 if now.hour or now.minute or now.second or now.microsecond else 0)
+        start = bisect.bisect_left(self.by_date, (today,))
+        end = len(self.by_date) if count is None else start + count
+        if not self.instants:
+            return [(name, ordinal, max(ordinal - offset, 0)) for ordinal, _, name in self.by_date[start:end]]
+        # 带时间戳的考试：剩余秒数整除一天
+        instants = self.instants
+        wall = now.timestamp()
+        rows = []
+        for ordinal, seq, name in self.by_date[start:end]:
+            instant = instants.get(seq)
+            days = ordinal - offset if instant is None else int((instant - wall) // 86400)
+            rows.append((name, ordinal, max(days, 0)))
+        return rows
+
+    def upcoming(self, today, count=None):
+        # 从 today 开始（含当天）按日期排序的名称
+        start = bisect.bisect_left(self.by_date, (today.toordinal(),))
+        end = len(self.by_date) if count is None else start + count
+        return [key[2] for key in self.by_date[start:end]]
@@ -0,0 +1,129 @@
+import os
+import sys
+import time
+from datetime import date, datetime
+
+import config_snapshot
+import countdown_core
+from countdown_core import advance_recurring, load_recurring
+from countdown_index import CountdownIndex, format_label
+from precision import PRECISION_PERIODS, format_clock, remaining_seconds
+from scheduler import MAX_SLEEP_MS, ms_until_next_change
+
+# 终端版：不加载 Tk 和 customtkinter，适合共享的实验室服务器和瘦客户端。
+# 配置文件、起始考试和标签文字与图形界面相同（包括重复考试和最后一天的时:分:秒）。
+#   python daojishi-cli.py                 打印当前考试的倒计时后退出
+#   python daojishi-cli.py --all           打印从今天起的全部考试
+#   python daojishi-cli.py --select 名称   指定考试
+#   python daojishi-cli.py --watch         在一行状态栏里持续显示，文字变化时才重画；
+#                                          只在天数变化时（最后一天按秒）醒来，配置文件修改后自动重新读取
+# 启动耗时和内存占用与图形界面的对比见 benchmarks/bench_frontends.py。
+
+config_file_path = os.environ.get("DAOJISHI_CONFIG", "D:/config.json")
+# 检查配置文件是否被修改的间隔（秒），与 ConfigWatcher 的默认值一致
+CONFIG_POLL_SECONDS = 3
+
+
+def config_signature():
+    try:
+        st = os.stat(config_file_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def load():
+    # 返回 (info, 索引, 重复考试)；配置有误时与图形界面一样退回默认配置
+    try:
+        info, index = countdown_core.load_config(config_file_path)
+    except Exception as e:
+        print(f"配置文件格式错误: {str(e)}\n将使用默认配置", file=sys.stderr)
+        info = countdown_core.default_config()
+        index = CountdownIndex(info["countdowns"])
+    return info, index, load_recurring(info, index, date.today())
+
+
+def selected_name(info, argv):
+    if "--select" in argv:
+        i = argv.index("--select")
+        if i + 1 < len(argv):
+            return argv[i + 1]
+    return info["countdowns"][countdown_core.start_index(info)]["name"] if info["countdowns"] else ""
+
+
+def label_text(info, index, selected):
+    # 与 CountdownApp.get_label_text 相同：最后一天且配置了 precision_mode 时显示时:分:秒
+    period = PRECISION_PERIODS.get(info.get("precision_mode"))
+    instant = index.instant(selected)
+    if period and instant is not None:
+        remaining = remaining_seconds(instant, time.time())
+        if remaining is not None:
+            return format_clock(selected, remaining, period < 1), period
+    return countdown_core.label_text(index, selected, datetime.now()), None
+
+
+def print_all(index):
+    for name, days in index.upcoming_days(datetime.now()):
+        print(format_label(name, days))
+
+
+def watch(argv):
+    tty = sys.stdout.isatty()
+    signature = config_signature()
+    info, index, recurring = load()
+    shown = None
+    while True:
+        advance_recurring(recurring, index, date.today())
+        text, period = label_text(info, index, selected_name(info, argv))
+        if text != shown:
+            shown = text
+            if tty:
+                # 回到行首并清除整行，只占一行
+                sys.stdout.write("\r\x1b[K" + text)
+            else:
+                sys.stdout.write(text + "\n")
+            sys.stdout.flush()
+        if period:
+            delay = period - time.time() % period
+        else:
+            delay = ms_until_next_change(index) / 1000
+        if wait_for_change(delay, lambda: config_signature() != signature):
+            signature = config_signature()
+            info, index, recurring = load()
+
+
+def wait_for_change(delay, config_changed, clock=time.time, monotonic=time.monotonic, sleep=time.sleep):
+    # 睡 delay 秒，每 CONFIG_POLL_SECONDS 秒醒来检查一次配置文件；配置文件被修改时返回 True。
+    # 每次醒来都按系统时钟重新计算剩余时间：单调时钟在系统休眠期间不走，只按它计算时，
+    # 笔记本唤醒后可能一整天都停留在前一天的天数。另外与图形界面一样最多睡 MAX_SLEEP_MS，
+    # 系统时钟往回调时也不会一直睡下去
+    deadline = clock() + delay
+    limit = monotonic() + MAX_SLEEP_MS / 1000
+    while True:
+        remaining = min(deadline - clock(), limit - monotonic())
+        if remaining <= 0:
+            return False
+        sleep(min(remaining, CONFIG_POLL_SECONDS))
+        if config_changed():
+            return True
+
+
+def main():
+    argv = sys.argv[1:]
+    countdown_core.ensure_config(config_file_path)
+    if "--watch" in argv:
+        try:
+            watch(argv)
+        except KeyboardInterrupt:
+            print()
+        return
+    info, index, recurring = load()
+    if "--all" in argv:
+        print_all(index)
+    else:
+        print(label_text(info, index, selected_name(info, argv))[0])
+    config_snapshot.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,159 +1,363 @@
+import startup_profile  # 必须最先导入，记录启动起点
 import tkinter as tk
 from tkinter import ttk
-from datetime import datetime, timedelta
-import subprocess
-import random
-import math
+from datetime import date, datetime, timedelta
 import os, sys
-import json
-import customtkinter as ctk
-
-ctk.set_appearance_mode("light")
-ctk.set_default_color_theme("blue")
-
-config_file_path = "D:/config.json"
-
-def calculate_divisor_sum(n):
-    try:
-        n = int(n)
-        total = 0
-        for i in range(1, int(math.isqrt(n)) + 1):
-            if n % i == 0:
-                if i == n // i:
-                    total += i
-                else:
-                    total += i + n // i
-        return total
-    except:
-        return -1
-
-# 确保配置文件存在
-if not os.path.exists(config_file_path):
-    default_config = {
-        "name": "倒计时",
-        "countdowns": [
-            {"name": "考试1", "date": "2025/3/1"},
-            {"name": "考试2", "date": "2025/3/2"},
-            {"name": "考试3", "date": "2025/3/3"}
-        ],
-        "encouragements": [
-            "加油1",
-            "加油2",
-            "加油3"
-        ],
-        "start_countdown_index": 0,
-        "password": "1000"
-    }
-    with open(config_file_path, "w", encoding="utf-8") as f:
-        json.dump(default_config, f, ensure_ascii=False, indent=4)
+import countdown_core
+import metrics
+import divisor_sum
+import single_instance
+from countdown_core import advance_recurring, announcement_text, ensure_config, exam_options, keep_selection, read_config, sync_info, track_countdowns, warm_texts
+from entry_store import EntryStore
+from scheduler import TickScheduler, ms_until_next_change
+from precision import PRECISION_PERIODS, PrecisionClock, format_clock, remaining_seconds
+from render import Renderer, requested_width
+from phrase_corpus import EncouragementPicker
+from config_watch import ConfigWatcher, reload_config
+
+startup_profile.mark("导入核心模块")
+
+# customtkinter、语音和设置窗口都在第一次用到时才导入，首次绘制只依赖 tkinter
+ctk = None
+
+config_file_path = os.environ.get("DAOJISHI_CONFIG", "D:/config.json")
+audio_cache_dir = os.path.join(os.path.dirname(config_file_path), "daojishi_audio_cache")
+metrics_file_path = os.environ.get("DAOJISHI_METRICS_FILE", os.path.join(os.path.dirname(config_file_path), "daojishi_metrics.jsonl"))
+# 配置中 shared_snapshot 为 true 时，把倒计时写进这个内存映射文件供其他程序读取（见 shared_snapshot.py）
+shared_file_path = os.environ.get("DAOJISHI_SHARED_FILE", os.path.join(os.path.dirname(config_file_path), "daojishi_countdowns.shm"))
+# 启动后多久再预热语音缓存（毫秒），避免和启动抢资源
+WARM_DELAY_MS = 5000
+# 条目超过这个数量时，编辑先写入追加日志，不再每次重写整个配置文件
+JOURNAL_THRESHOLD = 1000
+# 首次绘制时使用的背景色，与 customtkinter 浅色主题的窗口背景一致
+FIRST_PAINT_BG = "gray92"
+# 看板模式默认显示的考试数；配置文件中的 dashboard_count 可以修改，0 表示关闭
+DASHBOARD_DEFAULT_COUNT = 5
+
+def load_customtkinter():
+    global ctk
+    if ctk is None:
+        import customtkinter
+        customtkinter.set_appearance_mode("light")
+        customtkinter.set_default_color_theme("blue")
+        ctk = customtkinter
+    return ctk
 
 def load_config():
-    try:
-        with open(config_file_path, "r", encoding="utf-8") as file:
-            info = json.load(file)
-        
-        # 检查必要字段
-        required_keys = ["name", "countdowns", "encouragements", "start_countdown_index", "password"]
-        for key in required_keys:
-            if key not in info:
-                raise ValueError(f"缺少必要配置项: {key}")
-                
-        # 检查countdowns格式
-        if not isinstance(info["countdowns"], list):
-            raise ValueError("countdowns必须是列表")
-        for exam in info["countdowns"]:
-            if not isinstance(exam, dict) or "name" not in exam or "date" not in exam:
-                raise ValueError("countdowns中的每个考试必须包含name和date字段")
-            datetime.strptime(exam["date"], "%Y/%m/%d")
-            
-        return info
-    except Exception as e:
-        print(f"配置文件格式错误: {str(e)}\n将使用默认配置")
-        return {
-            "name": "倒计时",
-            "countdowns": [
-                {"name": "考试1", "date": "2025/3/1"},
-                {"name": "考试2", "date": "2025/3/2"},
-                {"name": "考试3", "date": "2025/3/3"}
-            ],
-            "encouragements": [
-                "加油1",
-                "加油2",
-                "加油3"
-            ],
-            "start_countdown_index": 0,
-            "password": "1000"
-        }
-
-info = load_config()
-settings_open = False
-
-class CountdownApp(ctk.CTk):
+    global countdown_index, recurring, config_loaded
+    info, countdown_index, recurring, config_loaded = countdown_core.load_or_default(config_file_path, date.today(), print)
+    return info
+
+class CountdownApp(tk.Tk):
     def __init__(self):
         super().__init__()
         self.flag = True
         self.last_valid_exam = ""
         self.current_config_content = ""
+        self.info = info
+        self.countdown_index = countdown_index
+        # 设置中的增删改都通过这两个存储进行，索引、选项菜单和标签根据通知只更新变化的部分
+        self.countdowns = EntryStore(info["countdowns"])
+        self.encouragements = EntryStore(info["encouragements"])
+        track_countdowns(self.countdowns, countdown_index)
+        self.countdowns.subscribe(self.on_countdowns_changed)
+        self.menu_dirty = False
+        self.settings_open = False
+        self.settings_window = None
+        self.dialogs = {}
+        self.speech = None
+        self.speech_backend = None
+        self.warmed_date = None
+        self.exam_menu = None
+        self.config_store = None
+        self.dashboard = None
+        self.dashboard_count = 0
+        self.dashboard_size = (0, 0)
+        self.menu_width = 0
+        # 配置中的 precision_mode 为 seconds 或 tenths 时，最后一天显示时:分:秒
+        self.clock = None
+        self.precise = False
+        self.set_precision(info.get("precision_mode"))
+        # 共享快照（mmap、查询端口）和定时播报在首次绘制之后才启动
+        self.publisher = None
+        # 配置了 encouragements_file 时从外部文件选择加油语（相对路径相对于配置文件所在目录），
+        # 文件在首次绘制之后才在后台打开，打开之前使用配置中的加油语
+        self.picker = EncouragementPicker(self.encouragements.values)
+        # 配置了 announcements 时按时播报（见 announcements.py）
+        self.announcer = None
 
         self.attributes('-topmost', True)
         self.overrideredirect(True)
+        self.configure(bg=FIRST_PAINT_BG)
 
-        screen_width = self.winfo_screenwidth()
+        self.screen_width = self.winfo_screenwidth()
         self.window_height = int(60 * 1.2)
-        self.geometry(f'+{(screen_width - self.winfo_width()) // 2}+0')
-
-        self.main_frame = ctk.CTkFrame(self, corner_radius=15, fg_color="transparent")
-        self.main_frame.pack(fill=tk.BOTH, expand=True)
+        self.geometry(f'+{(self.screen_width - self.winfo_width()) // 2}+0')
 
         self.selected_exam = tk.StringVar(self)
-        self.exam_options = [exam["name"] for exam in info["countdowns"]] + ["设置"]
-        start_index = max(0, min(info.get("start_countdown_index", 0), len(info["countdowns"]) - 1))
-        self.selected_exam.set(info["countdowns"][start_index]["name"])
-        self.last_valid_exam = self.selected_exam.get()
+        self.exam_options = exam_options(info, countdown_index)
+        self.last_valid_exam = countdown_core.start_exam(info)
+        self.selected_exam.set(self.last_valid_exam)
+
+        # 先用普通的 tkinter 标签画出倒计时，customtkinter 加载完成后再换成完整界面
+        self.label = tk.Label(self, text='', font=('Helvetica', int(36 * 1.2)), bg=FIRST_PAINT_BG)
+        self.label.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # 文字和窗口大小没有变化时，刷新不触碰任何控件
+        self.renderer = Renderer(self, self.label, ("tk", int(36 * 1.2)))
+
+        # 只保留一个待执行的刷新，下一次唤醒安排在日期变化时
+        self.scheduler = TickScheduler(self, self.update_label, next_delay=self.next_tick_delay)
+        self.update_label()
+        self.scheduler.start()
+        self.update()
+        startup_profile.mark("首次绘制")
+
+        self.last_speak_time = datetime.now() - timedelta(seconds=2)
+        self.after(1, self.build_full_ui)
+
+    def build_full_ui(self):
+        load_customtkinter()
+        startup_profile.mark("导入customtkinter")
+
+        self.configure(bg=ctk.ThemeManager.theme["CTk"]["fg_color"][0])
+        self.main_frame = ctk.CTkFrame(self, corner_radius=15, fg_color="transparent")
 
         # 固定 CTkOptionMenu 的大小
         self.exam_menu = ctk.CTkOptionMenu(self.main_frame, variable=self.selected_exam, values=self.exam_options, command=self.on_exam_change, width=120)  # 固定宽度为120
         self.exam_menu.pack(side=tk.LEFT, padx=10, pady=10)
 
-        self.label = ctk.CTkLabel(self.main_frame, text='', font=('Helvetica', int(36 * 1.2)), bg_color='transparent')  # 字体大小为原始大小的1.2倍
-        self.label.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.label.bind("<Button-1>", self.play_random_encouragement)
+        label = ctk.CTkLabel(self.main_frame, text='', font=('Helvetica', int(36 * 1.2)), bg_color='transparent')  # 字体大小为原始大小的1.2倍
+        label.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        label.bind("<Button-1>", self.play_random_encouragement)
+        label.bind("<Button-3>", self.toggle_dashboard)
 
+        self.label.destroy()
+        self.label = label
+        self.main_frame.pack(fill=tk.BOTH, expand=True)
+        scaling = ctk.ScalingTracker.get_widget_scaling(self.main_frame)
+        self.renderer.set_label(label, ("ctk", int(36 * 1.2), scaling))
+        self.menu_width = requested_width(self.exam_menu)  # 选项菜单宽度固定，只测量一次
+        self.window_height = int(60 * 1.2 * scaling)
+        self.set_dashboard(info.get("dashboard_count", 0))
         self.update_label()
-        self.last_speak_time = datetime.now() - timedelta(seconds=2)
-
+        self.update_idletasks()
+        startup_profile.mark("完整界面就绪")
+
+        # 部署工具推送新的配置文件后自动重新加载，不需要重启
+        self.config_watcher = ConfigWatcher(self, config_file_path, self.apply_config)
+        self.config_watcher.start()
+
+        # 设置的修改在后台合并写入，界面不等待磁盘
+        from persistence import ConfigStore
+        large = len(info["countdowns"]) + len(info["encouragements"]) > JOURNAL_THRESHOLD
+        self.config_store = ConfigStore(config_file_path, journal=large, on_saved=self.config_watcher.sync)
+        self.sync_info()
+        if config_loaded:
+            self.config_store.compact_leftover(info)
+        # 只有用 --metrics 或 DAOJISHI_METRICS 开启时才会挂上
+        self.metrics = metrics.attach(self, metrics_file_path, lambda: self.speech)
+        # 接收再次启动时转发的命令，由界面线程定时取出执行
+        instance.start(self, self.handle_command)
+        self.set_encouragements_file()
+        self.set_sharing()
+        self.set_announcements()
+        self.request_update()  # 让刚启动的共享快照立即发布一次
+        startup_profile.mark("后台服务启动")
+
+        self.after(WARM_DELAY_MS, self.warm_speech_cache)
+        within_budget = startup_profile.report()
+        if startup_profile.exit_after_startup:
+            self.destroy()
+            sys.exit(0 if within_budget else 1)
+
+    def load_speech(self):
+        # 常驻语音线程，避免每次朗读都启动一个新的 PowerShell；合成过的句子缓存为音频文件
+        if self.speech is None:
+            from speech import SpeechEngine, make_backend
+            from audio_cache import AudioCache, CachedBackend
+            voice = info.get("voice", "")
+            rate = info.get("rate", 0)
+            self.speech_backend = CachedBackend(make_backend(voice=voice, rate=rate), AudioCache(audio_cache_dir), voice, rate)
+            self.speech = SpeechEngine(self.speech_backend)
+        return self.speech
+
+    @metrics.timed("update_label")
     def update_label(self):
+        start = self.renderer.begin()
+        # 重复考试的日期过去后换成下一次，通常只比较一次堆顶；系列结束时从选项中去掉
+        if advance_recurring(recurring, countdown_index, date.today()):
+            self.refresh_menu()
         label_text = self.get_label_text()
-        self.label.configure(text=label_text)
-        self.adjust_window_size(label_text)
-        self.after(1000, self.update_label)
-
+        drawn = self.renderer.set_text(label_text)
+        if self.dashboard is not None and self.dashboard.show(countdown_index.upcoming_days(datetime.now(), self.dashboard_count)):
+            # 看板的行数或文字变了，整个窗口只重新计算一次大小
+            self.dashboard.update_idletasks()
+            self.dashboard_size = (self.dashboard.winfo_reqwidth(), self.dashboard.winfo_reqheight())
+            drawn = True
+        drawn = self.adjust_window_size(label_text) or drawn
+        self.renderer.end(start, drawn)
+        if self.publisher is not None:
+            self.publisher.publish(countdown_index, datetime.now(), label_text)
+        if self.speech is not None:
+            self.warm_speech_cache()
+
+    def request_update(self):
+        self.scheduler.request()
+
+    def set_dashboard(self, count):
+        self.dashboard_count = count
+        if count and self.dashboard is None:
+            from dashboard import Dashboard
+            self.dashboard = Dashboard(self, fg_color="transparent")
+            self.dashboard.pack(fill=tk.BOTH, expand=True)
+        elif not count and self.dashboard is not None:
+            self.dashboard.destroy()
+            self.dashboard = None
+            self.dashboard_size = (0, 0)
+        self.request_update()
+
+    def toggle_dashboard(self, event=None):
+        self.set_dashboard(0 if self.dashboard_count else info.get("dashboard_count") or DASHBOARD_DEFAULT_COUNT)
+
+    @metrics.timed("get_label_text")
     def get_label_text(self):
-        current_date = datetime.now()
         selected = self.selected_exam.get()
-        if selected == "设置":
-            return ""
-        
-        target_exam = next((exam for exam in info["countdowns"] if exam["name"] == selected), None)
-        if not target_exam:
-            return "无效的考试"
-        
-        target_date = datetime.strptime(target_exam["date"], "%Y/%m/%d")
-        delta = target_date - current_date
-        days = max(delta.days, 0)
-        return f'距离{selected}还有 {days} 天'
-
-    def speak(self, text):
-        command = f'powershell.exe "Add-Type -AssemblyName System.Speech;' \
-                  f'(New-Object System.Speech.Synthesis.SpeechSynthesizer).Speak(\'{text}\')"'
-        subprocess.Popen(command, shell=True)
+        if self.clock is not None:
+            instant = countdown_index.instant(selected)
+            remaining = remaining_seconds(instant, self.clock.display_time()) if instant is not None else None
+            self.precise = remaining is not None
+            if self.precise:
+                return format_clock(selected, remaining, self.clock.period < 1)
+        return countdown_core.label_text(countdown_index, selected, datetime.now())
+
+    def set_precision(self, mode):
+        period = PRECISION_PERIODS.get(mode)
+        self.clock = PrecisionClock(period) if period else None
+        self.precise = False
+
+    def set_sharing(self):
+        if self.publisher is not None:
+            self.publisher.close()
+        self.publisher = countdown_core.open_publisher(info, shared_file_path)
+
+    def set_encouragements_file(self):
+        path = info.get("encouragements_file")
+        self.picker.set_file(os.path.join(os.path.dirname(config_file_path), path) if path else None)
+        self.picker.preload()
+
+    def set_announcements(self):
+        if self.announcer is not None:
+            self.announcer.stop()
+        self.announcer = countdown_core.start_announcer(self, info, self.announce)
+
+    def next_tick_delay(self):
+        # 最后一天对齐整秒（或十分之一秒）刷新，其余时间只在零点（或带时间的考试天数变化时）刷新
+        if not self.precise:
+            return ms_until_next_change(countdown_index)
+        self.clock.observe(self.scheduler.fired_at)
+        return self.clock.next_delay()
+
+    def sync_info(self):
+        sync_info(info, self.countdowns, self.encouragements)
+
+    def record_edit(self, op, **fields):
+        self.sync_info()
+        self.config_store.record(info, op, **fields)
+
+    def on_countdowns_changed(self, event, key, old, new):
+        # 名称变化时才需要更新选项菜单；连续的修改合并成一次
+        if old is None or new is None or old["name"] != new["name"]:
+            if not self.menu_dirty:
+                self.menu_dirty = True
+                self.after_idle(self.refresh_menu)
+        elif self.last_valid_exam == new["name"] or self.dashboard is not None:
+            self.request_update()
+
+    def refresh_menu(self):
+        self.menu_dirty = False
+        self.sync_info()
+        self.exam_options = exam_options(info, countdown_index)
+        if self.exam_menu is not None:
+            self.exam_menu.configure(values=self.exam_options)
+        self.select_exam(keep_selection(info, countdown_index, self.last_valid_exam))
+
+    def handle_command(self, command):
+        # 再次启动程序时转发过来的命令（见 single_instance.py）
+        if "select" in command:
+            if command["select"] in countdown_index:
+                self.select_exam(command["select"])
+        elif "settings" in command:
+            self.open_password_check()
+        elif "reload" in command:
+            try:
+                self.apply_config(read_config(config_file_path))
+            except (OSError, ValueError) as e:
+                print(f"配置文件重新加载失败: {str(e)}")
+        self.deiconify()
+        self.lift()
+
+    def select_exam(self, name):
+        self.selected_exam.set(name)
+        self.last_valid_exam = name
+        self.request_update()
+
+    def apply_config(self, new_info):
+        global recurring, config_loaded
+        # 设置窗口打开时先不重新加载，避免覆盖正在编辑的内容
+        if self.settings_window is not None:
+            return False
+        self.sync_info()
+        changes = reload_config(info, countdown_index, recurring, new_info, date.today())
+        if changes is None:
+            return
+        diff, recurring = changes
+        self.config_store.rebase()
+        # 索引已经按差异更新过，这里只替换存储中的条目，不再逐条通知
+        self.countdowns.load(info["countdowns"])
+        self.encouragements.load(info["encouragements"])
+        if diff["order_changed"] or "recurring" in diff["settings"]:
+            self.exam_options = exam_options(info, countdown_index)
+            self.exam_menu.configure(values=self.exam_options)
+        if "dashboard_count" in diff["settings"]:
+            self.set_dashboard(info.get("dashboard_count", 0))
+        if "precision_mode" in diff["settings"]:
+            self.set_precision(info.get("precision_mode"))
+        if "shared_snapshot" in diff["settings"] or "api_port" in diff["settings"]:
+            self.set_sharing()
+        if "encouragements_file" in diff["settings"]:
+            self.set_encouragements_file()
+        if "announcements" in diff["settings"]:
+            self.set_announcements()
+        divisor_sum.precompute(info["password"])
+        # 启动时没能加载的配置文件修好之后，内存中的内容已经与文件一致
+        config_loaded = True
+        self.warmed_date = None
+        self.select_exam(keep_selection(info, countdown_index, self.last_valid_exam))
+
+    def warm_speech_cache(self):
+        now = datetime.now()
+        if self.warmed_date == now.date():
+            return
+        self.warmed_date = now.date()
+        self.load_speech()
+        self.speech_backend.warm(warm_texts(countdown_index, self.last_valid_exam, self.picker, now))
+
+    @metrics.timed("speak")
+    def speak(self, text, kind=None):
+        self.load_speech().say(text, kind)
+
+    def announce(self, rule):
+        speech = announcement_text(rule, countdown_index, self.last_valid_exam, self.picker, datetime.now())
+        if speech is not None:
+            self.speak(*speech)
 
     def play_random_encouragement(self, event):
         current_time = datetime.now()
         time_diff = (current_time - self.last_speak_time).total_seconds()
         if time_diff >= 2 and self.selected_exam.get() != "设置":
-            encouragement = random.choice(info["encouragements"])
-            self.speak(encouragement)
+            encouragement = self.picker.next()
+            if encouragement:
+                self.speak(encouragement, "encouragement")
             self.last_speak_time = current_time
 
     def on_exam_change(self, *args):
@@ -164,250 +368,62 @@ class CountdownApp(ctk.CTk):
         else:
             self.last_valid_exam = selected
             label_text = self.get_label_text()
-            self.label.configure(text=label_text)
+            self.renderer.set_text(label_text)
             self.adjust_window_size(label_text)
-            self.speak(label_text)
+            if self.clock is not None:
+                self.scheduler.start()  # 新选中的考试可能需要换成按秒刷新，或者换回按天
+            # 时:分:秒读出来没有意义，也无法缓存，播报时仍然按天
+            self.speak(label_text if not self.precise else countdown_core.label_text(countdown_index, selected, datetime.now()), "countdown")
 
+    @metrics.timed("adjust_window_size")
     def adjust_window_size(self, label_text):
-        label_width = self.label.winfo_reqwidth()
-        menu_width = self.exam_menu.winfo_reqwidth()
-        total_width = label_width + menu_width + 40
-        self.geometry(f'{total_width}x{self.window_height}+{(self.winfo_screenwidth() - total_width) // 2}+0')
+        # 宽度都来自缓存，窗口大小和位置不变时不会调用 geometry
+        label_width = self.renderer.text_width(label_text)
+        total_width = label_width + self.menu_width + 40
+        window_height = self.window_height
+        if self.dashboard is not None:
+            total_width = max(total_width, self.dashboard_size[0] + 20)
+            window_height += self.dashboard_size[1]
+        return self.renderer.set_geometry(total_width, window_height, (self.screen_width - total_width) // 2, 0)
 
     def open_password_check(self):
-        global settings_open
-        if not settings_open:
-            settings_open = True
-            PasswordChecker(self)
+        if not config_loaded and os.path.exists(config_file_path):
+            # 使用的是默认配置而原文件还在，此时保存会覆盖原来的考试列表
+            self.show_message("提示", "配置文件没有成功加载，请先解决问题并重新启动，再修改设置！")
+        elif not self.settings_open:
+            self.settings_open = True
+            from settings_ui import PasswordChecker
+            self.dialog(PasswordChecker).open()
         else:
             self.show_message("提示", "设置窗口已经打开，请先关闭它！")
 
+    def dialog(self, cls):
+        # 每种对话框只创建一次，关闭时隐藏，下次打开时更新内容后重新显示
+        window = self.dialogs.get(cls)
+        if window is None or not window.winfo_exists():
+            window = self.dialogs[cls] = cls(self)
+        return window
+
     def show_message(self, title, message):
-        msg_box = ctk.CTkToplevel(self)
-        msg_box.overrideredirect(True)
-        msg_box.attributes('-topmost', True)
-        msg_box.geometry(f"300x130+{(self.winfo_screenwidth() - 300) // 2}+{self.winfo_y() + self.winfo_height() + 10}")
-        
-        ctk.CTkLabel(msg_box, text=message).pack(pady=20)
-        ctk.CTkButton(msg_box, text="确定", command=msg_box.destroy).pack(pady=10)
-        msg_box.grab_set()
-    
-class PasswordChecker(ctk.CTkToplevel):
-    def __init__(self, parent):
-        global settings_open
-        super().__init__(parent)
-        self.parent = parent
-        self.overrideredirect(True)
-        self.attributes('-topmost', True)
-        self.geometry(f"400x150+{(self.parent.winfo_screenwidth() - 400) // 2}+{self.parent.winfo_y() + self.parent.winfo_height() + 10}")
-        
-        ctk.CTkLabel(self, text="请输入密码").pack(pady=10)
-        self.answer_entry = ctk.CTkEntry(self)
-        self.answer_entry.pack(pady=5)
-        
-        btn_frame = ctk.CTkFrame(self)
-        btn_frame.pack(pady=5)
-        ctk.CTkButton(btn_frame, text="提交", command=self.check_password).pack(side=tk.LEFT, padx=10)
-        ctk.CTkButton(btn_frame, text="取消", command=self.destroy).pack(side=tk.LEFT, padx=10)
-
-    def check_password(self):
-        user_input = self.answer_entry.get()
-        correct_sum = calculate_divisor_sum(info["password"])
-        
-        try:
-            if int(user_input) == correct_sum:
-                self.destroy()
-                global settings_open
-                settings_open = False
-                SettingsWindow(self.parent)
-            else:
-                self.parent.show_message("错误", "密码不正确")
-        except:
-            self.parent.show_message("错误", "请输入有效数字")
-        finally:
-            if self.winfo_exists():
-                self.answer_entry.delete(0, tk.END)
-
-class SettingsWindow(ctk.CTkToplevel):
-    def __init__(self, parent):
-        global settings_open
-        super().__init__(parent)
-        self.parent = parent
-        self.overrideredirect(True)
-        self.attributes('-topmost', True)
-        self.geometry(f"800x600+{(self.parent.winfo_screenwidth() - 800) // 2}+{self.parent.winfo_y() + self.parent.winfo_height() + 10}")
-        
-        self.exam_frame = ctk.CTkScrollableFrame(self)
-        self.exam_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        self.exam_list = []
-        for exam in info["countdowns"]:
-            exam_frame = ctk.CTkFrame(self.exam_frame)
-            exam_frame.pack(fill=tk.X, pady=5)
-            
-            ctk.CTkLabel(exam_frame, text="考试名称:").grid(row=0, column=0, padx=5)
-            name_entry = ctk.CTkEntry(exam_frame)
-            name_entry.insert(0, exam["name"])
-            name_entry.configure(state="readonly")
-            name_entry.grid(row=0, column=1, padx=5)
-            
-            ctk.CTkLabel(exam_frame, text="日期:").grid(row=0, column=2, padx=5)
-            date_entry = ctk.CTkEntry(exam_frame)
-            date_entry.insert(0, exam["date"])
-            date_entry.configure(state="readonly")
-            date_entry.grid(row=0, column=3, padx=5)
-            
-            delete_button = ctk.CTkButton(exam_frame, text="删除", command=lambda e=exam_frame, n=exam["name"]: self.delete_exam(e, n))
-            delete_button.grid(row=0, column=4, padx=5)
-            
-            self.exam_list.append((exam_frame, name_entry, date_entry))
-        
-        add_exam_frame = ctk.CTkFrame(self.exam_frame)
-        add_exam_frame.pack(fill=tk.X, pady=5)
-        
-        ctk.CTkLabel(add_exam_frame, text="添加考试名称:").grid(row=0, column=0, padx=5)
-        self.new_exam_name = ctk.CTkEntry(add_exam_frame)
-        self.new_exam_name.grid(row=0, column=1, padx=5)
-        
-        ctk.CTkLabel(add_exam_frame, text="添加日期:").grid(row=0, column=2, padx=5)
-        self.new_exam_date = ctk.CTkEntry(add_exam_frame)
-        self.new_exam_date.grid(row=0, column=3, padx=5)
-        
-        ctk.CTkButton(add_exam_frame, text="添加", command=self.add_exam).grid(row=0, column=4, padx=5)
-        
-        self.encouragement_frame = ctk.CTkScrollableFrame(self)
-        self.encouragement_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        self.encouragement_list = []
-        for encouragement in info["encouragements"]:
-            encouragement_frame = ctk.CTkFrame(self.encouragement_frame)
-            encouragement_frame.pack(fill=tk.X, pady=5)
-            
-            encouragement_entry = ctk.CTkEntry(encouragement_frame)
-            encouragement_entry.insert(0, encouragement)
-            encouragement_entry.configure(state="readonly")
-            encouragement_entry.pack(side=tk.LEFT, padx=5)
-            
-            delete_button = ctk.CTkButton(encouragement_frame, text="删除", command=lambda e=encouragement_frame, c=encouragement: self.delete_encouragement(e, c))
-            delete_button.pack(side=tk.LEFT, padx=5)
-            
-            self.encouragement_list.append((encouragement_frame, encouragement_entry))
-        
-        add_encouragement_frame = ctk.CTkFrame(self.encouragement_frame)
-        add_encouragement_frame.pack(fill=tk.X, pady=5)
-        
-        ctk.CTkLabel(add_encouragement_frame, text="添加加油语:").grid(row=0, column=0, padx=5)
-        self.new_encouragement = ctk.CTkEntry(add_encouragement_frame)
-        self.new_encouragement.grid(row=0, column=1, padx=5)
-        
-        ctk.CTkButton(add_encouragement_frame, text="添加", command=self.add_encouragement).grid(row=0, column=2, padx=5)
-
-        ctk.CTkButton(self, text="保存", command=self.save_settings).pack(padx=10, pady=10, side=tk.LEFT)
-        ctk.CTkButton(self, text="取消", command=self.destroy).pack(padx=10, pady=10, side=tk.LEFT)
-
-    def save_settings(self):
-        try:
-            with open(config_file_path, "w", encoding="utf-8") as f:
-                json.dump(info, f, ensure_ascii=False, indent=4)
-            self.parent.show_message("成功", "设置已保存！")
-            self.destroy()
-            self.parent.update_label()
-            #restart_app(self)
-        except Exception as e:
-            self.parent.show_message("错误", f"保存失败：{str(e)}")
-    def add_exam(self):
-        name = self.new_exam_name.get().strip()
-        date = self.new_exam_date.get().strip()
-        if not name or not date:
-            self.parent.show_message("警告", "考试名称和日期不能为空！")
-            return
-        try:
-            datetime.strptime(date, "%Y/%m/%d")
-        except ValueError:
-            self.parent.show_message("警告", "日期格式不正确，请使用 YYYY/MM/DD 格式！")
-            return
+        load_customtkinter()
+        from dialogs import MessageToast
+        self.dialog(MessageToast).open(title, message)
     
-        # 添加到配置
-        info["countdowns"].append({"name": name, "date": date})
-        self.parent.exam_options.append(name)
-        self.parent.exam_menu.configure(values=self.parent.exam_options)
-        self.parent.exam_menu.set(name)
-        self.parent.update_label()
-    
-        # 更新设置窗口
-        exam_frame = ctk.CTkFrame(self.exam_frame)
-        exam_frame.pack(fill=tk.X, pady=5)
-        
-        ctk.CTkLabel(exam_frame, text="考试名称:").grid(row=0, column=0, padx=5)
-        name_entry = ctk.CTkEntry(exam_frame)
-        name_entry.insert(0, name)
-        name_entry.configure(state="readonly")
-        name_entry.grid(row=0, column=1, padx=5)
-        
-        ctk.CTkLabel(exam_frame, text="日期:").grid(row=0, column=2, padx=5)
-        date_entry = ctk.CTkEntry(exam_frame)
-        date_entry.insert(0, date)
-        date_entry.configure(state="readonly")
-        date_entry.grid(row=0, column=3, padx=5)
-        
-        delete_button = ctk.CTkButton(exam_frame, text="删除", command=lambda e=exam_frame, n=name: self.delete_exam(e, n))
-        delete_button.grid(row=0, column=4, padx=5)
-        
-        self.exam_list.append((exam_frame, name_entry, date_entry))
-    
-        # 清空输入框
-        self.new_exam_name.delete(0, tk.END)
-        self.new_exam_date.delete(0, tk.END)
-
-    def delete_exam(self, exam_frame, name):
-        # 从配置中删除
-        info["countdowns"] = [exam for exam in info["countdowns"] if exam["name"] != name]
-        self.exam_options = [exam["name"] for exam in info["countdowns"]] + ["设置"]
-        self.parent.exam_menu.configure(values=self.exam_options)
-        self.parent.exam_menu.set(self.exam_options[0])
-        self.parent.update_label()
-
-        # 从界面中删除
-        exam_frame.destroy()
-
-    def add_encouragement(self):
-        encouragement = self.new_encouragement.get().strip()
-        if not encouragement:
-            self.parent.show_message("警告", "加油语不能为空！")
-            return
-
-        # 添加到配置
-        info["encouragements"].append(encouragement)
-
-        # 更新设置窗口
-        encouragement_frame = ctk.CTkFrame(self.encouragement_frame)
-        encouragement_frame.pack(fill=tk.X, pady=5)
-        
-        encouragement_entry = ctk.CTkEntry(encouragement_frame)
-        encouragement_entry.insert(0, encouragement)
-        encouragement_entry.configure(state="readonly")
-        encouragement_entry.pack(side=tk.LEFT, padx=5)
-        
-        delete_button = ctk.CTkButton(encouragement_frame, text="删除", command=lambda e=encouragement_frame, c=encouragement: self.delete_encouragement(e, c))
-        delete_button.pack(side=tk.LEFT, padx=5)
-        
-        self.encouragement_list.append((encouragement_frame, encouragement_entry))
-        self.new_encouragement.delete(0, tk.END)
-
-    def delete_encouragement(self, encouragement_frame, encouragement):
-        info["encouragements"] = [c for c in info["encouragements"] if c != encouragement]
-        encouragement_frame.destroy()
-
-    def destroy(self):
-        global settings_open
-        settings_open = False
-        super().destroy()
-
 def restart_app(self):
+    single_instance.release()
     python = sys.executable
     os.execl(python, python, *sys.argv)
 
 if __name__ == '__main__':
+    # 已经有程序在运行时，把命令行参数转发给它然后退出，不再创建第二个窗口
+    instance = single_instance.claim(os.path.dirname(os.path.abspath(config_file_path)), sys.argv)
+    if instance is None:
+        sys.exit(0)
+    ensure_config(config_file_path)
+    info = load_config()
+    # 提前在后台算好密码对应的约数和，打开设置时不用等待
+    divisor_sum.precompute(info["password"])
+    startup_profile.mark("读取配置")
     try:
         app = CountdownApp()
         app.mainloop()
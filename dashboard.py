@@ -0,0 +1,41 @@
+import tkinter as tk
+import customtkinter as ctk
+
+from countdown_index import format_label
+
+# 看板模式：在主窗口下方同时显示最近的若干个考试。
+# 剩余天数由 CountdownIndex.upcoming_days 一次算出，这里只负责显示：
+# 标签控件重复使用，每次刷新只修改文字变化了的标签。
+
+DASHBOARD_FONT_SIZE = 24
+
+
+class Dashboard(ctk.CTkFrame):
+    def __init__(self, master, font_size=DASHBOARD_FONT_SIZE, **kwargs):
+        super().__init__(master, **kwargs)
+        self.font = ('Helvetica', int(font_size * 1.2))
+        self.labels = []
+        self.texts = []
+        self.changed = 0  # 累计修改过文字的标签数，用于观察刷新开销
+
+    def show(self, rows):
+        # rows 为按日期排好的 (名称, 剩余天数)，返回本次修改的标签数
+        changed = 0
+        for i, (name, days) in enumerate(rows):
+            text = format_label(name, days)
+            if i == len(self.labels):
+                label = ctk.CTkLabel(self, text=text, font=self.font, anchor="w")
+                label.pack(fill=tk.X, padx=10)
+                self.labels.append(label)
+                self.texts.append(text)
+                changed += 1
+            elif self.texts[i] != text:
+                self.labels[i].configure(text=text)
+                self.texts[i] = text
+                changed += 1
+        while len(self.labels) > len(rows):
+            self.labels.pop().destroy()
+            self.texts.pop()
+            changed += 1
+        self.changed += changed
+        return changed
@@ -0,0 +1,30 @@
+import customtkinter as ctk
+
+# 提示框：只创建一次，关闭时隐藏；已经显示时再来新的提示只更新文字，不会叠加出多个窗口。
+# customtkinter 的 Toplevel 创建一次要几十毫秒，还会挂上缩放和主题的回调，反复创建会越积越多。
+
+
+class MessageToast(ctk.CTkToplevel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.withdraw()
+        self.parent = parent
+        self.overrideredirect(True)
+        self.attributes('-topmost', True)
+        self.label = ctk.CTkLabel(self, text="")
+        self.label.pack(pady=20)
+        ctk.CTkButton(self, text="确定", command=self.close).pack(pady=10)
+        self.shown = 0
+
+    def open(self, title, message):
+        self.title(title)
+        self.label.configure(text=message)
+        self.geometry(f"300x130+{(self.parent.winfo_screenwidth() - 300) // 2}+{self.parent.winfo_y() + self.parent.winfo_height() + 10}")
+        self.deiconify()
+        self.lift()
+        self.grab_set()
+        self.shown += 1
+
+    def close(self):
+        self.grab_release()
+        self.withdraw()
@@ -0,0 +1,74 @@
+class EntryStore:
+    """按插入顺序保存的条目，每个条目有一个固定不变的编号（key）。
+
+    增加、删除、修改都是 O(1)；values() / items() 返回的列表只在修改后第一次调用时重建，
+    调用方不要修改这些列表。subscribe(listener) 之后每次修改都会调用
+    listener(event, key, old, new)，event 为 "add"、"remove" 或 "update"。
+    大量条目一起变化时（例如重新读取配置文件）用 load() 整体替换，不逐条通知。
+    """
+
+    def __init__(self, values=()):
+        self.entries = {}
+        self.next_key = 1
+        self.listeners = []
+        self.cached_items = None
+        self.cached_values = None
+        self.load(values)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self.listeners.remove(listener)
+
+    def notify(self, event, key, old, new):
+        self.cached_items = None
+        self.cached_values = None
+        for listener in list(self.listeners):
+            listener(event, key, old, new)
+
+    def load(self, values):
+        # 整体替换全部条目（例如重新读取配置文件后），不发送通知，旧的编号全部作废
+        self.entries = {}
+        for value in values:
+            self.entries[self.next_key] = value
+            self.next_key += 1
+        self.cached_items = None
+        self.cached_values = None
+
+    def add(self, value):
+        key = self.next_key
+        self.next_key += 1
+        self.entries[key] = value
+        self.notify("add", key, None, value)
+        return key
+
+    def remove(self, key):
+        old = self.entries.pop(key)
+        self.notify("remove", key, old, None)
+        return old
+
+    def update(self, key, value):
+        old = self.entries[key]
+        self.entries[key] = value
+        self.notify("update", key, old, value)
+        return old
+
+    def get(self, key, default=None):
+        return self.entries.get(key, default)
+
+    def items(self):
+        if self.cached_items is None:
+            self.cached_items = list(self.entries.items())
+        return self.cached_items
+
+    def values(self):
+        if self.cached_values is None:
+            self.cached_values = list(self.entries.values())
+        return self.cached_values
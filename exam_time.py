@@ -0,0 +1,171 @@
+import time
+from datetime import date, datetime, timedelta
+
+# 考试日期和时刻的解析。date 字段除了原来的 2025/3/1，也接受其他工具导出的格式：
+#   2025-03-01   2025-03-01 09:00   2025/3/1 9:00:30   2025-03-01T09:00:00+08:00   2025-03-01T09:00+08   2025-03-01T01:00Z
+# 另外可以写 "time": "09:00" 和 "tz": "America/New_York"（IANA 时区名，Windows 上需要 pip install tzdata）。
+# 常见格式由手写的解析器处理，其余格式才交给 strptime 逐个尝试。
+# 只有日期、没有时间和时区的考试仍然按本地日期计算天数，与原来完全相同；
+# 带时间或时区的考试在加载时换算成一个 UTC 时间戳，之后每次刷新只做整数运算。
+
+# 手写解析器不认识时依次尝试的格式
+FALLBACK_FORMATS = ["%Y年%m月%d日", "%Y年%m月%d日 %H:%M", "%Y%m%d", "%Y%m%dT%H%M%S", "%Y%m%dT%H%M%SZ", "%d.%m.%Y"]
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+zones = {}
+offsets = {}
+midnights = {}
+
+
+def number(text, low, high):
+    # low 到 high 位 ASCII 数字，否则返回 None（int() 会接受空格、正负号和下划线，这里不行）
+    if low <= len(text) <= high and text.isdigit() and text.isascii():
+        return int(text)
+    return None
+
+
+def parse_offset(text):
+    # "Z"、"+08"、"-0530"、"+08:00" -> 秒数；格式不对时返回 None
+    if text == "Z":
+        return 0
+    if len(text) == 3:
+        minutes = 0
+    elif len(text) == 5:
+        minutes = number(text[3:], 2, 2)
+    elif len(text) == 6 and text[3] == ":":
+        minutes = number(text[4:], 2, 2)
+    else:
+        return None
+    hours = number(text[1:3], 2, 2)
+    if text[0] not in "+-" or hours is None or minutes is None or hours > 23 or minutes > 59:
+        return None
+    return (-1 if text[0] == "-" else 1) * (hours * 3600 + minutes * 60)
+
+
+def parse_fast(text):
+    # 返回 (年, 月, 日, 时, 分, 秒, UTC 偏移秒数)，时间和偏移可能为 None；不认识的格式返回 None
+    head, sep, rest = text.partition(" ") if " " in text else text.partition("T")
+    parts = head.split("/" if "/" in head else "-")
+    if len(parts) != 3:
+        return None
+    year = number(parts[0], 4, 4)
+    month = number(parts[1], 1, 2)
+    day = number(parts[2], 1, 2)
+    if year is None or month is None or day is None:
+        return None
+    if not sep:
+        return year, month, day, None, None, None, None
+    if not rest:
+        return None
+    offset = None
+    if rest[-1] == "Z":
+        offset, rest = 0, rest[:-1]
+    else:
+        i = max(rest.rfind("+"), rest.rfind("-"))
+        if i >= 0:
+            offset = parse_offset(rest[i:])
+            if offset is None:
+                return None
+            rest = rest[:i]
+    clock = rest.split(":")
+    if len(clock) not in (2, 3):
+        return None
+    hour = number(clock[0], 1, 2)
+    minute = number(clock[1], 2, 2)
+    second = 0
+    if len(clock) == 3:
+        # 小数秒舍去
+        whole, _, fraction = clock[2].replace(",", ".").partition(".")
+        second = number(whole, 2, 2)
+        if fraction and number(fraction, 1, 9) is None:
+            return None
+    if hour is None or minute is None or second is None:
+        return None
+    return year, month, day, hour, minute, second, offset
+
+
+def parse_when(text):
+    """解析 date 字段，返回 (date, (时, 分, 秒) 或 None, UTC 偏移秒数或 None)。格式不对时抛出 ValueError。"""
+    if not isinstance(text, str):
+        raise ValueError(f"无法识别的日期: {text}")
+    text = text.strip()
+    parts = parse_fast(text)
+    if parts is not None:
+        year, month, day, hour, minute, second, offset = parts
+        target = date(year, month, day)
+        if hour is None:
+            return target, None, None
+        if not (hour < 24 and minute < 60 and second < 60):
+            raise ValueError(f"时间超出范围: {text}")
+        return target, (hour, minute, second), offset
+    for fmt in FALLBACK_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        has_time = "%H" in fmt
+        return parsed.date(), (parsed.hour, parsed.minute, parsed.second) if has_time else None, 0 if fmt.endswith("Z") else None
+    raise ValueError(f"无法识别的日期: {text}")
+
+
+def parse_clock(text):
+    # "time" 字段：时:分 或 时:分:秒
+    parts = parse_fast(f"2000-01-01 {text}") if isinstance(text, str) else None
+    if parts is None or parts[6] is not None or not (parts[3] < 24 and parts[4] < 60 and parts[5] < 60):
+        raise ValueError(f"时间格式应为 时:分，例如 09:00: {text}")
+    return parts[3:6]
+
+
+def zone(name):
+    # 时区对象只创建一次；zoneinfo 只在用到时区时才导入
+    found = zones.get(name)
+    if found is None:
+        try:
+            from zoneinfo import ZoneInfo
+            found = zones[name] = ZoneInfo(name)
+        except ImportError:
+            raise ValueError("当前的 Python 不支持时区（需要 3.9 及以上）")
+        except (KeyError, ValueError, TypeError, OSError):
+            raise ValueError(f"未知的时区: {name}（Windows 上需要 pip install tzdata）")
+    return found
+
+
+def zone_offset(name, seconds):
+    # 某个时区在某个本地时刻（按 UTC 计的秒数表示）的 UTC 偏移，按 (时区, 时刻) 缓存；
+    # 同一时间、同一地点的多个考试只查一次时区数据
+    if name == "UTC":
+        return 0  # 不需要 tzdata
+    key = (name, seconds)
+    offset = offsets.get(key)
+    if offset is None:
+        local = datetime(1970, 1, 1) + timedelta(seconds=seconds)
+        offset = offsets[key] = int(local.replace(tzinfo=zone(name)).utcoffset().total_seconds())
+    return offset
+
+
+def midnight_epoch(target):
+    # 本地时间某天零点的时间戳，每个日期只计算一次
+    epoch = midnights.get(target)
+    if epoch is None:
+        epoch = midnights[target] = int(time.mktime(target.timetuple()))
+    return epoch
+
+
+def exam_target(exam):
+    """返回 (日期, 时间戳)。只有日期的考试时间戳为 None，按本地日期计算天数；
+    否则时间戳为考试时刻的 UTC 秒数，日期为这个时刻在本地的日期（用于排序和"从今天起"）。"""
+    target, clock, offset = parse_when(exam["date"])
+    if "time" in exam:
+        clock = parse_clock(exam["time"])
+    tz = exam.get("tz")
+    if clock is None and offset is None and tz is None:
+        return target, None
+    hour, minute, second = clock or (0, 0, 0)
+    seconds = (target.toordinal() - EPOCH_ORDINAL) * 86400 + hour * 3600 + minute * 60 + second
+    if offset is not None:
+        epoch = seconds - offset
+    elif tz is not None:
+        epoch = seconds - zone_offset(tz, seconds)
+    else:
+        epoch = int(time.mktime((target.year, target.month, target.day, hour, minute, second, 0, 0, -1)))
+    return date.fromtimestamp(epoch), epoch
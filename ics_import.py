@@ -0,0 +1,187 @@
+import os
+import sys
+from datetime import date
+
+from countdown_core import read_config
+from exam_time import zone
+from persistence import atomic_write_json, replay_journal
+from recurrence import occurrences, parse_compact_date, parse_rule
+
+# 从 iCalendar（.ics）文件导入考试：python ics_import.py 日历.ics [配置文件]
+# 逐行读取，一次只保存当前事件的几个字段，几万个事件的日历也不会整个读进内存。
+# 一次性的考试追加到 countdowns；带 RRULE 的事件只保存规则，写入 recurring，由程序按需生成日期。
+# 已经过去的事件、不支持的规则和重复的条目会被跳过。写入配置文件后，正在运行的程序会自动重新加载。
+# 一次性考试的 DTSTART 带时间时同时写入 time 和 tz（见 exam_time.py），重复考试仍然按天计算。
+
+WANTED = {"SUMMARY", "DTSTART", "RRULE", "EXDATE"}
+
+
+def unfold(lines):
+    # 以空格或制表符开头的行是上一行的续行
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def split_property(line):
+    # "DTSTART;TZID=\"Asia/Shanghai\":20250301T090000" -> ("DTSTART", "TZID=...", "20250301T090000")
+    # 参数值可以带引号，引号里的冒号不算分隔符
+    quoted = False
+    for i, c in enumerate(line):
+        if c == '"':
+            quoted = not quoted
+        elif c == ":" and not quoted:
+            head, value = line[:i], line[i + 1:]
+            name, _, params = head.partition(";")
+            return name.upper(), params, value
+    return line.upper(), "", ""
+
+
+def unescape(text):
+    out = []
+    chars = iter(text)
+    for c in chars:
+        if c == "\\":
+            c = next(chars, "")
+            c = "\n" if c in ("n", "N") else c
+        out.append(c)
+    return "".join(out)
+
+
+def read_events(lines):
+    # 逐个产生 VEVENT 中需要的字段；嵌套的 VALARM 等组件直接忽略
+    event = None
+    depth = 0
+    for line in unfold(lines):
+        name, params, value = split_property(line)
+        if name == "BEGIN":
+            if value.upper() == "VEVENT" and event is None:
+                event = {"EXDATE": []}
+                depth = 0
+            elif event is not None:
+                depth += 1
+        elif name == "END":
+            if event is None:
+                continue
+            if depth:
+                depth -= 1
+            elif value.upper() == "VEVENT":
+                yield event
+                event = None
+        elif event is not None and not depth and name in WANTED:
+            if name == "EXDATE":
+                event["EXDATE"].extend(v for v in value.split(",") if v)
+            else:
+                event[name] = (params, value)
+
+
+def format_date(d):
+    return f"{d.year}/{d.month}/{d.day}"
+
+
+def start_time(params, value):
+    # DTSTART 带时间时返回 {"time": "09:00", "tz": 时区}；Z 结尾为 UTC，没有 TZID 时按本地时间。
+    # Outlook 等写入的 Windows 时区名无法识别，这时也按本地时间，避免整个配置文件无法加载
+    if "T" not in value:
+        return {}
+    clock = value[value.index("T") + 1:]
+    fields = {"time": f"{clock[0:2]}:{clock[2:4]}"}
+    if clock.endswith("Z"):
+        fields["tz"] = "UTC"
+        return fields
+    for param in params.split(";"):
+        key, _, tz = param.partition("=")
+        if key.upper() == "TZID":
+            tz = tz.strip('"')
+            try:
+                zone(tz)
+                fields["tz"] = tz
+            except ValueError:
+                pass
+    return fields
+
+
+def import_events(info, events, today):
+    # 把事件合并进 info，返回各类数量
+    counts = {"added": 0, "recurring": 0, "past": 0, "unsupported": 0, "duplicate": 0}
+    countdowns = info["countdowns"]
+    recurring = info.get("recurring", [])
+    seen = {(exam["name"], exam["date"]) for exam in countdowns}
+    seen_rules = {(item["name"], item["start"], item["rule"]) for item in recurring}
+    for event in events:
+        try:
+            name = unescape(event["SUMMARY"][1]).strip()
+            start = parse_compact_date(event["DTSTART"][1])
+            rule_text = event["RRULE"][1] if "RRULE" in event else None
+            rule = parse_rule(rule_text) if rule_text else None
+            exdates = [parse_compact_date(text) for text in event["EXDATE"]]
+        except (KeyError, ValueError, IndexError):
+            counts["unsupported"] += 1
+            continue
+        if not name:
+            counts["unsupported"] += 1
+            continue
+        if rule is None:
+            if start < today:
+                counts["past"] += 1
+                continue
+            key = (name, format_date(start))
+            if key in seen:
+                counts["duplicate"] += 1
+                continue
+            seen.add(key)
+            exam = {"name": name, "date": key[1]}
+            exam.update(start_time(*event["DTSTART"]))
+            countdowns.append(exam)
+            counts["added"] += 1
+            continue
+        if next(occurrences(start, rule, exdates, after=today), None) is None:
+            counts["past"] += 1
+            continue
+        key = (name, format_date(start), rule_text.upper())
+        if key in seen_rules:
+            counts["duplicate"] += 1
+            continue
+        seen_rules.add(key)
+        item = {"name": name, "start": key[1], "rule": key[2]}
+        if exdates:
+            item["exdates"] = [format_date(d) for d in exdates]
+        recurring.append(item)
+        counts["recurring"] += 1
+    if recurring:
+        info["recurring"] = recurring
+    return counts
+
+
+def import_file(ics_path, config_path, today=None):
+    info = read_config(config_path)
+    # 程序尚未整理进配置文件的修改也一并写入，否则替换配置文件后日志会作废
+    replay_journal(config_path, info)
+    with open(ics_path, "r", encoding="utf-8-sig") as f:
+        counts = import_events(info, read_events(f), today or date.today())
+    if counts["added"] or counts["recurring"]:
+        atomic_write_json(config_path, info)
+    return counts
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: python ics_import.py 日历.ics [配置文件]")
+        sys.exit(2)
+    config_path = sys.argv[2] if len(sys.argv) > 2 else os.environ.get("DAOJISHI_CONFIG", "D:/config.json")
+    counts = import_file(sys.argv[1], config_path)
+    print(f"导入考试 {counts['added']} 个，重复考试 {counts['recurring']} 个；"
+          f"跳过已过去的 {counts['past']} 个、不支持的 {counts['unsupported']} 个、重复的 {counts['duplicate']} 个")
+
+
+if __name__ == "__main__":
+    main()
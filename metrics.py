@@ -0,0 +1,173 @@
+import json
+import os
+import sys
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# 运行时指标：事件循环延迟、各个刷新步骤的耗时分布、窗口和定时回调的数量、语音延迟。
+# 用 --metrics 参数或 DAOJISHI_METRICS=1 开启；关闭时 timed() 原样返回函数，没有任何额外开销。
+# 开启后每隔 DAOJISHI_METRICS_INTERVAL 秒（默认 60）向指标文件追加一行 JSON，文件超过 1 MB 时轮换；
+# 按 Ctrl+Alt+M 立即在控制台打印一份汇总。
+
+enabled = "--metrics" in sys.argv or bool(os.environ.get("DAOJISHI_METRICS"))
+
+# 耗时分布的桶上限（毫秒）
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000]
+# 事件循环延迟的探测间隔
+LAG_PROBE_MS = 250
+MAX_BYTES = 1024 * 1024
+BACKUP_COUNT = 3
+HOTKEY = "<Control-Alt-m>"
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, fraction):
+        # 按桶估计，返回所在桶的上限（不超过最大值）
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(BUCKETS_MS[i], self.max) if i < len(BUCKETS_MS) else self.max
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": self.max,
+            "buckets": self.counts,
+        }
+
+
+histograms = {}
+
+
+def record(name, ms):
+    histogram = histograms.get(name)
+    if histogram is None:
+        histogram = histograms[name] = Histogram()
+    histogram.add(ms)
+
+
+def timed(name):
+    def decorate(func):
+        if not enabled:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, (time.perf_counter() - start) * 1e3)
+        return wrapper
+    return decorate
+
+
+class Monitor:
+    """挂在 Tk 根窗口上：探测事件循环延迟、定期写指标文件、绑定热键。
+
+    get_speech() 返回当前的 SpeechEngine（还没有加载时返回 None）。
+    """
+
+    def __init__(self, root, path, get_speech=None, interval=None):
+        import logging
+        from logging.handlers import RotatingFileHandler
+        self.root = root
+        self.get_speech = get_speech
+        self.interval = int(float(interval or os.environ.get("DAOJISHI_METRICS_INTERVAL", 60)) * 1000)
+        self.due = None
+        self.started = time.time()
+        self.logger = logging.getLogger("daojishi.metrics")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        handler = RotatingFileHandler(path, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.logger.addHandler(handler)
+
+    def start(self):
+        self.schedule_probe()
+        self.root.after(self.interval, self.flush)
+        self.root.bind_all(HOTKEY, self.print_report)
+
+    def schedule_probe(self):
+        self.due = time.monotonic() + LAG_PROBE_MS / 1000
+        self.root.after(LAG_PROBE_MS, self.probe)
+
+    def probe(self):
+        # 定时回调实际执行时间与预定时间之差，就是事件循环被占用的时间
+        record("event_loop_lag", max(0.0, (time.monotonic() - self.due) * 1e3))
+        self.schedule_probe()
+
+    def counters(self):
+        import tkinter as tk
+        toplevels = sum(1 for child in self.root.winfo_children() if isinstance(child, tk.Toplevel))
+        return {
+            "toplevels": toplevels,
+            "after_callbacks": len(self.root.tk.splitlist(self.root.tk.call("after", "info"))),
+        }
+
+    def snapshot(self):
+        data = {
+            "time": time.time(),
+            "uptime_s": time.time() - self.started,
+            "counters": self.counters(),
+            "histograms": {name: h.as_dict() for name, h in histograms.items()},
+        }
+        speech = self.get_speech() if self.get_speech is not None else None
+        if speech is not None:
+            latency = Histogram()
+            for seconds in list(speech.latencies):
+                latency.add(seconds * 1e3)
+            data["speech"] = dict(speech.stats, latency=latency.as_dict())
+        return data
+
+    def flush(self):
+        try:
+            self.logger.info(json.dumps(self.snapshot(), ensure_ascii=False))
+        except OSError as e:
+            print(f"写入指标文件失败: {str(e)}")
+        self.root.after(self.interval, self.flush)
+
+    def report(self):
+        data = self.snapshot()
+        lines = [f"运行 {data['uptime_s']:.0f} 秒，窗口 {data['counters']['toplevels']} 个，待执行的定时回调 {data['counters']['after_callbacks']} 个"]
+        lines.append(f"{'指标':<20}{'次数':>8}{'平均(ms)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'最大(ms)':>10}")
+        items = list(data["histograms"].items())
+        if "speech" in data:
+            items.append(("speech_latency", data["speech"]["latency"]))
+        for name, h in items:
+            lines.append(f"{name:<20}{h['count']:>8}{h['mean_ms']:>10.2f}{h['p50_ms']:>10.2f}{h['p95_ms']:>10.2f}{h['max_ms']:>10.2f}")
+        return "\n".join(lines)
+
+    def print_report(self, event=None):
+        print(self.report())
+
+
+def attach(root, path, get_speech=None):
+    # 未开启时什么也不做，返回 None
+    if not enabled:
+        return None
+    monitor = Monitor(root, path, get_speech)
+    monitor.start()
+    return monitor
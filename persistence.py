@@ -0,0 +1,311 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+JOURNAL_SUFFIX = ".journal"
+# 条目超过这个数量时不再缩进排版，写入量和耗时都小得多
+PRETTY_LIMIT = 2000
+
+
+def file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def dump_config(info, f):
+    if len(info["countdowns"]) + len(info["encouragements"]) > PRETTY_LIMIT:
+        json.dump(info, f, ensure_ascii=False, separators=(",", ":"))
+    else:
+        json.dump(info, f, ensure_ascii=False, indent=4)
+
+
+def atomic_write_json(path, info):
+    # 先写临时文件再改名，写到一半崩溃也不会留下损坏的配置文件
+    import tempfile  # 只在保存时才需要，不拖慢启动
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            dump_config(info, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def logged_exam(record, key="exam"):
+    # 日志中记录完整的考试条目（包括 time、tz）；旧版本的日志只有 name、date 和 old_name、old_date
+    if key in record:
+        return record[key]
+    prefix = "old_" if key == "old" else ""
+    return {"name": record[prefix + "name"], "date": record[prefix + "date"]}
+
+
+def find_exam(countdowns, exam):
+    # 内容相同的条目没有区别，取第一个；旧版本的日志没有 time、tz，只按 name 和 date 查找
+    try:
+        return countdowns.index(exam)
+    except ValueError:
+        pass
+    for i, other in enumerate(countdowns):
+        if other["name"] == exam["name"] and other["date"] == exam["date"]:
+            return i
+    raise ValueError(f"日志中的考试不在配置中: {exam['name']} {exam['date']}")
+
+
+def apply_op(info, record):
+    # delete_exam / delete_encouragement 是旧版本写下的日志，删除全部同名条目
+    # 新版本只删除或修改一个条目，对应 remove_* / update_exam
+    op = record["op"]
+    if op == "add_exam":
+        info["countdowns"].append(logged_exam(record))
+    elif op == "delete_exam":
+        info["countdowns"] = [exam for exam in info["countdowns"] if exam["name"] != record["name"]]
+    elif op == "remove_exam":
+        countdowns = info["countdowns"]
+        del countdowns[find_exam(countdowns, logged_exam(record))]
+    elif op == "update_exam":
+        countdowns = info["countdowns"]
+        countdowns[find_exam(countdowns, logged_exam(record, "old"))] = logged_exam(record)
+    elif op == "add_encouragement":
+        info["encouragements"].append(record["text"])
+    elif op == "delete_encouragement":
+        info["encouragements"] = [c for c in info["encouragements"] if c != record["text"]]
+    elif op == "remove_encouragement":
+        info["encouragements"].remove(record["text"])
+    else:
+        raise ValueError(f"未知的日志操作: {op}")
+
+
+def replay_journal(path, info):
+    # 日志第一行记录它所基于的配置文件签名；配置文件被替换过则日志作废
+    try:
+        with open(path + JOURNAL_SUFFIX, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return 0
+    try:
+        if not lines or json.loads(lines[0]).get("base") != file_signature(path):
+            return 0
+    except ValueError:
+        return 0
+    count = 0
+    for line in lines[1:]:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            break  # 最后一行可能没有写完
+        apply_op(info, record)
+        count += 1
+    return count
+
+
+def move_aside(path):
+    # 配置文件或日志无法加载时，把两者改名保存，之后写入的配置不会覆盖原来的内容；返回新的文件名。
+    # 改名不改变修改时间和大小，日志仍然可以用 replay_journal(新文件名, ...) 重放
+    # 同一秒内多次失败时加上序号；先用 O_EXCL 占住新文件名，不会覆盖之前改名保存的文件
+    stem = f"{path}.broken-{time.strftime('%Y%m%d-%H%M%S')}"
+    aside = stem
+    n = 0
+    while True:
+        try:
+            os.close(os.open(aside, os.O_WRONLY | os.O_CREAT | os.O_EXCL))
+            break
+        except FileExistsError:
+            n += 1
+            aside = f"{stem}-{n}"
+    try:
+        os.replace(path, aside)
+    except OSError:
+        os.remove(aside)
+        raise
+    if os.path.exists(path + JOURNAL_SUFFIX):
+        os.replace(path + JOURNAL_SUFFIX, aside + JOURNAL_SUFFIX)
+    return aside
+
+
+def snapshot(info):
+    # 修改总是替换列表或追加新的字典，浅拷贝列表就足以得到一致的快照
+    return dict(info, countdowns=list(info["countdowns"]), encouragements=list(info["encouragements"]))
+
+
+class ConfigStore:
+    """后台线程延迟写入配置：连续的修改合并成一次原子写入，界面线程不等待磁盘。
+
+    journal=True 时每次修改先追加到 <配置文件>.journal，累计 compact_every 条后
+    才整体重写配置文件并清空日志。save() 返回一个编号，写入完成后 result(编号) 给出结果，
+    界面线程可以用 when_saved() 在写入完成后再提示用户。
+    """
+
+    def __init__(self, path, delay=0.5, journal=False, compact_every=200, on_saved=None):
+        self.path = path
+        self.delay = delay
+        self.journal = journal
+        self.compact_every = compact_every
+        self.on_saved = on_saved
+        self.cond = threading.Condition()
+        self.pending = None  # (快照, 快照包含的日志序号, 保存编号)
+        self.due = 0
+        self.seq = 0
+        self.journal_records = []  # 上次整理之后的 (序号, 记录)
+        self.journal_file = None
+        self.last_error = None
+        self.generation = 0  # 最近一次 save() 的编号
+        self.finished = 0  # 已经写完（成功或失败）的最大编号
+        self.finished_error = None  # 这次写入的错误
+        self.closed = False
+        self.busy = False
+        self.writes = 0
+        self.thread = threading.Thread(target=self.run, name="config-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def record(self, info, op, **fields):
+        # 记录一次编辑；开启日志时先追加日志，整理前不重写整个文件
+        if self.journal:
+            with self.cond:
+                try:
+                    self.append_journal(dict(fields, op=op))
+                except OSError as e:
+                    self.last_error = e
+                else:
+                    if len(self.journal_records) < self.compact_every:
+                        return
+        self.save(info, self.delay)
+
+    def save(self, info, delay=0):
+        data = snapshot(info)
+        with self.cond:
+            self.generation += 1
+            self.pending = (data, self.seq, self.generation)
+            self.due = time.monotonic() + delay
+            self.cond.notify_all()
+            return self.generation
+
+    def result(self, generation):
+        # 编号为 generation 的保存还没写完时返回 (False, None)，否则返回 (True, 错误或 None)；
+        # 后面的保存包含前面的修改，合并写入时结果相同
+        with self.cond:
+            if self.finished < generation:
+                return False, None
+            return True, self.finished_error
+
+    def when_saved(self, widget, generation, callback, interval=50):
+        # 在界面线程中用 widget.after 轮询，写入完成后调用 callback(错误或 None)
+        def poll():
+            done, error = self.result(generation)
+            if done:
+                callback(error)
+            else:
+                widget.after(interval, poll)
+        widget.after(interval, poll)
+
+    def append_journal(self, record):
+        if self.journal_file is None:
+            self.reset_journal([])
+        self.seq += 1
+        self.journal_records.append((self.seq, record))
+        self.journal_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.journal_file.flush()
+
+    def reset_journal(self, records):
+        # 以当前配置文件为基础重写日志，只保留尚未写入配置文件的记录
+        if self.journal_file is not None:
+            self.journal_file.close()
+        journal_path = self.path + JOURNAL_SUFFIX
+        with open(journal_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(json.dumps({"base": file_signature(self.path)}) + "\n")
+            for _, record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(journal_path + ".tmp", journal_path)
+        self.journal_records = records
+        self.journal_file = open(journal_path, "a", encoding="utf-8")
+
+    def rebase(self):
+        # 配置文件被外部替换后调用：丢弃尚未写入的修改和旧日志
+        with self.cond:
+            if self.pending is not None:
+                self.finished = self.pending[2]
+                self.finished_error = RuntimeError("配置文件已被外部修改，本次修改没有保存")
+            self.pending = None
+            self.journal_records = []
+            if self.journal_file is not None:
+                self.journal_file.close()
+                self.journal_file = None
+            try:
+                os.remove(self.path + JOURNAL_SUFFIX)
+            except OSError:
+                pass
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.closed and (self.pending is None or time.monotonic() < self.due):
+                    self.cond.wait(None if self.pending is None else self.due - time.monotonic())
+                if self.pending is None:
+                    return
+                data, seq, generation = self.pending
+                self.pending = None
+                self.busy = True
+            self.write(data, seq, generation)
+            with self.cond:
+                self.busy = False
+                self.cond.notify_all()
+
+    def write(self, data, seq, generation):
+        error = None
+        try:
+            atomic_write_json(self.path, data)
+            self.writes += 1
+            self.last_error = None
+            with self.cond:
+                if self.journal:
+                    self.reset_journal([item for item in self.journal_records if item[0] > seq])
+                elif os.path.exists(self.path + JOURNAL_SUFFIX):
+                    os.remove(self.path + JOURNAL_SUFFIX)
+        except Exception as e:
+            error = self.last_error = e
+            print(f"保存配置失败: {str(e)}")
+        if error is None and self.on_saved is not None:
+            self.on_saved()
+        with self.cond:
+            self.finished = max(self.finished, generation)
+            self.finished_error = error
+
+    def compact_leftover(self, info):
+        # 上次运行留下的日志已经在加载时重放进 info，立即整理进配置文件。
+        # 只能在配置文件和日志都成功加载之后调用，否则会用不完整的内容覆盖原来的配置
+        if os.path.exists(self.path + JOURNAL_SUFFIX):
+            self.save(info)
+
+    def flush(self, timeout=5):
+        # 立即写入尚未保存的修改并等待完成
+        with self.cond:
+            self.due = 0
+            self.cond.notify_all()
+            return self.cond.wait_for(lambda: self.pending is None and not self.busy, timeout)
+
+    def close(self):
+        if self.closed:
+            return
+        with self.cond:
+            self.closed = True
+            pending = self.pending
+            self.pending = None
+            self.cond.notify_all()
+        self.thread.join(timeout=5)
+        if pending is not None:
+            self.write(*pending)
+        if self.journal_file is not None:
+            self.journal_file.close()
+            self.journal_file = None
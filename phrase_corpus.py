@@ -0,0 +1,257 @@
+import os
+import struct
+import sys
+
+# 大型加油语库：配置中的 encouragements_file 指向一个 UTF-8 文本文件，每行一句（空行忽略）。
+# 第一次打开时扫描一遍，把每句的起始偏移写进 <文件>.idx；之后直接映射索引和正文，
+# 取第 i 句只需要读一个偏移再找到行尾，内存占用与语句数量无关。
+# ShuffleBag 在全部语句轮完之前不会重复，同样只保存几个整数。
+# 打开文件（可能要建立索引）在后台线程中进行，mmap、random 等也只在用到时才导入，不拖慢首次绘制。
+
+INDEX_SUFFIX = ".idx"
+MAGIC = b"DJPI"
+FORMAT_VERSION = 1
+# 魔数、版本、原文件的修改时间和大小
+HEADER = struct.Struct("<4sH2xqq")
+# 建立索引时每攒够这么多偏移写一次文件
+FLUSH_EVERY = 65536
+ROUNDS = 4
+MASK64 = (1 << 64) - 1
+
+
+def mix(value, key):
+    # Feistel 的轮函数：乘法加移位异或，把 value 和 key 打散
+    value = ((value ^ key) * 0x9E3779B97F4A7C15) & MASK64
+    return value ^ (value >> 29)
+
+
+class ShuffleBag:
+    """在 [0, n) 中不重复地随机取下标，一轮取完后换一个新的随机顺序。
+
+    用带密钥的 Feistel 网络作为 [0, 4^h) 上的随机排列，跳过不小于 n 的值，
+    平均每次最多计算四次排列，状态只有几个整数。
+    """
+
+    def __init__(self, n=0, rng=None):
+        if rng is None:
+            import random
+            rng = random.Random()
+        self.rng = rng
+        self.resize(n)
+
+    def __len__(self):
+        return self.n
+
+    def resize(self, n):
+        self.n = n
+        self.half = max(1, ((n - 1).bit_length() + 1) // 2) if n > 1 else 1
+        self.shuffle()
+
+    def shuffle(self):
+        self.keys = [self.rng.getrandbits(64) for _ in range(ROUNDS)]
+        self.position = 0
+        self.taken = 0
+
+    def permute(self, x):
+        half = self.half
+        mask = (1 << half) - 1
+        left, right = x >> half, x & mask
+        for key in self.keys:
+            left, right = right, left ^ (mix(right, key) & mask)
+        return (left << half) | right
+
+    def scan(self, position, count):
+        # 从 position 开始取 count 个下标，返回 (下标列表, 新的 position)
+        domain = 1 << (2 * self.half)
+        found = []
+        while len(found) < count and position < domain:
+            x = self.permute(position)
+            position += 1
+            if x < self.n:
+                found.append(x)
+        return found, position
+
+    def next(self):
+        if not self.n:
+            raise IndexError("没有可以选择的加油语")
+        found, self.position = self.scan(self.position, 1)
+        self.taken += 1
+        if self.taken == self.n:
+            self.shuffle()
+        return found[0]
+
+    def peek(self, count):
+        # 本轮剩下的下标中接下来的若干个，不改变状态（用于预热语音缓存）
+        return self.scan(self.position, count)[0]
+
+
+def build_index(path, index_path):
+    import mmap
+    from array import array
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else b""
+    temp_path = index_path + ".tmp"
+    try:
+        with open(temp_path, "wb") as out:
+            out.write(HEADER.pack(MAGIC, FORMAT_VERSION, st.st_mtime_ns, st.st_size))
+            offsets = array("Q")
+            start = 3 if data[:3] == b"\xef\xbb\xbf" else 0
+            size = len(data)
+            while start < size:
+                end = data.find(b"\n", start)
+                if end < 0:
+                    end = size
+                if data[start:end].strip():
+                    offsets.append(start)
+                    if len(offsets) >= FLUSH_EVERY:
+                        offsets.tofile(out)
+                        del offsets[:]
+                start = end + 1
+            offsets.tofile(out)
+        os.replace(temp_path, index_path)
+    finally:
+        if not isinstance(data, bytes):
+            data.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class PhraseCorpus:
+    def __init__(self, path):
+        import mmap
+        self.path = path
+        self.file = open(path, "rb")
+        st = os.fstat(self.file.fileno())
+        self.signature = (st.st_mtime_ns, st.st_size)
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else b""
+        index_path = path + INDEX_SUFFIX
+        if not self.index_valid(index_path, st):
+            build_index(path, index_path)
+        with open(index_path, "rb") as f:
+            self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets = memoryview(self.index)[HEADER.size:].cast("Q")
+
+    @staticmethod
+    def index_valid(index_path, st):
+        try:
+            with open(index_path, "rb") as f:
+                header = f.read(HEADER.size)
+        except OSError:
+            return False
+        return header == HEADER.pack(MAGIC, FORMAT_VERSION, st.st_mtime_ns, st.st_size)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def stale(self):
+        # 文件被改写后必须重新打开：映射的内容可能已经变短
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return True
+        return (st.st_mtime_ns, st.st_size) != self.signature
+
+    def __getitem__(self, i):
+        start = self.offsets[i]
+        end = self.data.find(b"\n", start)
+        if end < 0:
+            end = len(self.data)
+        return self.data[start:end].decode("utf-8", "replace").strip()
+
+    def close(self):
+        self.offsets.release()
+        self.index.close()
+        if not isinstance(self.data, bytes):
+            self.data.close()
+        self.file.close()
+
+
+class EncouragementPicker:
+    """播放加油语时选择句子：配置了语料库文件时从文件中选，否则从配置中的列表选，一轮之内不重复。
+
+    inline() 返回配置中的加油语列表；list 和 PhraseCorpus 都支持 len() 和下标访问。
+    语料库文件在后台线程中打开，打开之前（以及文件被改写、重新打开期间）使用配置中的列表。
+    set_file() 只记下文件名，第一次用到或调用 preload() 时才开始打开。
+    """
+
+    def __init__(self, inline):
+        self.inline = inline
+        self.path = None
+        self.corpus = None
+        self.loading = None  # 后台正在打开的 (结果列表, 完成事件)
+        self.bag = ShuffleBag()
+
+    def set_file(self, path):
+        if self.corpus is not None:
+            self.corpus.close()
+            self.corpus = None
+        self.path = path or None
+        self.loading = None
+
+    def preload(self):
+        # 在后台打开语料库文件（需要时建立索引），界面线程不等待
+        if self.path is None or self.corpus is not None or self.loading is not None:
+            return
+        import threading
+        path = self.path
+        result = []
+        done = threading.Event()
+
+        def run():
+            try:
+                result.append(PhraseCorpus(path))
+            except (OSError, ValueError) as e:
+                print(f"无法打开加油语文件: {str(e)}")
+                result.append(None)
+            done.set()
+        self.loading = (result, done)
+        threading.Thread(target=run, name="phrase-corpus", daemon=True).start()
+
+    def wait(self, timeout=None):
+        # 等待后台打开完成，返回是否已经完成（用于测试和基准）
+        return self.loading is None or self.loading[1].wait(timeout)
+
+    def source(self):
+        if self.loading is not None and self.loading[1].is_set():
+            result, _ = self.loading
+            self.loading = None
+            self.corpus = result[0]
+            if self.corpus is None:
+                self.path = None  # 打开失败，不再重试，直到重新设置文件
+        if self.corpus is not None and self.corpus.stale():
+            # 映射的内容可能已经变短，不能再读；重新打开期间先用配置中的列表
+            self.corpus.close()
+            self.corpus = None
+        self.preload()
+        source = self.corpus if self.corpus is not None else self.inline()
+        if len(source) != len(self.bag):
+            self.bag.resize(len(source))
+        return source
+
+    def next(self):
+        source = self.source()
+        return source[self.bag.next()] if len(source) else None
+
+    def upcoming(self, count):
+        # 配置中的列表很短，全部返回；语料库只返回接下来要播放的若干句
+        source = self.source()
+        if self.corpus is None:
+            return list(source)
+        return [source[i] for i in self.bag.peek(count)]
+
+
+def main():
+    # python phrase_corpus.py 加油语.txt [数量]：建立索引并随机抽取几句
+    if len(sys.argv) < 2:
+        print("用法: python phrase_corpus.py 加油语.txt [数量]")
+        sys.exit(2)
+    corpus = PhraseCorpus(sys.argv[1])
+    bag = ShuffleBag(len(corpus))
+    print(f"共 {len(corpus)} 句")
+    for _ in range(min(len(corpus), int(sys.argv[2]) if len(sys.argv) > 2 else 5)):
+        print(corpus[bag.next()])
+
+
+if __name__ == "__main__":
+    main()
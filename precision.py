@@ -0,0 +1,184 @@
+import math
+import sched
+import sys
+import time
+
+# 精确倒计时：距离考试不到一天时显示 时:分:秒（可选十分之一秒）。
+# 每一次刷新都按单调时钟计算到下一个整秒边界的延迟，而不是串联 after(1000)，误差不会累积；
+# Tk 定时器固定的迟到量会被估计出来并提前扣除。距离考试还远时仍然只在零点刷新。
+#
+# 自带测量工具：python precision.py [秒数] [seconds|tenths]
+# 打印每次刷新相对于整秒边界的偏差，并与串联 after(1000) 的做法对比。
+
+PRECISION_PERIODS = {"seconds": 1.0, "tenths": 0.1}
+# 剩余时间少于这么多秒时才显示时分秒
+FINAL_STRETCH = 24 * 3600
+# 每隔多久重新对齐墙上时钟（系统可能校准了时间）
+RESYNC_SECONDS = 60
+# 定时器稍晚一点触发，保证已经跨过边界
+SLACK_MS = 2
+# 迟到量的平滑系数与上限
+LATENESS_ALPHA = 0.2
+MAX_LATENESS_MS = 20
+# 比边界提前不到这么多秒触发时，显示时按已经到达边界处理
+EARLY_TOLERANCE = 0.02
+
+def remaining_seconds(instant, wall):
+    # instant 为考试时刻的时间戳（CountdownIndex.instant）；
+    # 处于最后一天之内时返回剩余秒数，否则返回 None（按天显示）
+    remaining = instant - wall
+    if 0 < remaining <= FINAL_STRETCH:
+        return remaining
+    return None
+
+
+def format_clock(name, remaining, tenths=False):
+    if tenths:
+        total, tenth = divmod(int(remaining * 10), 10)
+        minutes, seconds = divmod(total, 60)
+        hours, minutes = divmod(minutes, 60)
+        return f'距离{name}还有 {hours:02d}:{minutes:02d}:{seconds:02d}.{tenth}'
+    minutes, seconds = divmod(int(remaining), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'距离{name}还有 {hours:02d}:{minutes:02d}:{seconds:02d}'
+
+
+class PrecisionClock:
+    """把墙上时钟换算到单调时钟上，安排对齐到整 period 秒边界的刷新。
+
+    每次刷新后先调用 observe(触发时的单调时间) 记录偏差，再用 next_delay() 得到下一次的延迟（毫秒）。
+    """
+
+    def __init__(self, period=1.0, resync=RESYNC_SECONDS):
+        self.period = period
+        self.resync = resync
+        self.lateness = 0.0  # 毫秒
+        self.target = None  # 下一次刷新在单调时钟上的目标时间
+        self.boundary = None  # 同一时刻在墙上时钟上的值
+        self.offsets = []  # 每次刷新相对于边界的偏差（毫秒）
+        self.sync()
+
+    def sync(self):
+        self.wall0 = time.time()
+        self.mono0 = time.monotonic()
+
+    def now(self):
+        return self.wall0 + (time.monotonic() - self.mono0)
+
+    def display_time(self):
+        # 扣除迟到量时可能估计过头，定时器比边界早一点点触发，这时按已经到达边界显示
+        wall = self.now()
+        if self.boundary is not None and self.boundary - wall < EARLY_TOLERANCE:
+            wall = max(wall, self.boundary)
+        return wall
+
+    def observe(self, fired_at):
+        if self.target is None or fired_at is None:
+            return
+        late = (fired_at - self.target) * 1e3
+        self.target = None
+        if late > self.period * 1e3 or late < -EARLY_TOLERANCE * 1e3:
+            return  # 系统休眠、界面卡住或者是提前的显式刷新，不计入估计
+        self.offsets.append(late)
+        if len(self.offsets) > 10000:
+            del self.offsets[:5000]
+        error = late - SLACK_MS
+        self.lateness = min(MAX_LATENESS_MS, max(0.0, self.lateness + LATENESS_ALPHA * error))
+
+    def next_delay(self):
+        mono = time.monotonic()
+        if mono - self.mono0 > self.resync:
+            self.sync()
+        wall = self.wall0 + (mono - self.mono0)
+        boundary = (math.floor(wall / self.period + 1e-6) + 1) * self.period
+        self.target = mono + (boundary - wall)
+        self.boundary = boundary
+        return max(0, (boundary - wall) * 1e3 - self.lateness + SLACK_MS)
+
+
+def summarize(offsets):
+    values = sorted(offsets)
+    if not values:
+        return "没有数据"
+    n = len(values)
+    half = n // 2
+    # 前后两半的平均偏差之差反映误差是否在累积
+    drift = sum(offsets[half:]) / max(1, n - half) - sum(offsets[:half]) / max(1, half)
+    return (f"{n} 次  平均 {sum(values) / n:.2f} ms  p50 {values[n // 2]:.2f} ms  "
+            f"p95 {values[min(n - 1, int(n * 0.95))]:.2f} ms  最大 {values[-1]:.2f} ms  漂移 {drift:+.2f} ms")
+
+
+class SleepLoop:
+    """没有图形界面时代替 Tk 的 after/after_cancel，用于测量。"""
+
+    def __init__(self):
+        self.scheduler = sched.scheduler(time.monotonic, time.sleep)
+
+    def after(self, ms, func):
+        return self.scheduler.enter(ms / 1000, 0, func)
+
+    def after_cancel(self, event):
+        try:
+            self.scheduler.cancel(event)
+        except ValueError:
+            pass  # 已经执行过或已经取消
+
+    def run(self, seconds):
+        self.scheduler.enter(seconds, -1, lambda: list(map(self.scheduler.cancel, self.scheduler.queue)))
+        self.scheduler.run()
+
+
+def make_loop():
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception:
+        return SleepLoop(), "sleep"
+
+    def run(seconds):
+        root.after(int(seconds * 1000), root.quit)
+        root.mainloop()
+    root.run = run
+    return root, "tk"
+
+
+def measure_clock(loop, seconds, period):
+    from scheduler import TickScheduler
+    clock = PrecisionClock(period)
+
+    def next_delay():
+        clock.observe(scheduler.fired_at)
+        return clock.next_delay()
+    scheduler = TickScheduler(loop, lambda: None, next_delay=next_delay)
+    scheduler.start()
+    loop.run(seconds)
+    scheduler.stop()
+    return clock.offsets
+
+
+def measure_chained(loop, seconds, period):
+    # 原来的做法：每次回调里再 after(period)
+    offsets = []
+    start = time.time()
+    first = math.floor(start / period + 1) * period
+
+    def tick(n):
+        offsets.append((time.time() - (first + n * period)) * 1e3)
+        loop.after(int(period * 1000), lambda: tick(n + 1))
+    loop.after(int((first - start) * 1000), lambda: tick(0))
+    loop.run(seconds)
+    return offsets
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    period = PRECISION_PERIODS[sys.argv[2] if len(sys.argv) > 2 else "seconds"]
+    loop, kind = make_loop()
+    print(f"事件循环: {kind}，周期 {period} 秒，每种方式测量 {seconds} 秒")
+    print("对齐单调时钟:", summarize(measure_clock(loop, seconds, period)))
+    print("串联 after:  ", summarize(measure_chained(loop, seconds, period)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import heapq
+from datetime import date, timedelta
+from itertools import count as counter
+
+from countdown_index import parse_date
+
+# 重复考试：配置中的 recurring 条目只保存规则，不展开成具体日期。
+#   {"name": "周测", "start": "2025/3/3", "rule": "FREQ=WEEKLY;BYDAY=MO,TH", "exdates": ["2025/5/1"]}
+# 规则是 iCalendar RRULE 的一个子集：FREQ（DAILY/WEEKLY/MONTHLY/YEARLY）、INTERVAL、COUNT、UNTIL、
+# BYDAY（每月规则可以带序号，如 2MO、-1FR）、BYMONTHDAY、BYMONTH（每年规则）。
+# 日期按需逐个生成；RecurringSchedule 用最小堆只保存每个系列的下一次日期。
+
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+SUPPORTED = {"FREQ", "INTERVAL", "COUNT", "UNTIL", "BYDAY", "BYMONTHDAY", "BYMONTH", "WKST"}
+
+
+def parse_rule(text):
+    rule = {}
+    for part in text.strip().split(";"):
+        if not part:
+            continue
+        key, _, value = part.partition("=")
+        key = key.upper()
+        if key not in SUPPORTED:
+            raise ValueError(f"不支持的重复规则: {key}")
+        rule[key] = value.upper()
+    if rule.get("FREQ") not in ("DAILY", "WEEKLY", "MONTHLY", "YEARLY"):
+        raise ValueError(f"不支持的重复频率: {rule.get('FREQ')}")
+    return rule
+
+
+def parse_compact_date(text):
+    # iCalendar 的 20250301 或 20250301T090000Z，只取日期部分
+    return date(int(text[0:4]), int(text[4:6]), int(text[6:8]))
+
+
+def parse_byday(value):
+    # "MO,-1FR,2TU" -> [(None, 0), (-1, 4), (2, 1)]
+    days = []
+    for item in value.split(","):
+        item = item.strip()
+        n = item[:-2]
+        days.append((int(n) if n else None, WEEKDAYS[item[-2:]]))
+    return days
+
+
+def days_in_month(year, month):
+    # 与 calendar.monthrange(year, month)[1] 相同，启动时不必导入 calendar
+    if month == 12:
+        return 31
+    return date(year, month + 1, 1).toordinal() - date(year, month, 1).toordinal()
+
+
+def month_days(year, month, byday, bymonthday, day):
+    # 某个月中符合规则的日期（升序）；byday 是 parse_byday 的结果，bymonthday 是整数列表
+    last = days_in_month(year, month)
+    days = set()
+    if byday is not None:
+        first_weekday = date(year, month, 1).weekday()
+        for n, weekday in byday:
+            first = (weekday - first_weekday) % 7 + 1
+            matches = range(first, last + 1, 7)
+            if n is None:
+                days.update(matches)
+            elif -len(matches) <= n <= len(matches) and n != 0:
+                days.add(matches[n - 1] if n > 0 else matches[n])
+    elif bymonthday is not None:
+        for item in bymonthday:
+            item = item if item > 0 else last + item + 1
+            if 1 <= item <= last:
+                days.add(item)
+    elif day <= last:
+        days.add(day)
+    return sorted(days)
+
+
+def candidates(start, rule, skip=0):
+    # 按规则生成的日期（未考虑 COUNT、UNTIL 和排除日期），无限序列；
+    # 每月、每年的规则可以用 skip 跳过前面若干个周期
+    interval = int(rule.get("INTERVAL", 1))
+    freq = rule["FREQ"]
+    byday = parse_byday(rule["BYDAY"]) if "BYDAY" in rule else None
+    bymonthday = [int(item) for item in rule["BYMONTHDAY"].split(",")] if "BYMONTHDAY" in rule else None
+    if freq == "DAILY":
+        step = timedelta(days=interval)
+        current = start
+        while True:
+            yield current
+            current += step
+    elif freq == "WEEKLY":
+        weekdays = sorted({weekday for _, weekday in byday}) if byday is not None else [start.weekday()]
+        week = start - timedelta(days=start.weekday())
+        step = timedelta(weeks=interval)
+        while True:
+            for weekday in weekdays:
+                current = week + timedelta(days=weekday)
+                if current >= start:
+                    yield current
+            week += step
+    elif freq == "MONTHLY":
+        for k in counter(skip):
+            index = start.month - 1 + k * interval
+            year, month = start.year + index // 12, index % 12 + 1
+            if year > date.max.year:
+                return
+            for day in month_days(year, month, byday, bymonthday, start.day):
+                current = date(year, month, day)
+                if current >= start:
+                    yield current
+    else:
+        months = sorted(int(m) for m in rule["BYMONTH"].split(",")) if "BYMONTH" in rule else [start.month]
+        for k in counter(skip):
+            year = start.year + k * interval
+            if year > date.max.year:
+                return
+            for month in months:
+                if byday is not None or bymonthday is not None:
+                    days = month_days(year, month, byday, bymonthday, start.day)
+                else:
+                    days = [start.day] if start.day <= days_in_month(year, month) else []
+                for day in days:
+                    current = date(year, month, day)
+                    if current >= start:
+                        yield current
+
+
+def occurrences(start, rule, exdates=(), after=None):
+    # 升序生成发生日期；after 之前的日期跳过（仍然计入 COUNT）
+    limit = int(rule["COUNT"]) if "COUNT" in rule else None
+    until = parse_compact_date(rule["UNTIL"]) if "UNTIL" in rule else None
+    excluded = set(exdates)
+    skip = 0
+    if after is not None and limit is None and after > start:
+        # 没有 COUNT 时可以直接跳到 after 所在的周期，不必从很久以前逐个生成
+        interval = int(rule.get("INTERVAL", 1))
+        if rule["FREQ"] == "MONTHLY":
+            skip = (after.year * 12 + after.month - start.year * 12 - start.month) // interval
+        elif rule["FREQ"] == "YEARLY":
+            skip = (after.year - start.year) // interval
+        elif rule["FREQ"] == "DAILY":
+            start += timedelta(days=(after - start).days // interval * interval)
+        elif rule["FREQ"] == "WEEKLY":
+            week = start - timedelta(days=start.weekday())
+            skipped = (after - week).days // (7 * interval)
+            if skipped > 0:
+                if "BYDAY" not in rule:
+                    rule = dict(rule, BYDAY=[key for key, value in WEEKDAYS.items() if value == start.weekday()][0])
+                start = week + timedelta(weeks=skipped * interval)
+    for n, current in enumerate(candidates(start, rule, skip)):
+        if limit is not None and n >= limit:
+            return
+        if until is not None and current > until:
+            return
+        if current in excluded or (after is not None and current < after):
+            continue
+        yield current
+
+
+class RecurringSchedule:
+    """每个重复考试在最小堆里只保留下一次日期（已经过去的不算，当天的仍然保留）。
+
+    advance(today) 弹出已经过去的日期并从对应的生成器取下一个，每次变化 O(log n)，
+    返回 (名称, 旧日期, 新日期或 None) 的列表，调用方据此更新索引。
+    """
+
+    def __init__(self, series=(), today=None):
+        self.heap = []  # (日期序数, 序号, 名称)
+        self.iterators = {}
+        self.seq = 0
+        today = today or date.today()
+        for item in series:
+            self.add(item, today)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def add(self, item, today):
+        start = parse_date(item["start"])
+        rule = parse_rule(item["rule"])
+        exdates = [parse_date(text) for text in item.get("exdates", ())]
+        iterator = occurrences(start, rule, exdates, after=today)
+        first = next(iterator, None)
+        if first is None:
+            return None
+        seq = self.seq
+        self.seq += 1
+        self.iterators[seq] = iterator
+        heapq.heappush(self.heap, (first.toordinal(), seq, item["name"]))
+        return first
+
+    def advance(self, today):
+        changes = []
+        limit = today.toordinal()
+        heap = self.heap
+        while heap and heap[0][0] < limit:
+            ordinal, seq, name = heap[0]
+            following = next(self.iterators[seq], None)
+            if following is None:
+                heapq.heappop(heap)
+                del self.iterators[seq]
+            else:
+                heapq.heapreplace(heap, (following.toordinal(), seq, name))
+            changes.append((name, date.fromordinal(ordinal), following))
+        return changes
+
+    def entries(self):
+        return [(name, date.fromordinal(ordinal)) for ordinal, _, name in self.heap]
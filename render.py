@@ -0,0 +1,133 @@
+import atexit
+import os
+import time
+from collections import OrderedDict, deque
+
+# 标签和窗口的绘制层：记住上一次画出的文字和窗口位置，没有变化时不调用 configure 和 geometry，
+# 置顶的无边框窗口不会因为每次刷新而重新布局、重绘。
+# 设置 DAOJISHI_RENDER_STATS=1 时，退出前打印刷新次数、跳过次数和刷新到绘制完成的耗时。
+
+WIDTH_CACHE_SIZE = 512
+TIMING_SAMPLES = 1000
+# 界面字体的数字等宽，测量宽度时把数字都换成 0，"还有 12 天"和"还有 35 天"共用一条缓存，
+# 每秒变化的时:分:秒也不会让窗口跟着改变大小
+DIGITS = str.maketrans("123456789", "000000000")
+
+
+class WidthCache:
+    """按 (字体, 文字) 缓存测量出的像素宽度，最多保存 maxsize 条，最久未使用的先淘汰。
+
+    字体键包含字号和缩放比例，换了字体或缩放后自然使用新的条目，不需要清空。
+    """
+
+    def __init__(self, maxsize=WIDTH_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.widths = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, font, text, measure):
+        key = (font, text)
+        width = self.widths.get(key)
+        if width is not None:
+            self.widths.move_to_end(key)
+            self.hits += 1
+            return width
+        self.misses += 1
+        width = measure()
+        self.widths[key] = width
+        if len(self.widths) > self.maxsize:
+            self.widths.popitem(last=False)
+        return width
+
+
+def requested_width(widget):
+    # 控件的请求宽度在空闲时的布局计算之后才按新的文字更新（customtkinter 的控件由多层组成，
+    # 刚 configure 完读到的还是旧值），先处理完再读取；结果会被缓存，只在缓存未命中时才调用
+    widget.update_idletasks()
+    return widget.winfo_reqwidth()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Renderer:
+    """font 用作宽度缓存的键，应当包含字体、字号和缩放比例。"""
+
+    def __init__(self, window, label, font, widths=None):
+        self.window = window
+        self.label = label
+        self.font = font
+        self.widths = widths if widths is not None else WidthCache()
+        self.text = None
+        self.geometry = None
+        self.ticks = 0
+        self.skipped = 0
+        self.configures = 0
+        self.geometries = 0
+        self.paint_times = deque(maxlen=TIMING_SAMPLES)
+        self.skip_times = deque(maxlen=TIMING_SAMPLES)
+        if os.environ.get("DAOJISHI_RENDER_STATS"):
+            atexit.register(lambda: print(self.report()))
+
+    def set_label(self, label, font):
+        # 换成新的标签控件（例如首次绘制之后换成完整界面）
+        self.label = label
+        self.font = font
+        self.text = None
+
+    def set_text(self, text):
+        if text == self.text:
+            return False
+        self.label.configure(text=text)
+        self.text = text
+        self.configures += 1
+        return True
+
+    def text_width(self, text):
+        # 第一次遇到的文字由标签测量（调用前先用 set_text 显示这段文字），之后直接查缓存
+        return self.widths.get(self.font, text.translate(DIGITS), lambda: requested_width(self.label))
+
+    def set_geometry(self, width, height, x, y):
+        geometry = f'{width}x{height}+{x}+{y}'
+        if geometry == self.geometry:
+            return False
+        self.window.geometry(geometry)
+        self.geometry = geometry
+        self.geometries += 1
+        return True
+
+    def begin(self):
+        self.ticks += 1
+        return time.perf_counter()
+
+    def end(self, start, drawn):
+        if drawn:
+            # 重绘在空闲时进行，排在它后面的空闲回调执行时绘制已经完成
+            self.window.after_idle(lambda: self.paint_times.append(time.perf_counter() - start))
+        else:
+            self.skipped += 1
+            self.skip_times.append(time.perf_counter() - start)
+
+    def stats(self):
+        return {
+            "ticks": self.ticks,
+            "skipped": self.skipped,
+            "configures": self.configures,
+            "geometries": self.geometries,
+            "width_hits": self.widths.hits,
+            "width_misses": self.widths.misses,
+            "paint_p50_ms": percentile(self.paint_times, 0.5) * 1e3,
+            "paint_p95_ms": percentile(self.paint_times, 0.95) * 1e3,
+            "skip_p50_ms": percentile(self.skip_times, 0.5) * 1e3,
+        }
+
+    def report(self):
+        s = self.stats()
+        return (f"刷新 {s['ticks']} 次，跳过 {s['skipped']} 次，configure {s['configures']} 次，geometry {s['geometries']} 次，"
+                f"宽度缓存命中 {s['width_hits']}/{s['width_hits'] + s['width_misses']}；"
+                f"绘制 p50 {s['paint_p50_ms']:.2f} ms p95 {s['paint_p95_ms']:.2f} ms，跳过 p50 {s['skip_p50_ms']:.3f} ms")
@@ -0,0 +1,82 @@
+import time
+from datetime import datetime, timedelta
+
+# 最长睡眠时间：防止系统休眠或调整时钟后错过日期变化
+MAX_SLEEP_MS = 10 * 60 * 1000
+# 跨过零点后稍等一下再刷新，避免时钟误差导致仍停留在前一天
+MIDNIGHT_SLACK_MS = 50
+
+
+def ms_until_next_midnight(now=None):
+    now = now or datetime.now()
+    next_midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return int((next_midnight - now).total_seconds() * 1000) + MIDNIGHT_SLACK_MS
+
+
+def ms_until_next_change(index):
+    # 零点，或者带时间的考试剩余天数变化的时候（见 CountdownIndex.next_change），取较早的一个
+    delay = ms_until_next_midnight()
+    wall = time.time()
+    change = index.next_change(wall)
+    if change is not None:
+        delay = min(delay, int((change - wall) * 1000) + MIDNIGHT_SLACK_MS)
+    return delay
+
+
+class TickScheduler:
+    """保证任意时刻最多只有一个待执行的刷新，并且只在显示内容可能变化时唤醒。
+
+    widget 只需要提供 after/after_cancel（Tk 控件即可），callback 负责重绘，
+    next_delay 返回距离下一次显示内容可能变化的毫秒数。
+    """
+
+    def __init__(self, widget, callback, next_delay=ms_until_next_midnight, max_sleep=MAX_SLEEP_MS):
+        self.widget = widget
+        self.callback = callback
+        self.next_delay = next_delay
+        self.max_sleep = max_sleep
+        self.pending = None
+        self.pending_due = None  # 单调时钟上的到期时间
+        self.ticks = 0
+        self.merged = 0
+        self.fired_at = None  # 最近一次触发时的单调时间，next_delay 可以据此估计定时器误差
+
+    def start(self):
+        self.stop()
+        self.arm()
+
+    def stop(self):
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+        self.pending = None
+        self.pending_due = None
+
+    def request(self, delay=0):
+        # 显式刷新请求：如果已经有更早的刷新在等待，就合并进去
+        due = time.monotonic() + delay / 1000
+        if self.pending is not None:
+            if self.pending_due <= due:
+                self.merged += 1
+                return
+            self.widget.after_cancel(self.pending)
+        self.schedule(delay, due)
+
+    def arm(self):
+        delay = max(0, min(int(self.next_delay()), self.max_sleep))
+        self.schedule(delay, time.monotonic() + delay / 1000)
+
+    def schedule(self, delay, due):
+        self.pending_due = due
+        self.pending = self.widget.after(int(delay), self.fire)
+
+    def fire(self):
+        self.pending = None
+        self.pending_due = None
+        self.fired_at = time.monotonic()
+        self.ticks += 1
+        try:
+            self.callback()
+        finally:
+            # 回调里可能已经请求了新的刷新，此时不再重复安排
+            if self.pending is None:
+                self.arm()
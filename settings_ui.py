@@ -0,0 +1,266 @@
+import tkinter as tk
+import customtkinter as ctk
+import countdown_core
+import divisor_sum
+import metrics
+from countdown_core import add_countdown, delete_countdown, update_countdown
+from virtual_list import VirtualList
+
+# 密码验证和设置窗口：只在第一次打开设置时才导入，不拖慢主窗口的启动。
+# 两个窗口都只创建一次（见 CountdownApp.dialog），关闭时隐藏，再次打开时用 open() 刷新内容后显示。
+
+def set_readonly_text(entry, text):
+    entry.configure(state="normal")
+    set_text(entry, text)
+    entry.configure(state="readonly")
+
+def set_text(entry, text):
+    entry.delete(0, tk.END)
+    if text:
+        entry.insert(0, text)  # 插入空字符串会去掉输入框的提示文字
+
+class PasswordChecker(ctk.CTkToplevel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.withdraw()
+        self.parent = parent
+        self.overrideredirect(True)
+        self.attributes('-topmost', True)
+        
+        ctk.CTkLabel(self, text="请输入密码").pack(pady=10)
+        self.answer_entry = ctk.CTkEntry(self)
+        self.answer_entry.pack(pady=5)
+        
+        btn_frame = ctk.CTkFrame(self)
+        btn_frame.pack(pady=5)
+        ctk.CTkButton(btn_frame, text="提交", command=self.check_password).pack(side=tk.LEFT, padx=10)
+        ctk.CTkButton(btn_frame, text="取消", command=self.close).pack(side=tk.LEFT, padx=10)
+
+    def open(self):
+        self.geometry(f"400x150+{(self.parent.winfo_screenwidth() - 400) // 2}+{self.parent.winfo_y() + self.parent.winfo_height() + 10}")
+        self.answer_entry.delete(0, tk.END)
+        self.deiconify()
+        self.lift()
+        self.answer_entry.focus_set()
+
+    def close(self):
+        self.withdraw()
+        self.parent.settings_open = False
+
+    def check_password(self):
+        if not self.winfo_viewable():
+            return
+        user_input = self.answer_entry.get()
+        correct_sum = divisor_sum.lookup(self.parent.info["password"], timeout=0.05)
+        if correct_sum is None:
+            # 密码刚被修改，后台还没有算完，稍后再检查
+            self.after(100, self.check_password)
+            return
+        
+        try:
+            if int(user_input) == correct_sum:
+                self.close()
+                self.parent.settings_open = True
+                self.parent.dialog(SettingsWindow).open()
+            else:
+                self.parent.show_message("错误", "密码不正确")
+        except:
+            self.parent.show_message("错误", "请输入有效数字")
+        finally:
+            self.answer_entry.delete(0, tk.END)
+
+class SettingsWindow(ctk.CTkToplevel):
+    @metrics.timed("settings_window")
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.withdraw()
+        self.parent = parent
+        self.overrideredirect(True)
+        self.attributes('-topmost', True)
+        
+        # 列表只为可见的行创建控件，条目再多打开设置也很快
+        self.exam_view = VirtualList(self, self.parent.countdowns.items, self.make_exam_row, self.fill_exam_row,
+                                     lambda item, query: query in item[1]["name"] or query in item[1]["date"]
+                                     or query in item[1].get("tz", ""))
+        self.exam_view.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
+        
+        add_exam_frame = ctk.CTkFrame(self)
+        add_exam_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        ctk.CTkLabel(add_exam_frame, text="添加考试名称:").grid(row=0, column=0, padx=5)
+        self.new_exam_name = ctk.CTkEntry(add_exam_frame)
+        self.new_exam_name.grid(row=0, column=1, padx=5)
+        
+        ctk.CTkLabel(add_exam_frame, text="添加日期:").grid(row=0, column=2, padx=5)
+        self.new_exam_date = ctk.CTkEntry(add_exam_frame)
+        self.new_exam_date.grid(row=0, column=3, padx=5)
+        
+        # 时间和时区可以不填，不填时按本地日期计算天数
+        self.new_exam_time = ctk.CTkEntry(add_exam_frame, width=70, placeholder_text="时间")
+        self.new_exam_time.grid(row=0, column=4, padx=5)
+        self.new_exam_tz = ctk.CTkEntry(add_exam_frame, width=120, placeholder_text="时区")
+        self.new_exam_tz.grid(row=0, column=5, padx=5)
+        
+        ctk.CTkButton(add_exam_frame, text="添加", command=self.add_exam).grid(row=0, column=6, padx=5)
+        
+        self.encouragement_view = VirtualList(self, self.parent.encouragements.items, self.make_encouragement_row,
+                                              self.fill_encouragement_row, lambda item, query: query in item[1])
+        self.encouragement_view.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
+        
+        add_encouragement_frame = ctk.CTkFrame(self)
+        add_encouragement_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        ctk.CTkLabel(add_encouragement_frame, text="添加加油语:").grid(row=0, column=0, padx=5)
+        self.new_encouragement = ctk.CTkEntry(add_encouragement_frame)
+        self.new_encouragement.grid(row=0, column=1, padx=5)
+        
+        ctk.CTkButton(add_encouragement_frame, text="添加", command=self.add_encouragement).grid(row=0, column=2, padx=5)
+
+        ctk.CTkButton(self, text="保存", command=self.save_settings).pack(padx=10, pady=10, side=tk.LEFT)
+        ctk.CTkButton(self, text="取消", command=self.close).pack(padx=10, pady=10, side=tk.LEFT)
+
+    @metrics.timed("settings_open")
+    def open(self):
+        # 条目可能在窗口隐藏期间被修改过（例如配置重新加载）：清空搜索和输入框，所有行重新填写
+        self.parent.settings_window = self
+        self.geometry(f"900x600+{(self.parent.winfo_screenwidth() - 900) // 2}+{self.parent.winfo_y() + self.parent.winfo_height() + 10}")
+        for view in (self.exam_view, self.encouragement_view):
+            for row in view.rows:
+                row.item = None
+            view.reset()
+        for entry in (self.new_exam_name, self.new_exam_date, self.new_exam_time, self.new_exam_tz, self.new_encouragement):
+            entry.delete(0, tk.END)
+        self.deiconify()
+        self.lift()
+
+    def close(self):
+        self.withdraw()
+        self.parent.settings_open = False
+        self.parent.settings_window = None
+
+    def save_settings(self):
+        # 写入在后台进行，写完之后再提示结果
+        store = self.parent.config_store
+        self.parent.sync_info()
+        store.when_saved(self, store.save(self.parent.info), self.on_saved)
+
+    def on_saved(self, error):
+        if error is not None:
+            self.parent.show_message("错误", f"保存失败：{str(error)}")
+            return
+        self.parent.show_message("成功", "设置已保存！")
+        self.close()
+        self.parent.request_update()
+        #restart_app(self)
+
+    def make_exam_row(self, parent):
+        row = ctk.CTkFrame(parent)
+        row.item = None
+        ctk.CTkLabel(row, text="考试名称:").grid(row=0, column=0, padx=5)
+        row.name_entry = ctk.CTkEntry(row)
+        row.name_entry.grid(row=0, column=1, padx=5)
+        
+        ctk.CTkLabel(row, text="日期:").grid(row=0, column=2, padx=5)
+        row.date_entry = ctk.CTkEntry(row)
+        row.date_entry.grid(row=0, column=3, padx=5)
+        row.time_entry = ctk.CTkEntry(row, width=70, placeholder_text="时间")
+        row.time_entry.grid(row=0, column=4, padx=5)
+        row.tz_entry = ctk.CTkEntry(row, width=120, placeholder_text="时区")
+        row.tz_entry.grid(row=0, column=5, padx=5)
+        
+        ctk.CTkButton(row, text="修改", width=60, command=lambda: self.update_exam(row)).grid(row=0, column=6, padx=5)
+        ctk.CTkButton(row, text="删除", width=60, command=lambda: self.delete_exam(row.item[0])).grid(row=0, column=7, padx=5)
+        return row
+
+    def fill_exam_row(self, row, item):
+        # item 是 (编号, 考试)；同一个条目不重新填写，保留正在编辑的内容
+        if row.item is not item:
+            row.item = item
+            set_text(row.name_entry, item[1]["name"])
+            set_text(row.date_entry, item[1]["date"])
+            set_text(row.time_entry, item[1].get("time", ""))
+            set_text(row.tz_entry, item[1].get("tz", ""))
+
+    def make_encouragement_row(self, parent):
+        row = ctk.CTkFrame(parent)
+        row.item = None
+        row.entry = ctk.CTkEntry(row, state="readonly")
+        row.entry.pack(side=tk.LEFT, padx=5)
+        ctk.CTkButton(row, text="删除", command=lambda: self.delete_encouragement(row.item[0])).pack(side=tk.LEFT, padx=5)
+        return row
+
+    def fill_encouragement_row(self, row, item):
+        if row.item is not item:
+            row.item = item
+            set_readonly_text(row.entry, item[1])
+
+    def add_exam(self):
+        name = self.new_exam_name.get().strip()
+        date = self.new_exam_date.get().strip()
+        try:
+            # 添加到配置
+            key = add_countdown(self.parent.countdowns, name, date,
+                                self.new_exam_time.get().strip(), self.new_exam_tz.get().strip())
+        except ValueError as e:
+            self.parent.show_message("警告", str(e))
+            return
+        self.parent.record_edit("add_exam", exam=self.parent.countdowns.get(key))
+        self.parent.select_exam(name)
+    
+        # 更新设置窗口
+        self.exam_view.refresh(scroll_to_end=True)
+    
+        # 清空输入框
+        for entry in (self.new_exam_name, self.new_exam_date, self.new_exam_time, self.new_exam_tz):
+            entry.delete(0, tk.END)
+
+    def update_exam(self, row):
+        key, old = row.item
+        name = row.name_entry.get().strip()
+        date = row.date_entry.get().strip()
+        time = row.time_entry.get().strip()
+        tz = row.tz_entry.get().strip()
+        if (name, date, time, tz) == (old["name"], old["date"], old.get("time", ""), old.get("tz", "")):
+            return
+        try:
+            _, exam = update_countdown(self.parent.countdowns, key, name, date, time, tz)
+        except ValueError as e:
+            self.parent.show_message("警告", str(e))
+            return
+        self.parent.record_edit("update_exam", old=old, exam=exam)
+        if self.parent.last_valid_exam == old["name"]:
+            self.parent.select_exam(name)
+        self.exam_view.refresh()
+
+    def delete_exam(self, key):
+        # 从配置中删除（只删除这一个条目，同名的其他考试保留）
+        exam = delete_countdown(self.parent.countdowns, key)
+        self.parent.record_edit("remove_exam", exam=exam)
+
+        # 从界面中删除
+        self.exam_view.refresh()
+
+    def add_encouragement(self):
+        encouragement = self.new_encouragement.get().strip()
+        try:
+            # 添加到配置
+            countdown_core.add_encouragement(self.parent.encouragements, encouragement)
+        except ValueError as e:
+            self.parent.show_message("警告", str(e))
+            return
+        self.parent.record_edit("add_encouragement", text=encouragement)
+
+        # 更新设置窗口
+        self.encouragement_view.refresh(scroll_to_end=True)
+        self.new_encouragement.delete(0, tk.END)
+
+    def delete_encouragement(self, key):
+        encouragement = countdown_core.delete_encouragement(self.parent.encouragements, key)
+        self.parent.record_edit("remove_encouragement", text=encouragement)
+        self.encouragement_view.refresh()
+
+    def destroy(self):
+        # 只在程序退出时真正销毁
+        self.parent.settings_open = False
+        self.parent.settings_window = None
+        super().destroy()
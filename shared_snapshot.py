@@ -0,0 +1,283 @@
+import json
+import mmap
+import os
+import socketserver
+import struct
+import sys
+import threading
+import time
+from datetime import date
+
+from countdown_index import DATE_FORMAT
+
+# 给其他程序（锁屏插件、教室显示脚本等）读取的倒计时快照，不必各自解析配置文件、重复计算剩余天数。
+# 程序运行时把从今天起的全部考试和剩余天数写进一个内存映射文件，内容变化时才改写。
+# 文件布局固定：文件头 | 当前标签（LABEL_SIZE 字节）| 记录（每条 RECORD.size 字节）| 名称（UTF-8）
+# 写入采用顺序锁：先把 seq 改成奇数，写完再改成下一个偶数；读取方看到奇数或前后 seq 不一致时重读，
+# 读取不加锁，也不会阻塞写入。只想知道有没有变化时，读 4 个字节的 seq 即可。
+# 配置了 api_port 时，另外在 127.0.0.1 上提供按行收发 JSON 的查询接口：
+#   ping | label | list | upcoming N | get 名称
+
+MAGIC = b"DJSM"
+FORMAT_VERSION = 1
+# 魔数、版本、记录大小、seq、条目数、今天的日期序数、标签长度、名称区长度、文件容量、发布时间
+HEADER = struct.Struct("<4sHHIIiIIId")
+SEQ = struct.Struct("<I")
+SEQ_AT = 8
+# 日期序数、剩余天数、名称在名称区中的偏移、名称长度
+RECORD = struct.Struct("<iiIH2x")
+LABEL_SIZE = 256
+LABEL_AT = HEADER.size
+RECORDS_AT = LABEL_AT + LABEL_SIZE
+MIN_SIZE = 64 * 1024
+MAX_REQUEST = 4096
+
+
+def encode_label(label):
+    # 截断到 LABEL_SIZE 字节，不切断多字节字符
+    return label.encode("utf-8")[:LABEL_SIZE].decode("utf-8", "ignore").encode("utf-8")
+
+
+class SnapshotWriter:
+    """只由界面线程调用。文件只会变大不会变小，读取方已经映射的部分始终有效。"""
+
+    def __init__(self, path):
+        self.path = path
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self.file = os.fdopen(fd, "r+b")
+        self.map = None
+        self.seq = 0
+        self.header = (0, 0, 0, 0)  # 条目数、今天的日期序数、标签长度、名称区长度
+        self.writes = 0
+        self.ensure(MIN_SIZE)
+
+    def ensure(self, size):
+        if self.map is not None and size <= len(self.map):
+            return
+        capacity = max(MIN_SIZE, size * 2)
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if os.fstat(self.file.fileno()).st_size < capacity:
+            os.ftruncate(self.file.fileno(), capacity)
+        else:
+            capacity = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), capacity)
+
+    def begin(self):
+        self.seq += 1
+        SEQ.pack_into(self.map, SEQ_AT, self.seq)
+
+    def commit(self):
+        count, today, label_len, names_size = self.header
+        HEADER.pack_into(self.map, 0, MAGIC, FORMAT_VERSION, RECORD.size, self.seq,
+                         count, today, label_len, names_size, len(self.map), time.time())
+        self.seq += 1
+        SEQ.pack_into(self.map, SEQ_AT, self.seq)
+        self.writes += 1
+
+    def write(self, today, rows, label):
+        # rows 为按日期排好的 (名称, 日期序数, 剩余天数)；同名条目共用一份名称
+        names = bytearray()
+        spans = {}
+        pack = RECORD.pack
+        packed = []
+        for name, ordinal, days in rows:
+            span = spans.get(name)
+            if span is None:
+                encoded = name.encode("utf-8")
+                span = spans[name] = (len(names), len(encoded))
+                names += encoded
+            packed.append(pack(ordinal, days, *span))
+        records = b"".join(packed)
+        self.ensure(RECORDS_AT + len(records) + len(names))
+        label = encode_label(label)
+        names_at = RECORDS_AT + len(records)
+        self.begin()
+        self.map[LABEL_AT:LABEL_AT + len(label)] = label
+        self.map[RECORDS_AT:names_at] = records
+        self.map[names_at:names_at + len(names)] = names
+        self.header = (len(rows), today, len(label), len(names))
+        self.commit()
+
+    def write_label(self, label):
+        label = encode_label(label)
+        self.begin()
+        self.map[LABEL_AT:LABEL_AT + len(label)] = label
+        count, today, _, names_size = self.header
+        self.header = (count, today, len(label), names_size)
+        self.commit()
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+
+class SnapshotReader:
+    """供其他程序使用：changed() 只读 seq，read() 返回一份一致的内容。"""
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.seq = None
+
+    def current_seq(self):
+        return SEQ.unpack_from(self.map, SEQ_AT)[0]
+
+    def changed(self):
+        return self.current_seq() != self.seq
+
+    def read(self, attempts=1000):
+        # 返回 (今天, [(名称, 日期, 剩余天数)], 标签, 发布时间)
+        for _ in range(attempts):
+            seq = self.current_seq()
+            if seq & 1:
+                time.sleep(0)
+                continue
+            magic, version, record_size, _, count, today, label_len, names_size, capacity, published = HEADER.unpack_from(self.map)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError("不是倒计时快照文件或版本不同")
+            if capacity > len(self.map):
+                # 写入方扩大了文件，重新映射
+                self.map.close()
+                self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+                continue
+            names_at = RECORDS_AT + count * record_size
+            label = self.map[LABEL_AT:LABEL_AT + label_len]
+            records = self.map[RECORDS_AT:names_at]
+            names = self.map[names_at:names_at + names_size]
+            if self.current_seq() != seq:
+                continue
+            self.seq = seq
+            rows = [(names[offset:offset + length].decode("utf-8"), date.fromordinal(ordinal), days)
+                    for ordinal, days, offset, length in struct.iter_unpack(RECORD.format, records)]
+            return date.fromordinal(today) if today else None, rows, label.decode("utf-8"), published
+        raise TimeoutError("快照一直在写入中")
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+class QueryHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline(MAX_REQUEST)
+            if not line:
+                return
+            try:
+                reply = self.server.answer(line.decode("utf-8").strip())
+            except (ValueError, UnicodeDecodeError) as e:
+                reply = {"error": str(e)}
+            self.wfile.write((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+class QueryServer(socketserver.ThreadingTCPServer):
+    """只监听 127.0.0.1。在自己的线程里运行，只读取界面线程整体替换的 state，不接触 Tk。"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port, get_state):
+        super().__init__(("127.0.0.1", port), QueryHandler)
+        self.get_state = get_state
+
+    def answer(self, command):
+        today, rows, label = self.get_state()
+        verb, _, arg = command.partition(" ")
+        if verb == "ping":
+            return {"ok": True}
+        if verb == "label":
+            return {"label": label}
+        if verb == "list":
+            return {"today": today, "countdowns": [row_dict(row) for row in rows]}
+        if verb == "upcoming":
+            return {"today": today, "countdowns": [row_dict(row) for row in rows[:int(arg or 1)]]}
+        if verb == "get":
+            for row in rows:
+                if row[0] == arg:
+                    return row_dict(row)
+            raise ValueError(f"没有找到考试: {arg}")
+        raise ValueError(f"未知的命令: {verb}")
+
+
+def row_dict(row):
+    name, ordinal, days = row
+    return {"name": name, "date": date.fromordinal(ordinal).strftime(DATE_FORMAT), "days": days}
+
+
+class Publisher:
+    """path 不为空时写共享快照，port 不为 0 时启动查询接口。publish() 在每次刷新后调用。"""
+
+    def __init__(self, path=None, port=0):
+        self.state = (None, [], "")  # (今天, rows, 标签)，整体替换，查询线程读到的总是一致的
+        self.key = None
+        self.label = None
+        self.writer = None
+        self.server = None
+        if path:
+            self.writer = SnapshotWriter(path)
+        if port:
+            try:
+                self.server = QueryServer(port, lambda: self.state)
+            except OSError:
+                self.close()
+                raise
+            threading.Thread(target=self.server.serve_forever, name="query-api", daemon=True).start()
+
+    def publish(self, index, now, label):
+        # 考试、日期、"是否已过零点"和带时间的考试下一次天数变化的时刻都没变时不重新计算，标签没变时不写任何东西
+        key = (id(index), index.version, now.toordinal(), bool(now.hour or now.minute or now.second or now.microsecond),
+               index.next_change(now.timestamp()))
+        if key != self.key:
+            self.key = key
+            self.label = label
+            rows = index.upcoming_rows(now)
+            self.state = (now.date().strftime(DATE_FORMAT), rows, label)
+            self.write(self.writer and self.writer.write, key[2], rows, label)
+        elif label != self.label:
+            self.label = label
+            self.state = (self.state[0], self.state[1], label)
+            self.write(self.writer and self.writer.write_label, label)
+
+    def write(self, func, *args):
+        # 写入失败（例如磁盘满、其他程序占用了文件无法扩大）时不再写快照，查询接口照常工作
+        if func is None:
+            return
+        try:
+            func(*args)
+        except OSError as e:
+            print(f"写入共享快照失败: {str(e)}")
+            self.writer = None
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def main():
+    # python shared_snapshot.py 快照文件 [--watch]：打印快照内容，--watch 时每 0.1 秒检查一次变化
+    if len(sys.argv) < 2:
+        print("用法: python shared_snapshot.py 快照文件 [--watch]")
+        sys.exit(2)
+    reader = SnapshotReader(sys.argv[1])
+    while True:
+        if reader.changed():
+            today, rows, label, published = reader.read()
+            print(f"{time.strftime('%H:%M:%S', time.localtime(published))} 今天 {today}，{label}")
+            for name, target, days in rows:
+                print(f"  {target:%Y/%m/%d}  {days:>5} 天  {name}")
+        if "--watch" not in sys.argv:
+            return
+        time.sleep(0.1)
+
+
+if __name__ == "__main__":
+    main()
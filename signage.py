@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import sys
+import unicodedata
+from datetime import date, datetime, time, timedelta
+
+from countdown_core import advance_recurring, read_config, seed_recurring
+from countdown_index import CountdownIndex, format_label, parse_date
+from persistence import replay_journal
+from recurrence import RecurringSchedule
+
+# 批量导出倒计时图片，供电子屏和每日简报使用，不用再逐个切换考试截图。
+#   python signage.py 输出目录 [--from 2025/3/1] [--days 30] [--format png,svg] [--jobs 4] [--font 字体文件]
+# 对从 --from（默认今天）起的每一天、每个尚未结束的考试生成 <输出目录>/<日期>/<考试>.<格式>，
+# 文字与 CountdownApp 的标签相同（重复考试按当天之后的下一次计算），字体、字号、颜色和窗口的高度、左右留白也相同。
+# 名称中不能用于文件名的字符换成 _，换完之后重名的考试在文件名后面加 -2、-3 区分。
+# 输出目录中的 signage.json 记录每个文件的内容哈希，内容没有变化的文件不会重新生成；
+# 需要生成的文件分给多个进程绘制。SVG 不需要额外的库，PNG 需要 Pillow 和一个带中文的字体文件。
+
+MANIFEST_NAME = "signage.json"
+# 改变绘制方式时加一，旧的哈希全部失效
+RENDER_VERSION = 1
+# 与 CountdownApp 相同：Helvetica，字号 36 * 1.2（CTkLabel 的字号按像素计），窗口高 60 * 1.2，左右共留 40 像素
+FONT_FAMILY = "Helvetica"
+FONT_SIZE = int(36 * 1.2)
+HEIGHT = int(60 * 1.2)
+PADDING = 40
+# customtkinter 浅色主题 CTk 的背景色 gray92 和 CTkLabel 的文字颜色 gray10
+BACKGROUND = "#EBEBEB"
+FOREGROUND = "#1A1A1A"
+# 按当天白天看到的文字导出（零点整的那一刻剩余天数会多一天）
+SHOWN_AT = time(8)
+# Helvetica 里没有中文，Tk 会退回系统的中文字体；PNG 需要找一个同样带中文的字体文件
+FONT_CANDIDATES = [
+    "C:/Windows/Fonts/msyh.ttc",
+    "C:/Windows/Fonts/simhei.ttf",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+]
+FORMATS = ("png", "svg")
+# 文件名中不能出现的字符
+UNSAFE = str.maketrans({c: "_" for c in '<>:"/\\|?*'})
+
+font_cache = {}
+
+
+def find_font(path=None):
+    if path:
+        return path
+    for candidate in FONT_CANDIDATES:
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def load_font(path):
+    # 每个进程只打开一次字体文件
+    font = font_cache.get(path)
+    if font is None:
+        from PIL import ImageFont
+        font = font_cache[path] = ImageFont.truetype(path, FONT_SIZE)
+    return font
+
+
+def estimate_width(text):
+    # SVG 不测量字体：中文按 1 个字宽，其余按 0.6 个字宽估计，文字居中显示
+    width = 0.0
+    for c in text:
+        width += 1.0 if unicodedata.east_asian_width(c) in "WF" else 0.6
+    return int(width * FONT_SIZE) + PADDING
+
+
+def render_svg(text):
+    width = estimate_width(text)
+    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{HEIGHT}" viewBox="0 0 {width} {HEIGHT}">'
+            f'<rect width="100%" height="100%" fill="{BACKGROUND}"/>'
+            f'<text x="50%" y="50%" text-anchor="middle" dominant-baseline="central" '
+            f'font-family="{FONT_FAMILY}, sans-serif" font-size="{FONT_SIZE}px" fill="{FOREGROUND}">{text}</text>'
+            f'</svg>\n').encode("utf-8")
+
+
+def render_png(text, font_path):
+    from io import BytesIO
+    from PIL import Image, ImageDraw
+    font = load_font(font_path)
+    left, _, right, _ = font.getbbox(text)
+    width = right - left + PADDING
+    image = Image.new("RGB", (width, HEIGHT), BACKGROUND)
+    ImageDraw.Draw(image).text((width // 2, HEIGHT // 2), text, font=font, fill=FOREGROUND, anchor="mm")
+    out = BytesIO()
+    image.save(out, "PNG", optimize=False)
+    return out.getvalue()
+
+
+def content_hash(fmt, text, font_path):
+    key = f"{RENDER_VERSION}\0{fmt}\0{text}\0{FONT_SIZE}\0{BACKGROUND}\0{FOREGROUND}"
+    if fmt == "png":
+        key += f"\0{font_path}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def file_stems(names):
+    # 名称 -> 文件名（不含扩展名）。Windows 和 macOS 的文件名不区分大小写，按 casefold 判断重名
+    stems = {}
+    taken = set()
+    for name in names:
+        base = stem = name.translate(UNSAFE)
+        n = 1
+        while stem.casefold() in taken:
+            n += 1
+            stem = f"{base}-{n}"
+        taken.add(stem.casefold())
+        stems[name] = stem
+    return stems
+
+
+def plan(countdowns, first_day, days, formats, recurring=()):
+    # 返回 [(相对路径, 格式, 文字)]；同名考试与界面一样使用第一个日期，
+    # 重复考试与界面一样只放下一次日期，每过一天用 advance_recurring 换成之后的一次
+    index = CountdownIndex(countdowns)
+    schedule = RecurringSchedule(recurring, first_day)
+    seed_recurring(schedule, index)
+    stems = file_stems(dict.fromkeys([exam["name"] for exam in countdowns] + [item["name"] for item in recurring]))
+    jobs = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        advance_recurring(schedule, index, day)
+        now = datetime.combine(day, SHOWN_AT)
+        folder = day.strftime("%Y-%m-%d")
+        for name, stem in stems.items():
+            target = index.get(name)
+            if target is None or target < day:
+                continue
+            text = format_label(name, index.days_left(name, now))
+            for fmt in formats:
+                jobs.append((f"{folder}/{stem}.{fmt}", fmt, text))
+    return jobs
+
+
+def render_batch(batch, directory, font_path):
+    # 在子进程中运行：绘制并写入一批文件，返回写入的数量
+    made = set()
+    for relpath, fmt, text in batch:
+        data = render_png(text, font_path) if fmt == "png" else render_svg(text)
+        path = os.path.join(directory, relpath)
+        folder = os.path.dirname(path)
+        if folder not in made:
+            os.makedirs(folder, exist_ok=True)
+            made.add(folder)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    return len(batch)
+
+
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST_NAME)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temp_path, path)
+
+
+def export(countdowns, directory, first_day, days=1, formats=("svg",), jobs=None, font_path=None, recurring=()):
+    """导出图片，返回 (生成的文件数, 内容未变而跳过的文件数)。jobs 为 1 时不启动子进程。
+    recurring 为配置中的重复考试。"""
+    if "png" in formats:
+        import importlib.util
+        if importlib.util.find_spec("PIL") is None:
+            raise ValueError("导出 PNG 需要安装 Pillow（pip install pillow）")
+        font_path = find_font(font_path)
+        if font_path is None:
+            raise ValueError("导出 PNG 需要带中文的字体文件，请用 --font 指定")
+    os.makedirs(directory, exist_ok=True)
+    manifest = read_manifest(directory)
+    pending = []
+    hashes = {}
+    for relpath, fmt, text in plan(countdowns, first_day, days, formats, recurring):
+        digest = content_hash(fmt, text, font_path)
+        hashes[relpath] = digest
+        if manifest.get(relpath) != digest or not os.path.exists(os.path.join(directory, relpath)):
+            pending.append((relpath, fmt, text))
+    jobs = jobs or os.cpu_count() or 1
+    if pending:
+        if jobs == 1 or len(pending) < 2 * jobs:
+            render_batch(pending, directory, font_path)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            # 每个进程分几批，批次大一些可以减少进程间传递的开销
+            size = -(-len(pending) // (jobs * 4))
+            batches = [pending[i:i + size] for i in range(0, len(pending), size)]
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                futures = [pool.submit(render_batch, batch, directory, font_path) for batch in batches]
+                for future in futures:
+                    future.result()  # 任何一批出错都在这里抛出，不写清单
+        # 没有出现在本次计划中的旧记录保留，其他日期范围的文件仍然有效
+        manifest.update(hashes)
+        write_manifest(directory, manifest)
+    return len(pending), len(hashes) - len(pending)
+
+
+def option(argv, name, default=None):
+    if name in argv:
+        i = argv.index(name)
+        if i + 1 < len(argv):
+            return argv[i + 1]
+    return default
+
+
+def main():
+    argv = sys.argv[1:]
+    if not argv or argv[0].startswith("--"):
+        print("用法: python signage.py 输出目录 [--from 2025/3/1] [--days 30] [--format png,svg] [--jobs 4] [--font 字体文件]")
+        sys.exit(2)
+    config_file_path = os.environ.get("DAOJISHI_CONFIG", "D:/config.json")
+    info = read_config(config_file_path)
+    replay_journal(config_file_path, info)
+    first = option(argv, "--from")
+    formats = [fmt.strip() for fmt in option(argv, "--format", "svg").split(",") if fmt.strip()]
+    for fmt in formats:
+        if fmt not in FORMATS:
+            print(f"不支持的格式: {fmt}")
+            sys.exit(2)
+    try:
+        made, skipped = export(info["countdowns"], argv[0], parse_date(first) if first else date.today(),
+                               int(option(argv, "--days", 1)), formats, int(option(argv, "--jobs", 0)),
+                               option(argv, "--font"), info.get("recurring", ()))
+    except ValueError as e:
+        print(str(e))
+        sys.exit(1)
+    print(f"生成 {made} 个文件，{skipped} 个没有变化")
+
+
+if __name__ == "__main__":
+    main()
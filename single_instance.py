@@ -0,0 +1,159 @@
+import json
+import os
+import time
+from collections import deque
+
+# 单实例：第一个启动的程序持有锁文件，并在 127.0.0.1 的随机端口上接收命令。
+# 再次启动时拿不到锁，就把命令行参数转发给正在运行的程序然后退出，不再创建第二个窗口。
+#   --select 名称  切换到指定考试      --settings  打开设置（仍然需要密码）
+#   --reload       重新读取配置文件    （没有参数时把已经运行的窗口提到最前）
+# 端口和一个随机令牌写在 <目录>/daojishi.instance 中，只接受带正确令牌的命令。
+# 设置 DAOJISHI_MULTI_INSTANCE=1 可以关闭这个功能（例如同时测试两份配置）。
+# socket、secrets、threading 只在转发命令或开始接收命令时才导入，第一个实例的首次绘制不需要它们。
+
+LOCK_NAME = "daojishi.lock"
+INFO_NAME = "daojishi.instance"
+# 第一个程序可能还在启动，端口文件尚未写好，转发时最多等待这么久
+FORWARD_TIMEOUT = 10
+MAX_MESSAGE = 64 * 1024
+# 界面线程检查转发命令的间隔（毫秒）
+POLL_MS = 200
+
+lock_file = None
+
+
+def parse_commands(argv):
+    commands = []
+    args = iter(argv)
+    for arg in args:
+        if arg == "--select":
+            name = next(args, None)
+            if name:
+                commands.append({"select": name})
+        elif arg == "--settings":
+            commands.append({"settings": True})
+        elif arg == "--reload":
+            commands.append({"reload": True})
+    return commands or [{"show": True}]
+
+
+def acquire(path):
+    # 成功时返回打开的锁文件（进程退出或崩溃时系统自动释放锁），已被占用时返回 None
+    f = open(path, "a+")
+    try:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+def release():
+    # 重启前调用，新进程才能拿到锁
+    global lock_file
+    if lock_file is not None:
+        lock_file.close()
+        lock_file = None
+
+
+def forward(info_path, commands, timeout=FORWARD_TIMEOUT):
+    # 把命令发给正在运行的程序，成功时返回 True
+    import socket
+    message = None
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with open(info_path, "r", encoding="utf-8") as f:
+                address = json.load(f)
+            message = json.dumps({"token": address["token"], "commands": commands}, ensure_ascii=False)
+            with socket.create_connection(("127.0.0.1", address["port"]), timeout=2) as sock:
+                sock.sendall(message.encode("utf-8") + b"\n")
+                return sock.makefile("rb").readline().strip() == b"ok"
+        except (OSError, ValueError, KeyError):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+
+def claim(directory, argv):
+    """启动时最先调用。返回 InstanceServer 表示本进程是唯一的实例；返回 None 表示命令已经转发，应当退出。"""
+    global lock_file
+    if os.environ.get("DAOJISHI_MULTI_INSTANCE"):
+        return InstanceServer(None)
+    lock_file = acquire(os.path.join(directory, LOCK_NAME))
+    info_path = os.path.join(directory, INFO_NAME)
+    if lock_file is not None:
+        return InstanceServer(info_path)
+    if forward(info_path, parse_commands(argv[1:])):
+        return None
+    # 持有锁的程序没有响应（例如卡在启动阶段），不再启动第二个实例
+    print("倒计时已经在运行，但没有响应转发的命令")
+    return None
+
+
+class InstanceServer:
+    """在后台线程接收其他进程转发的命令，交给界面线程执行。
+
+    后台线程只把命令放进 commands，不调用任何 Tk 方法（Tkinter 不保证跨线程调用安全）；
+    start(widget, handler) 在界面线程中用 widget.after 每 POLL_MS 毫秒取出命令，调用 handler。
+    """
+
+    def __init__(self, info_path):
+        self.info_path = info_path
+        self.token = None
+        self.sock = None
+        self.widget = None
+        self.handler = None
+        self.commands = deque()
+
+    def start(self, widget, handler):
+        if self.info_path is None:
+            return
+        import secrets
+        import socket
+        import threading
+        self.token = secrets.token_hex(16)
+        self.widget = widget
+        self.handler = handler
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(8)
+        temp_path = self.info_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"port": self.sock.getsockname()[1], "token": self.token, "pid": os.getpid()}, f)
+        os.replace(temp_path, self.info_path)
+        threading.Thread(target=self.serve, name="single-instance", daemon=True).start()
+        self.widget.after(POLL_MS, self.poll)
+
+    def serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            with conn:
+                try:
+                    conn.settimeout(2)
+                    message = json.loads(conn.makefile("rb").readline(MAX_MESSAGE))
+                    if message.get("token") != self.token:
+                        continue
+                    self.commands.extend(message["commands"])
+                    conn.sendall(b"ok\n")
+                except (OSError, ValueError, KeyError, AttributeError, TypeError):
+                    continue
+
+    def poll(self):
+        try:
+            self.dispatch()
+        finally:
+            self.widget.after(POLL_MS, self.poll)
+
+    def dispatch(self):
+        while self.commands:
+            self.handler(self.commands.popleft())
@@ -0,0 +1,265 @@
+import abc
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+# 常驻的 PowerShell 进程：System.Speech 只加载一次，之后逐行读取以制表符分隔的命令，
+# 每条命令执行完回写一行作为确认（"." 成功，"!" 失败）
+#   S <文字>          直接朗读
+#   R <wav路径> <文字> 合成到文件
+#   P <wav路径>       播放文件
+#   V <语速> <声音>    设置语速和声音
+POWERSHELL_SCRIPT = (
+    "[Console]::InputEncoding=[Text.Encoding]::UTF8;"
+    "Add-Type -AssemblyName System.Speech;"
+    "$s=New-Object System.Speech.Synthesis.SpeechSynthesizer;"
+    "while(($l=[Console]::In.ReadLine()) -ne $null){$p=$l.Split([char]9,3);$r='.';"
+    "try{switch($p[0]){"
+    "'S'{$s.SetOutputToDefaultAudioDevice();$s.Speak($p[1])};"
+    "'R'{$s.SetOutputToWaveFile($p[1]);try{$s.Speak($p[2])}finally{$s.SetOutputToNull()}};"
+    "'P'{(New-Object System.Media.SoundPlayer $p[1]).PlaySync()};"
+    "'V'{$s.Rate=[int]$p[1];if($p[2]){$s.SelectVoice($p[2])}}"
+    "}}catch{$r='!'};[Console]::Out.WriteLine($r);[Console]::Out.Flush()}"
+)
+
+
+class SpeechBackend(abc.ABC):
+    """语音后端接口。speak、render、play 在语音线程中调用，阻塞直到完成；
+    cancel 可以从任何线程调用，打断正在进行的 speak 或 play，被打断的调用正常返回。"""
+
+    @abc.abstractmethod
+    def speak(self, text):
+        """直接朗读 text。"""
+
+    @abc.abstractmethod
+    def render(self, text, path):
+        """把 text 合成为音频文件 path，不发声。"""
+
+    @abc.abstractmethod
+    def play(self, path):
+        """播放 render 生成的音频文件。"""
+
+    def cancel(self):
+        """打断当前句子；没有在朗读时什么也不做。"""
+
+    def close(self):
+        """释放后端占用的进程或设备。"""
+
+
+class PowerShellBackend(SpeechBackend):
+    """PowerShell 逐行执行命令，朗读或播放期间读不到新的命令，cancel 只能结束整个进程；
+    下一句话时重新启动进程。合成到文件（预热）不会被打断。"""
+
+    def __init__(self, voice="", rate=0):
+        self.voice = voice
+        self.rate = rate
+        self.process = None
+        self.lock = threading.Lock()
+        self.playing = None  # 正在执行 S 或 P 命令的进程
+        self.cancelled = None  # 被 cancel 结束的进程
+
+    def start(self):
+        self.process = subprocess.Popen(
+            ["powershell.exe", "-NoProfile", "-NonInteractive", "-Command", POWERSHELL_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        )
+        if self.voice or self.rate:
+            self.command("V", str(self.rate), self.voice)
+
+    def command(self, *parts):
+        if self.process is None or self.process.poll() is not None:
+            self.start()
+        process = self.process
+        line = "\t".join(" ".join(part.split()) for part in parts) + "\n"
+        with self.lock:
+            if parts[0] in ("S", "P"):
+                self.playing = process
+        try:
+            process.stdin.write(line.encode("utf-8"))
+            process.stdin.flush()
+            reply = process.stdout.readline().strip()
+        except OSError:
+            reply = b""
+        finally:
+            with self.lock:
+                self.playing = None
+                cancelled = self.cancelled is process
+        if not reply:
+            # 进程退出了，下次朗读时重新启动；被 cancel 结束的不算失败
+            self.process = None
+            self.reap(process)
+            if cancelled:
+                return
+            raise RuntimeError("语音进程已退出")
+        if reply != b".":
+            raise RuntimeError(f"语音命令执行失败: {parts[0]}")
+
+    def speak(self, text):
+        self.command("S", text)
+
+    def render(self, text, path):
+        self.command("R", os.path.abspath(path), text)
+
+    def play(self, path):
+        self.command("P", os.path.abspath(path))
+
+    def cancel(self):
+        with self.lock:
+            process = self.playing
+            if process is None:
+                return
+            self.cancelled = process
+        try:
+            process.kill()
+        except OSError:
+            pass  # 已经退出
+
+    def reap(self, process):
+        for pipe in (process.stdin, process.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+        process.wait()
+
+    def close(self):
+        if self.process is not None:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+            self.process = None
+
+
+class FakeBackend(SpeechBackend):
+    """不发声的本地后端，用于在 Linux 上测量延迟和吞吐量。"""
+
+    def __init__(self, startup=0.0, seconds_per_char=0.0, render_seconds=0.0, bytes_per_char=2000):
+        self.startup = startup
+        self.seconds_per_char = seconds_per_char
+        self.render_seconds = render_seconds
+        self.bytes_per_char = bytes_per_char
+        self.started = False
+        self.spoken = []
+        self.interrupted = []
+        self.rendered = []
+        self.cancelled = threading.Event()
+
+    def warm_up(self):
+        if not self.started:
+            time.sleep(self.startup)
+            self.started = True
+
+    def speak(self, text):
+        self.warm_up()
+        time.sleep(self.render_seconds)
+        self.play_text(text)
+
+    def play_text(self, text):
+        self.cancelled.clear()
+        if self.cancelled.wait(self.seconds_per_char * len(text)):
+            self.interrupted.append(text)
+        else:
+            self.spoken.append(text)
+
+    def render(self, text, path):
+        self.warm_up()
+        time.sleep(self.render_seconds)
+        # 文件头之后放入原文，便于 play 时还原
+        with open(path, "wb") as f:
+            f.write(b"FAKE" + text.encode("utf-8") + b"\0" * (self.bytes_per_char * len(text)))
+        self.rendered.append(text)
+
+    def play(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        self.play_text(data[4:].rstrip(b"\0").decode("utf-8"))
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+def make_backend(name=None, voice="", rate=0):
+    name = name or os.environ.get("DAOJISHI_SPEECH_BACKEND") or ("powershell" if sys.platform == "win32" else "fake")
+    if name == "powershell":
+        return PowerShellBackend(voice, rate)
+    if name == "fake":
+        return FakeBackend()
+    raise ValueError(f"未知的语音后端: {name}")
+
+
+class SpeechEngine:
+    """常驻语音线程，从有界队列中取出文字交给后端朗读。
+
+    带 kind 的播报（例如切换考试时的倒计时播报）只保留最新的一条：
+    队列中同类的旧播报会被合并掉，正在朗读的同类播报会被打断。
+    """
+
+    def __init__(self, backend, maxsize=8):
+        self.backend = backend
+        self.maxsize = maxsize
+        self.queue = deque()
+        self.cond = threading.Condition()
+        self.current = None  # 正在朗读的 (text, kind)
+        self.closed = False
+        self.stats = {"queued": 0, "merged": 0, "dropped": 0, "preempted": 0, "spoken": 0, "failed": 0}
+        self.latencies = deque(maxlen=256)  # 入队到开始朗读的秒数
+        self.thread = threading.Thread(target=self.run, name="speech", daemon=True)
+        self.thread.start()
+
+    def say(self, text, kind=None):
+        with self.cond:
+            if self.closed:
+                return
+            if kind is not None:
+                stale = [item for item in self.queue if item[1] == kind]
+                for item in stale:
+                    self.queue.remove(item)
+                self.stats["merged"] += len(stale)
+                if self.current is not None and self.current[1] == kind:
+                    self.stats["preempted"] += 1
+                    self.backend.cancel()
+            if len(self.queue) >= self.maxsize:
+                self.queue.popleft()
+                self.stats["dropped"] += 1
+            self.queue.append((text, kind, time.monotonic()))
+            self.stats["queued"] += 1
+            self.cond.notify_all()
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.queue and not self.closed:
+                    self.cond.wait()
+                if self.closed:
+                    return
+                text, kind, queued_at = self.queue.popleft()
+                self.current = (text, kind)
+            self.latencies.append(time.monotonic() - queued_at)
+            try:
+                self.backend.speak(text)
+                self.stats["spoken"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"语音播放失败: {str(e)}")
+            finally:
+                with self.cond:
+                    self.current = None
+                    self.cond.notify_all()
+
+    def wait_idle(self, timeout=None):
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.queue and self.current is None, timeout)
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.queue.clear()
+            self.cond.notify_all()
+        self.backend.cancel()
+        self.backend.close()
@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+
+# 启动耗时分析：在入口脚本里第一个导入本模块，之后用 mark() 记录各阶段。
+# 用 --profile-startup 参数或 DAOJISHI_PROFILE_STARTUP=1 开启，界面完全就绪后打印各阶段耗时；
+# 设置 DAOJISHI_STARTUP_BUDGET_MS 时，首次绘制超过预算会给出提示；
+# 再加上 --exit-after-startup 参数则打印后立即退出，超出预算时退出状态非零，便于在 CI 中测量。
+# 需要逐个模块的导入耗时时，可以配合 python -X importtime 使用。
+
+START = time.perf_counter()
+enabled = "--profile-startup" in sys.argv or bool(os.environ.get("DAOJISHI_PROFILE_STARTUP"))
+exit_after_startup = "--exit-after-startup" in sys.argv
+marks = []
+
+
+def mark(name):
+    if enabled:
+        marks.append((name, time.perf_counter()))
+
+
+def elapsed_ms(name):
+    for stage, at in marks:
+        if stage == name:
+            return (at - START) * 1e3
+    return None
+
+
+def report():
+    if not enabled:
+        return True
+    print(f"{'阶段':<24}{'时间点(ms)':>12}{'耗时(ms)':>12}")
+    previous = START
+    for name, at in marks:
+        print(f"{name:<24}{(at - START) * 1e3:>12.1f}{(at - previous) * 1e3:>12.1f}")
+        previous = at
+    budget = os.environ.get("DAOJISHI_STARTUP_BUDGET_MS")
+    first_paint = elapsed_ms("首次绘制")
+    if budget and first_paint is not None and first_paint > float(budget):
+        print(f"首次绘制 {first_paint:.1f} ms 超出预算 {float(budget):.1f} ms")
+        return False
+    return True
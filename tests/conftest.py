@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 模块都放在仓库根目录，测试直接导入
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
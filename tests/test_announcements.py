@@ -0,0 +1,153 @@
+from datetime import datetime
+
+import pytest
+
+from announcements import GRACE_SECONDS, AnnouncementScheduler, Rule
+
+# 2026-10-19 是星期一
+MONDAY = datetime(2026, 10, 19)
+
+
+class FakeClock:
+    # 系统时钟和单调时钟分开走，jump() 只改系统时钟
+    def __init__(self, start):
+        self.wall = start.timestamp()
+        self.mono = 0.0
+
+    def advance(self, seconds):
+        self.wall += seconds
+        self.mono += seconds
+
+    def jump(self, seconds):
+        self.wall += seconds
+
+
+class FakeWidget:
+    def __init__(self):
+        self.callback = None
+        self.delay = None
+
+    def after(self, ms, callback):
+        self.callback = callback
+        self.delay = ms / 1000
+        return 1
+
+    def after_cancel(self, event):
+        self.callback = None
+
+
+def make_scheduler(rules, start):
+    clock = FakeClock(start)
+    widget = FakeWidget()
+    said = []
+    scheduler = AnnouncementScheduler(widget, rules, lambda rule: said.append((datetime.fromtimestamp(clock.wall), rule)),
+                                      clock=lambda: clock.wall, monotonic=lambda: clock.mono)
+    scheduler.start()
+    return scheduler, clock, widget, said
+
+
+def run_until(clock, widget, end):
+    # 定时器按时触发，直到系统时钟到达 end
+    end = end.timestamp()
+    while clock.wall + widget.delay <= end:
+        clock.advance(widget.delay)
+        widget.callback()
+
+
+def times(said):
+    return [moment.replace(microsecond=0).strftime("%H:%M") for moment, _ in said]
+
+
+def test_at_rule_next_after():
+    rule = Rule({"at": "07:30"})
+    assert rule.next_after(MONDAY.replace(hour=7)) == MONDAY.replace(hour=7, minute=30)
+    # 正好在播报时刻时取下一天
+    assert rule.next_after(MONDAY.replace(hour=7, minute=30)) == datetime(2026, 10, 20, 7, 30)
+
+
+def test_days_skip_weekend():
+    rule = Rule({"at": "12:00", "days": "MO, FR"})
+    assert rule.next_after(MONDAY.replace(hour=13)) == datetime(2026, 10, 23, 12)
+    assert rule.next_after(datetime(2026, 10, 23, 13)) == datetime(2026, 10, 26, 12)
+
+
+def test_every_rule_window():
+    rule = Rule({"every": 45, "from": "19:00", "to": "21:00"})
+    assert rule.next_after(MONDAY.replace(hour=8)) == MONDAY.replace(hour=19)
+    assert rule.next_after(MONDAY.replace(hour=19)) == MONDAY.replace(hour=19, minute=45)
+    assert rule.next_after(MONDAY.replace(hour=19, minute=50)) == MONDAY.replace(hour=20, minute=30)
+    # 21:15 超出 to，换到第二天
+    assert rule.next_after(MONDAY.replace(hour=20, minute=30)) == datetime(2026, 10, 20, 19)
+
+
+@pytest.mark.parametrize("item", [
+    {"at": "07:30", "every": 10},
+    {"say": "nearest"},
+    {"at": "25:00"},
+    {"at": "07:30", "say": "weather"},
+    {"at": "07:30", "days": "MON"},
+    {"every": 0},
+    {"every": "10"},
+    {"every": 10, "from": "20:00", "to": "19:00"},
+])
+def test_invalid_rules(item):
+    with pytest.raises(ValueError):
+        Rule(item)
+
+
+def test_invalid_rule_schedules_nothing():
+    widget = FakeWidget()
+    with pytest.raises(ValueError):
+        AnnouncementScheduler(widget, [{"at": "07:30"}, {"at": "bad"}], print)
+    assert widget.callback is None
+
+
+def test_fires_on_time_through_the_day():
+    rules = [{"at": "07:30"}, {"every": 60, "from": "19:00", "to": "21:00", "say": "encouragement"}]
+    scheduler, clock, widget, said = make_scheduler(rules, MONDAY.replace(hour=7))
+    run_until(clock, widget, MONDAY.replace(hour=22))
+    assert times(said) == ["07:30", "19:00", "20:00", "21:00"]
+    assert [rule.say for _, rule in said] == ["nearest", "encouragement", "encouragement", "encouragement"]
+    assert scheduler.skipped == 0 and scheduler.jumps == 0
+    # 每次最多睡 MAX_SLEEP_MS，一天醒来不到 24 * 60 次
+    assert scheduler.wakeups <= 15 * 60 + 4
+
+
+def test_late_timer_within_grace_still_announces():
+    scheduler, clock, widget, said = make_scheduler([{"at": "07:30"}], MONDAY.replace(hour=7, minute=29))
+    clock.advance(60 + GRACE_SECONDS - 5)  # 界面线程忙，定时器晚醒了 55 秒
+    widget.callback()
+    assert len(said) == 1 and scheduler.skipped == 0
+
+
+def test_late_timer_beyond_grace_is_skipped():
+    scheduler, clock, widget, said = make_scheduler([{"at": "07:30"}], MONDAY.replace(hour=7, minute=29))
+    clock.advance(60 + GRACE_SECONDS + 5)
+    widget.callback()
+    assert said == [] and scheduler.skipped == 1
+    assert scheduler.upcoming(1)[0][0] == datetime(2026, 10, 20, 7, 30)
+
+
+def test_forward_jump_skips_missed_and_rebuilds():
+    rules = [{"at": "07:30"}, {"every": 30, "from": "07:00", "to": "12:00"}]
+    scheduler, clock, widget, said = make_scheduler(rules, MONDAY.replace(hour=7, minute=10))
+    clock.jump(3 * 3600)  # 系统休眠了 3 小时，单调时钟没有走
+    widget.callback()
+    assert said == []
+    assert scheduler.jumps == 1 and scheduler.skipped == 2
+    assert scheduler.upcoming(2)[0][0] == MONDAY.replace(hour=10, minute=30)
+    run_until(clock, widget, MONDAY.replace(hour=11, minute=5))
+    assert times(said) == ["10:30", "11:00"]
+
+
+def test_backward_jump_does_not_repeat():
+    scheduler, clock, widget, said = make_scheduler([{"at": "07:30"}], MONDAY.replace(hour=7, minute=29))
+    run_until(clock, widget, MONDAY.replace(hour=7, minute=31))
+    assert len(said) == 1
+    clock.jump(-3600)  # 时钟往回调了一小时，6:31 起再次经过 7:30
+    clock.advance(widget.delay)
+    widget.callback()
+    assert scheduler.jumps == 1
+    assert scheduler.upcoming(1)[0][0] == datetime(2026, 10, 20, 7, 30)
+    run_until(clock, widget, MONDAY.replace(hour=8))
+    assert len(said) == 1
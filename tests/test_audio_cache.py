@@ -0,0 +1,103 @@
+import os
+import time
+
+import pytest
+
+from audio_cache import AudioCache, CachedBackend, cache_key
+from speech import FakeBackend
+
+
+def add(cache, key, size):
+    temp_path = cache.temp_path(key)
+    with open(temp_path, "wb") as f:
+        f.write(b"\0" * size)
+    return cache.commit(key, temp_path)
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("等待超时")
+        time.sleep(0.005)
+
+
+class BrokenRender(FakeBackend):
+    def render(self, text, path):
+        raise RuntimeError("无法合成")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AudioCache(str(tmp_path), max_bytes=300)
+
+
+def test_evicts_least_recently_used(cache):
+    add(cache, "a", 100)
+    add(cache, "b", 100)
+    add(cache, "c", 100)
+    assert cache.get("a") is not None  # a 变成最近使用
+    add(cache, "d", 100)
+    assert "b" not in cache
+    assert list(cache.entries) == ["c", "a", "d"]
+    assert cache.total_bytes == 300
+    assert not os.path.exists(cache.path_for("b"))
+    assert cache.report()["evictions"] == 1
+
+
+def test_keeps_single_oversized_entry(cache):
+    add(cache, "a", 100)
+    add(cache, "big", 1000)
+    assert list(cache.entries) == ["big"]
+
+
+def test_replacing_entry_updates_size(cache):
+    add(cache, "a", 100)
+    add(cache, "a", 250)
+    assert cache.total_bytes == 250 and len(cache.entries) == 1
+
+
+def test_scan_restores_order_by_mtime(tmp_path):
+    first = AudioCache(str(tmp_path), max_bytes=1000)
+    for i, key in enumerate(["old", "new", "middle"]):
+        os.utime(add(first, key, 100), (1000, 1000 + [0, 2, 1][i]))
+    second = AudioCache(str(tmp_path), max_bytes=250)
+    # 重新打开时超出上限，按修改时间淘汰最旧的
+    assert list(second.entries) == ["middle", "new"]
+    assert not os.path.exists(second.path_for("old"))
+
+
+def test_missing_file_is_forgotten(cache):
+    path = add(cache, "a", 100)
+    os.remove(path)
+    assert cache.get("a") is None
+    assert "a" not in cache and cache.total_bytes == 0
+
+
+def test_cached_backend_renders_once(cache):
+    fake = FakeBackend()
+    backend = CachedBackend(fake, cache)
+    backend.speak("加油")
+    backend.speak("加油")
+    assert fake.rendered == ["加油"]
+    assert fake.spoken == ["加油", "加油"]
+    assert cache.report()["hits"] == 1 and cache.report()["misses"] == 1
+
+
+def test_warm_skips_cached_and_duplicate_texts(cache):
+    fake = FakeBackend()
+    backend = CachedBackend(fake, cache)
+    backend.speak("一")
+    backend.warm(["一", "二", "二", "三"])
+    wait_until(lambda: cache_key("三") in cache)
+    assert fake.rendered == ["一", "二", "三"]
+    assert fake.spoken == ["一"]
+
+
+def test_render_failure_falls_back_to_speaking(cache, capsys):
+    fake = BrokenRender()
+    backend = CachedBackend(fake, cache)
+    backend.speak("加油")
+    assert fake.spoken == ["加油"]
+    assert len(cache.entries) == 0
+    assert "无法合成" in capsys.readouterr().out
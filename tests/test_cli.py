@@ -0,0 +1,71 @@
+import importlib.util
+import os
+
+import pytest
+
+# 文件名里有连字符，不能直接 import
+spec = importlib.util.spec_from_file_location(
+    "daojishi_cli", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "daojishi-cli.py"))
+cli = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(cli)
+
+
+class FakeClocks:
+    # 系统时钟和单调时钟分开走；suspend() 模拟系统休眠：系统时钟前进，单调时钟不动
+    def __init__(self):
+        self.wall = 1_000_000.0
+        self.mono = 0.0
+        self.sleeps = []
+        self.suspend_at = None
+
+    def clock(self):
+        return self.wall
+
+    def monotonic(self):
+        return self.mono
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.wall += seconds
+        self.mono += seconds
+        if self.suspend_at is not None and len(self.sleeps) == self.suspend_at:
+            self.wall += 8 * 3600
+
+    def wait(self, delay, changed=lambda: False):
+        return cli.wait_for_change(delay, changed, self.clock, self.monotonic, self.sleep)
+
+
+def test_sleeps_until_deadline():
+    clocks = FakeClocks()
+    assert not clocks.wait(10)
+    assert sum(clocks.sleeps) == pytest.approx(10)
+    assert max(clocks.sleeps) <= cli.CONFIG_POLL_SECONDS
+
+
+def test_wakes_after_suspend():
+    clocks = FakeClocks()
+    clocks.suspend_at = 2
+    # 距离零点还有 6 小时，休眠了 8 小时：唤醒后第一次检查就返回
+    assert not clocks.wait(6 * 3600)
+    assert len(clocks.sleeps) == 2
+
+
+def test_wall_clock_set_back_is_capped():
+    clocks = FakeClocks()
+
+    def sleep(seconds):
+        clocks.mono += seconds  # 系统时钟一直停在原地
+        clocks.sleeps.append(seconds)
+    assert not cli.wait_for_change(24 * 3600, lambda: False, clocks.clock, clocks.monotonic, sleep)
+    assert sum(clocks.sleeps) == pytest.approx(cli.MAX_SLEEP_MS / 1000)
+
+
+def test_returns_when_config_changes():
+    clocks = FakeClocks()
+    checks = []
+
+    def changed():
+        checks.append(clocks.wall)
+        return len(checks) == 3
+    assert clocks.wait(3600, changed)
+    assert len(clocks.sleeps) == 3
@@ -0,0 +1,119 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+import config_snapshot
+import countdown_core
+import divisor_sum
+from config_snapshot import HEADER, MAGIC, SNAPSHOT_SUFFIX
+from countdown_index import CountdownIndex
+from persistence import atomic_write_json
+
+MIXED = [
+    {"name": "期中", "date": "2025/3/1"},
+    {"name": "托福", "date": "2025-06-01", "time": "09:00", "tz": "UTC"},
+    {"name": "期中", "date": "2025/4/1"},
+    {"name": "雅思", "date": "2025-06-02T08:30:00+08:00"},
+    {"name": "期末", "date": "2025-07-01 14:00"},
+    {"name": "会考", "date": "2025/6/1"},
+]
+
+
+def same_index(a, b):
+    return a.by_date == b.by_date and a.by_name == b.by_name and a.instants == b.instants
+
+
+def large_config(count=config_snapshot.MIN_ENTRIES):
+    info = countdown_core.default_config()
+    info["countdowns"] = MIXED + [{"name": f"考试{i}", "date": f"2026/{i % 12 + 1}/{i % 28 + 1}"} for i in range(count)]
+    return info
+
+
+@pytest.fixture
+def snapshot_config(tmp_path):
+    # 写一个条目足够多的配置，第一次加载时在后台写出快照
+    path = str(tmp_path / "config.json")
+    atomic_write_json(path, large_config())
+    countdown_core.load_config(path)
+    config_snapshot.wait(5)
+    assert os.path.exists(path + SNAPSHOT_SUFFIX)
+    return path
+
+
+def rewrite_keeping_stat(path, change):
+    # 修改文件内容，再把修改时间改回原来的值
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(change(data))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def test_from_ordinals_matches_parsing():
+    ordinals = [countdown_core.snapshot_ordinal(exam) for exam in MIXED]
+    # 带时间或时区的考试记为 0，加载时重新换算
+    assert [bool(ordinal) for ordinal in ordinals] == [True, False, True, False, False, True]
+    fast = CountdownIndex.from_ordinals(MIXED, ordinals)
+    parsed = CountdownIndex(MIXED)
+    assert same_index(fast, parsed)
+    now = datetime(2025, 2, 1, 12)
+    assert fast.upcoming_rows(now) == parsed.upcoming_rows(now)
+    assert fast.next_change(now.timestamp()) == parsed.next_change(now.timestamp())
+    # 之后的增删与直接解析的索引一致
+    for index in (fast, parsed):
+        index.add({"name": "补考", "date": "2025/5/1"})
+        index.discard(MIXED[1])
+    assert same_index(fast, parsed)
+
+
+def test_valid_snapshot_is_used(snapshot_config, monkeypatch):
+    loaded = config_snapshot.load(snapshot_config)
+    assert loaded is not None
+    info, ordinals, password_sum = loaded
+    assert info == countdown_core.read_config(snapshot_config)
+    assert password_sum == divisor_sum.compute(info["password"])
+    # 使用快照时不解析 JSON
+    monkeypatch.setattr(countdown_core.json, "loads", lambda data: pytest.fail("不应解析 JSON"))
+    info, index = countdown_core.load_config(snapshot_config)
+    assert same_index(index, CountdownIndex(info["countdowns"]))
+
+
+def test_mtime_change_invalidates(snapshot_config):
+    st = os.stat(snapshot_config)
+    os.utime(snapshot_config, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert config_snapshot.load(snapshot_config) is None
+
+
+def test_size_change_invalidates(snapshot_config):
+    rewrite_keeping_stat(snapshot_config, lambda data: data + b" ")
+    assert config_snapshot.load(snapshot_config) is None
+
+
+def test_content_change_invalidates(snapshot_config):
+    # 大小和修改时间都不变，只有 SHA-256 不同
+    rewrite_keeping_stat(snapshot_config, lambda data: data.replace("期末".encode("utf-8"), "期初".encode("utf-8"), 1))
+    assert config_snapshot.load(snapshot_config) is None
+    info, index = countdown_core.load_config(snapshot_config)
+    assert "期初" in index and "期末" not in index
+
+
+@pytest.mark.parametrize("header", [
+    HEADER.pack(MAGIC, config_snapshot.FORMAT_VERSION + 1, sys.version_info[0], sys.version_info[1]),
+    HEADER.pack(MAGIC, config_snapshot.FORMAT_VERSION, sys.version_info[0], sys.version_info[1] + 1),
+    HEADER.pack(b"XXXX", config_snapshot.FORMAT_VERSION, sys.version_info[0], sys.version_info[1]),
+])
+def test_other_header_is_rejected(snapshot_config, header):
+    with open(snapshot_config + SNAPSHOT_SUFFIX, "r+b") as f:
+        f.write(header)
+    assert config_snapshot.load(snapshot_config) is None
+
+
+@pytest.mark.parametrize("cut", [HEADER.size, HEADER.size + 10, -10])
+def test_truncated_snapshot_is_rejected(snapshot_config, cut):
+    with open(snapshot_config + SNAPSHOT_SUFFIX, "r+b") as f:
+        f.truncate(cut if cut > 0 else os.path.getsize(snapshot_config + SNAPSHOT_SUFFIX) + cut)
+    assert config_snapshot.load(snapshot_config) is None
+
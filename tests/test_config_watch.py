@@ -0,0 +1,140 @@
+import json
+import os
+from datetime import date
+
+import pytest
+
+import countdown_core
+from config_watch import ConfigWatcher, apply_diff, diff_config, diff_is_empty, reload_config
+from countdown_index import CountdownIndex
+
+
+class FakeWidget:
+    # 代替 Tk 的 after：回调由测试逐个执行
+    def __init__(self):
+        self.callbacks = {}
+        self.next_id = 0
+
+    def after(self, delay, callback):
+        self.next_id += 1
+        self.callbacks[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        del self.callbacks[after_id]
+
+    def run_next(self):
+        after_id = min(self.callbacks)
+        self.callbacks.pop(after_id)()
+
+
+def write_file(path, info, mtime):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(info, f, ensure_ascii=False)
+    # 修改时间写死，连续写入也能得到不同的签名
+    os.utime(path, ns=(mtime, mtime))
+
+
+def make_config(**settings):
+    info = countdown_core.default_config()
+    info.update(settings)
+    return info
+
+
+def test_identical_configs_have_empty_diff():
+    assert diff_is_empty(diff_config(make_config(dashboard_count=3), make_config(dashboard_count=3)))
+
+
+def test_removed_settings_are_reported():
+    old = make_config(announcements=[{"at": "07:30"}], precision_mode="seconds", shared_snapshot=True, dashboard_count=3)
+    diff = diff_config(old, make_config())
+    assert diff["settings"] == {"announcements": None, "precision_mode": None, "shared_snapshot": None, "dashboard_count": None}
+    assert not diff_is_empty(diff)
+
+
+def test_added_and_changed_settings():
+    diff = diff_config(make_config(dashboard_count=3), make_config(dashboard_count=5, api_port=8000))
+    assert diff["settings"] == {"dashboard_count": 5, "api_port": 8000}
+
+
+def test_apply_diff_updates_changed_exams():
+    old = make_config()
+    new = make_config()
+    new["countdowns"] = [{"name": "考试1", "date": "2025-03-01", "time": "09:00", "tz": "UTC"}, {"name": "考试2", "date": "2025/3/2"}]
+    index = CountdownIndex(old["countdowns"])
+    diff = diff_config(old, new)
+    assert sorted(diff["changed"]) == ["考试1"] and diff["removed"] == ["考试3"]
+    apply_diff(old, index, new, diff)
+    assert "考试3" not in index
+    assert index.instant("考试1") == 1740819600
+    assert old["countdowns"] == new["countdowns"]
+
+
+WEEKLY = {"name": "周测", "start": "2025/3/3", "rule": "FREQ=WEEKLY;BYDAY=MO"}
+
+
+def test_reload_config_reseeds_recurring():
+    old = make_config(recurring=[WEEKLY])
+    index = CountdownIndex(old["countdowns"])
+    recurring = countdown_core.load_recurring(old, index, date(2025, 3, 1))
+    assert reload_config(old, index, recurring, make_config(recurring=[WEEKLY]), date(2025, 3, 1)) is None
+    monthly = {"name": "月考", "start": "2025/3/5", "rule": "FREQ=MONTHLY"}
+    diff, recurring = reload_config(old, index, recurring, make_config(recurring=[monthly]), date(2025, 3, 1))
+    assert diff["settings"] == {"recurring": [monthly]}
+    assert "周测" not in index and "月考" in index
+    assert recurring.entries() == [("月考", date(2025, 3, 5))]
+
+
+def test_reload_config_with_bad_rule_changes_nothing():
+    old = make_config(recurring=[WEEKLY])
+    index = CountdownIndex(old["countdowns"])
+    recurring = countdown_core.load_recurring(old, index, date(2025, 3, 1))
+    new = make_config(recurring=[{"name": "周测", "start": "2025/3/3", "rule": "FREQ=SECONDLY"}])
+    new["countdowns"] = []
+    with pytest.raises(ValueError):
+        reload_config(old, index, recurring, new, date(2025, 3, 1))
+    assert old == make_config(recurring=[WEEKLY])
+    assert "考试1" in index and "周测" in index
+
+
+def test_bulk_import_rebuilds_same_index():
+    old = make_config()
+    new = make_config()
+    new["countdowns"] = old["countdowns"] + [{"name": f"日历{i}", "date": f"2026/{i % 12 + 1}/{i % 28 + 1}"} for i in range(1000)]
+    index = CountdownIndex(old["countdowns"])
+    apply_diff(old, index, new, diff_config(old, new))
+    assert index.by_date == CountdownIndex(new["countdowns"]).by_date
+
+
+def start_watcher(tmp_path):
+    path = tmp_path / "config.json"
+    write_file(path, make_config(), 1_000_000_000)
+    widget = FakeWidget()
+    changes = []
+    watcher = ConfigWatcher(widget, str(path), changes.append)
+    watcher.start()
+    return path, widget, watcher, changes
+
+
+def test_external_change_is_reloaded(tmp_path):
+    path, widget, watcher, changes = start_watcher(tmp_path)
+    write_file(path, make_config(name="新名称"), 2_000_000_000)
+    widget.run_next()  # poll：发现变化，等待文件稳定
+    assert changes == []
+    widget.run_next()  # settle
+    assert [info["name"] for info in changes] == ["新名称"]
+    assert watcher.signature == watcher.stat()
+
+
+def test_own_save_during_debounce_is_not_reloaded(tmp_path):
+    path, widget, watcher, changes = start_watcher(tmp_path)
+    write_file(path, make_config(name="外部"), 2_000_000_000)
+    widget.run_next()  # poll：开始等待文件稳定
+    # 等待期间程序自己保存了配置，ConfigStore 写完后调用 sync
+    write_file(path, make_config(name="自己"), 3_000_000_000)
+    watcher.sync()
+    widget.run_next()  # settle
+    assert changes == []
+    assert watcher.candidate is None and len(widget.callbacks) == 1  # 回到定时检查
+    widget.run_next()  # 下一次 poll 也没有变化
+    assert changes == []
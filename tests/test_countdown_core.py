@@ -0,0 +1,113 @@
+from datetime import date, datetime
+
+import pytest
+
+import countdown_core
+from announcements import Rule
+from countdown_core import (SETTINGS_OPTION, add_countdown, advance_recurring, announcement_text, exam_options, keep_selection,
+                            load_or_default, load_recurring, make_countdown, update_countdown, warm_texts)
+from countdown_index import CountdownIndex
+from entry_store import EntryStore
+from phrase_corpus import EncouragementPicker
+
+
+def test_make_countdown_omits_empty_fields():
+    assert make_countdown("期末", "2025/6/1") == {"name": "期末", "date": "2025/6/1"}
+    assert make_countdown("托福", "2025-06-01", "09:00", "UTC") == {"name": "托福", "date": "2025-06-01", "time": "09:00", "tz": "UTC"}
+
+
+@pytest.mark.parametrize("fields", [("", "2025/6/1"), ("期末", ""), ("期末", "明天"), ("期末", "2025/6/1", "25:00"),
+                                    ("期末", "2025/6/1", "", "Mars/Olympus")])
+def test_make_countdown_rejects_bad_input(fields):
+    with pytest.raises(ValueError):
+        make_countdown(*fields)
+
+
+def test_update_keeps_time_zone_and_other_fields():
+    countdowns = EntryStore()
+    key = countdowns.add({"name": "托福", "date": "2025-06-01", "time": "09:00", "tz": "UTC", "note": "带准考证"})
+    old, new = update_countdown(countdowns, key, "托福", "2025-06-02", "09:00", "UTC")
+    assert old["date"] == "2025-06-01"
+    assert countdowns.get(key) == new == {"name": "托福", "date": "2025-06-02", "time": "09:00", "tz": "UTC", "note": "带准考证"}
+    # 清空时间和时区后变回只有日期的考试
+    _, new = update_countdown(countdowns, key, "托福", "2025-06-02")
+    assert new == {"name": "托福", "date": "2025-06-02", "note": "带准考证"}
+
+
+def test_add_returns_key():
+    countdowns = EntryStore()
+    key = add_countdown(countdowns, "托福", "2025-06-01", "09:00")
+    assert countdowns.get(key) == {"name": "托福", "date": "2025-06-01", "time": "09:00"}
+
+
+def test_exam_options_drop_finished_recurring_series():
+    # 2025-03-03 是星期一，周测只有 3 月 3 日和 3 月 10 日两次
+    info = {"countdowns": [{"name": "期末", "date": "2025/6/1"}],
+            "recurring": [{"name": "周测", "start": "2025/3/3", "rule": "FREQ=WEEKLY;BYDAY=MO;COUNT=2"},
+                          {"name": "月考", "start": "2025/1/6", "rule": "FREQ=WEEKLY;COUNT=1"}]}
+    index = CountdownIndex(info["countdowns"])
+    schedule = load_recurring(info, index, date(2025, 3, 1))
+    # 月考在加载之前就结束了
+    assert exam_options(info, index) == ["期末", "周测", SETTINGS_OPTION]
+    assert not advance_recurring(schedule, index, date(2025, 3, 3))
+    assert advance_recurring(schedule, index, date(2025, 3, 4))
+    assert exam_options(info, index) == ["期末", "周测", SETTINGS_OPTION]
+    assert advance_recurring(schedule, index, date(2025, 3, 11))
+    assert "周测" not in index
+    assert exam_options(info, index) == ["期末", SETTINGS_OPTION]
+
+
+def test_load_or_default_reports_and_falls_back(tmp_path):
+    path = str(tmp_path / "config.json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{")
+    reports = []
+    info, index, recurring, loaded = load_or_default(path, date(2025, 3, 1), reports.append)
+    assert not loaded and info == countdown_core.default_config()
+    assert "考试1" in index and len(reports) == 1
+    # 修好之后正常加载
+    countdown_core.ensure_config(path)
+    assert load_or_default(path, date(2025, 3, 1), reports.append)[3]
+    assert len(reports) == 1
+
+
+def test_keep_selection_falls_back_to_start_exam():
+    info = {"countdowns": [{"name": "期中", "date": "2025/4/1"}, {"name": "期末", "date": "2025/6/1"}], "start_countdown_index": 1}
+    index = CountdownIndex(info["countdowns"])
+    assert keep_selection(info, index, "期中") == "期中"
+    assert keep_selection(info, index, "已删除") == "期末"
+    assert keep_selection({"countdowns": []}, CountdownIndex([]), "已删除") == ""
+
+
+def make_speech_state():
+    index = CountdownIndex([{"name": "期中", "date": "2025/4/1"}, {"name": "期末", "date": "2025/6/1"}])
+    return index, EncouragementPicker(lambda: ["加油"])
+
+
+def test_warm_texts_put_selected_first():
+    index, picker = make_speech_state()
+    now = datetime(2025, 3, 1, 8)
+    assert warm_texts(index, "期末", picker, now) == ["距离期末还有 91 天", "加油", "距离期中还有 30 天", "距离期末还有 91 天"]
+
+
+@pytest.mark.parametrize("item, expected", [
+    ({"at": "07:30", "text": "该起床了"}, ("该起床了", "announcement")),
+    ({"at": "07:30", "say": "encouragement"}, ("加油", "encouragement")),
+    ({"at": "07:30", "say": "selected"}, ("距离期末还有 91 天", "countdown")),
+    ({"at": "07:30"}, ("距离期中还有 30 天", "countdown")),
+])
+def test_announcement_text(item, expected):
+    index, picker = make_speech_state()
+    assert announcement_text(Rule(item), index, "期末", picker, datetime(2025, 3, 1, 8)) == expected
+
+
+def test_announcement_without_exams_says_nothing():
+    _, picker = make_speech_state()
+    assert announcement_text(Rule({"at": "07:30"}), CountdownIndex([]), "", picker, datetime(2025, 3, 1, 8)) is None
+
+
+def test_optional_services_stay_off():
+    assert countdown_core.open_publisher({}, "unused.shm") is None
+    assert countdown_core.start_announcer(None, {}, print) is None
+    # 规则有误时只提示
+    assert countdown_core.start_announcer(None, {"announcements": [{"at": "bad"}]}, print) is None
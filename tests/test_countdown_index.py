@@ -0,0 +1,53 @@
+import random
+from datetime import date, datetime
+
+from countdown_index import CountdownIndex
+
+
+def scan_next_change(instants, wall):
+    # 逐个比较的实现，作为对照
+    change = None
+    for instant in instants:
+        if instant > wall:
+            boundary = instant - (instant - wall) // 86400 * 86400
+            if change is None or boundary < change:
+                change = boundary
+    return change
+
+
+def timed_index(instants):
+    index = CountdownIndex()
+    for i, instant in enumerate(instants):
+        index.add_date(f"考试{i}", date.fromtimestamp(instant), instant)
+    return index
+
+
+def test_next_change_matches_scan():
+    rng = random.Random(1)
+    base = 1760000000
+    instants = [base + rng.randrange(-10 ** 6, 10 ** 6) for _ in range(500)]
+    index = timed_index(instants)
+    walls = sorted(base + rng.uniform(-10 ** 6, 1.1 * 10 ** 6) for _ in range(300))
+    # 先按时间前进，再随机往回跳
+    for wall in walls + [base + rng.uniform(-10 ** 6, 10 ** 6) for _ in range(100)]:
+        expected = scan_next_change(instants, wall)
+        found = index.next_change(wall)
+        assert (found is None) == (expected is None)
+        if expected is not None:
+            assert abs(found - expected) < 1e-6
+
+
+def test_next_change_follows_edits():
+    base = 1760000000
+    index = timed_index([base + 3600])
+    assert index.next_change(base) == base + 3600
+    index.add_date("早一点", date.fromtimestamp(base + 600), base + 600)
+    assert index.next_change(base) == base + 600
+    index.remove("早一点")
+    assert index.next_change(base) == base + 3600
+    assert index.next_change(base + 3600) is None
+
+
+def test_whole_day_exams_have_no_next_change():
+    index = CountdownIndex([{"name": "期末", "date": "2025/6/1"}])
+    assert index.next_change(datetime(2025, 5, 1).timestamp()) is None
@@ -0,0 +1,111 @@
+import math
+import threading
+
+import pytest
+
+import divisor_sum
+from divisor_sum import compute, factorize, is_prime, lookup, remember
+
+# 大素数：10^9+7、998244353、2^31-1、2^61-1
+BIG_PRIMES = [1000000007, 998244353, 2147483647, 2305843009213693951]
+
+
+def trial_division(n):
+    # 原来 try.py 中的实现，作为对照
+    try:
+        n = int(n)
+        total = 0
+        for i in range(1, int(math.isqrt(n)) + 1):
+            if n % i == 0:
+                if i == n // i:
+                    total += i
+                else:
+                    total += i + n // i
+        return total
+    except Exception:
+        return -1
+
+
+def test_matches_trial_division_for_small_numbers():
+    for n in range(0, 5000):
+        assert compute(n) == trial_division(n), n
+
+
+def test_matches_trial_division_for_medium_numbers():
+    for n in [10 ** 6, 999983 * 2, 720720, 2 ** 20, 3 ** 12, 1000003 * 1009]:
+        assert compute(n) == trial_division(n), n
+
+
+@pytest.mark.parametrize("p", BIG_PRIMES)
+def test_primes(p):
+    assert is_prime(p)
+    assert compute(p) == p + 1
+
+
+@pytest.mark.parametrize("p, q", [(1000000007, 998244353), (2147483647, 1000000007), (999999937, 999999929)])
+def test_large_semiprimes(p, q):
+    assert factorize(p * q) == {p: 1, q: 1}
+    assert compute(p * q) == (p + 1) * (q + 1)
+
+
+@pytest.mark.parametrize("p", BIG_PRIMES[:3] + [999999937])
+def test_prime_squares(p):
+    assert factorize(p * p) == {p: 2}
+    assert compute(p * p) == 1 + p + p * p
+
+
+def test_pseudoprimes_are_composite():
+    # 561、41041 是 Carmichael 数；3215031751 能骗过底数 2、3、5、7
+    for n in [561, 41041, 3215031751, 1000000007 * 1000000009]:
+        assert not is_prime(n)
+
+
+@pytest.mark.parametrize("value", [-1, "-12", "abc", "", None, "12.5", [1]])
+def test_invalid_input_returns_minus_one(value):
+    assert compute(value) == -1
+    assert trial_division(value) == -1
+
+
+def test_string_input_same_as_int():
+    assert compute("1000") == compute(1000) == trial_division("1000")
+
+
+@pytest.fixture
+def fresh_results(monkeypatch):
+    monkeypatch.setattr(divisor_sum, "results", {})
+    monkeypatch.setattr(divisor_sum, "pending", {})
+
+
+def test_lookup_waits_for_background_result(fresh_results, monkeypatch):
+    release = threading.Event()
+    real_compute = divisor_sum.compute
+
+    def slow_compute(value):
+        release.wait(5)
+        return real_compute(value)
+    monkeypatch.setattr(divisor_sum, "compute", slow_compute)
+    divisor_sum.precompute("28")
+    assert lookup("28", timeout=0.01) is None
+    release.set()
+    assert lookup("28", timeout=5) == 56
+    # 之后直接返回记住的结果
+    assert lookup("28") == 56
+
+
+def test_precompute_runs_once(fresh_results, monkeypatch):
+    calls = []
+
+    def counting_compute(value):
+        calls.append(value)
+        return -1
+    monkeypatch.setattr(divisor_sum, "compute", counting_compute)
+    for _ in range(5):
+        divisor_sum.precompute("x")
+    assert divisor_sum.divisor_sum("x") == -1
+    assert calls == ["x"]
+
+
+def test_remembered_result_skips_computation(fresh_results, monkeypatch):
+    monkeypatch.setattr(divisor_sum, "compute", lambda value: pytest.fail("不应重新计算"))
+    remember("1000", 2340)
+    assert lookup("1000") == 2340
@@ -0,0 +1,84 @@
+import random
+from datetime import date, datetime, timezone
+
+import pytest
+
+from exam_time import exam_target, parse_clock, parse_offset, parse_when
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Z", 0),
+    ("+08", 8 * 3600),
+    ("-05", -5 * 3600),
+    ("+0530", 5 * 3600 + 30 * 60),
+    ("-0330", -(3 * 3600 + 30 * 60)),
+    ("+08:00", 8 * 3600),
+    ("-09:30", -(9 * 3600 + 30 * 60)),
+])
+def test_parse_offset(text, expected):
+    assert parse_offset(text) == expected
+
+
+@pytest.mark.parametrize("text", ["+8", "+080", "+08:0", "+08-00", "+0860", "+2500", "08:00", "+08:000", "+０８"])
+def test_parse_offset_rejects(text):
+    assert parse_offset(text) is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2025/3/1", (date(2025, 3, 1), None, None)),
+    ("2025-03-01", (date(2025, 3, 1), None, None)),
+    (" 2025/12/31 ", (date(2025, 12, 31), None, None)),
+    ("2025-03-01 09:00", (date(2025, 3, 1), (9, 0, 0), None)),
+    ("2025/3/1 9:00:30", (date(2025, 3, 1), (9, 0, 30), None)),
+    ("2025-03-01T09:00:00.250", (date(2025, 3, 1), (9, 0, 0), None)),
+    ("2025-03-01T09:00:00+08:00", (date(2025, 3, 1), (9, 0, 0), 8 * 3600)),
+    ("2025-03-01T09:00+08", (date(2025, 3, 1), (9, 0, 0), 8 * 3600)),
+    ("2025-03-01T09:00-0530", (date(2025, 3, 1), (9, 0, 0), -(5 * 3600 + 30 * 60))),
+    ("2025-03-01T01:00Z", (date(2025, 3, 1), (1, 0, 0), 0)),
+    ("2025年3月1日", (date(2025, 3, 1), None, None)),
+    ("20250301T090000Z", (date(2025, 3, 1), (9, 0, 0), 0)),
+    ("01.03.2025", (date(2025, 3, 1), None, None)),
+])
+def test_parse_when(text, expected):
+    assert parse_when(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "明天", "2025/2/30", "2025/13/1", "25/3/1", "2025/3/1 T", "2025/3/1 24:00",
+                                  "2025/3/1 9:60", "2025-03-01T", "2025-03-01T09", "2025/+3/1", "2025/3/1 9:00+8", None, 20250301])
+def test_parse_when_rejects(text):
+    with pytest.raises(ValueError):
+        parse_when(text)
+
+
+def test_legacy_dates_match_strptime():
+    rng = random.Random(7)
+    for _ in range(2000):
+        day = date.fromordinal(rng.randrange(date(1900, 1, 1).toordinal(), date(2100, 1, 1).toordinal()))
+        text = f"{day.year}/{day.month}/{day.day}"
+        assert parse_when(text)[0] == datetime.strptime(text, "%Y/%m/%d").date()
+
+
+def test_parse_clock():
+    assert parse_clock("9:00") == (9, 0, 0)
+    assert parse_clock("13:30:15") == (13, 30, 15)
+    for text in ("25:00", "9", "9:00+08", None):
+        with pytest.raises(ValueError):
+            parse_clock(text)
+
+
+def test_exam_target_whole_day_has_no_instant():
+    assert exam_target({"name": "期末", "date": "2025/6/1"}) == (date(2025, 6, 1), None)
+
+
+def test_exam_target_with_offset_and_zone():
+    expected = int(datetime(2025, 6, 1, 1, 0, tzinfo=timezone.utc).timestamp())
+    assert exam_target({"name": "a", "date": "2025-06-01T09:00+08"})[1] == expected
+    assert exam_target({"name": "a", "date": "2025-06-01", "time": "09:00", "tz": "Asia/Shanghai"})[1] == expected
+    assert exam_target({"name": "a", "date": "2025-06-01", "time": "01:00", "tz": "UTC"})[1] == expected
+    # 夏令时：纽约 6 月是 UTC-4
+    assert exam_target({"name": "a", "date": "2025-05-31", "time": "21:00", "tz": "America/New_York"})[1] == expected
+
+
+def test_exam_target_rejects_unknown_zone():
+    with pytest.raises(ValueError):
+        exam_target({"name": "a", "date": "2025-06-01", "tz": "Mars/Olympus"})
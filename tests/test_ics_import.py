@@ -0,0 +1,84 @@
+from datetime import date
+
+import countdown_core
+from ics_import import import_events, import_file, read_events, split_property, start_time, unescape, unfold
+from persistence import atomic_write_json
+
+CALENDAR = """BEGIN:VCALENDAR\r
+BEGIN:VEVENT\r
+SUMMARY:期末考试\\, 数学\\;\r
+  物理\r
+DTSTART;TZID="Asia/Shanghai":20250601T090000\r
+BEGIN:VALARM\r
+SUMMARY:提醒\r
+END:VALARM\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+SUMMARY:周测\r
+DTSTART;VALUE=DATE:20250303\r
+RRULE:FREQ=WEEKLY;BYDAY=MO\r
+EXDATE:20250310,20250317\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+SUMMARY:去年的考试\r
+DTSTART:20240101\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+SUMMARY:没有日期\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+
+
+def test_unfold_joins_continuation_lines():
+    assert list(unfold(["SUMMARY:很长的\r\n", " 考试\r\n", "\t名称\n", "DTSTART:20250301\n"])) == [
+        "SUMMARY:很长的考试名称", "DTSTART:20250301"]
+
+
+def test_unescape():
+    assert unescape(r"数学\, 物理\; 化学\\生物\n第二行\N第三行") == "数学, 物理; 化学\\生物\n第二行\n第三行"
+    assert unescape("结尾\\") == "结尾"
+
+
+def test_split_property_respects_quotes():
+    assert split_property('DTSTART;TZID="Foo:Bar":20250301T090000') == ("DTSTART", 'TZID="Foo:Bar"', "20250301T090000")
+    assert split_property("summary:a:b") == ("SUMMARY", "", "a:b")
+    assert split_property("NOCOLON") == ("NOCOLON", "", "")
+
+
+def test_read_events_ignores_nested_components():
+    events = list(read_events(CALENDAR.splitlines(True)))
+    assert len(events) == 4
+    assert events[0]["SUMMARY"][1] == "期末考试\\, 数学\\; 物理"
+    assert events[1]["EXDATE"] == ["20250310", "20250317"]
+
+
+def test_start_time():
+    assert start_time("VALUE=DATE", "20250601") == {}
+    assert start_time("", "20250601T010000Z") == {"time": "01:00", "tz": "UTC"}
+    assert start_time('TZID="Asia/Shanghai"', "20250601T090000") == {"time": "09:00", "tz": "Asia/Shanghai"}
+    # Windows 时区名无法识别时按本地时间
+    assert start_time("TZID=China Standard Time", "20250601T090000") == {"time": "09:00"}
+
+
+def test_import_events_counts_and_skips_duplicates():
+    info = countdown_core.default_config()
+    info["countdowns"] = []
+    events = list(read_events(CALENDAR.splitlines(True)))
+    counts = import_events(info, events, date(2025, 3, 4))
+    assert counts == {"added": 1, "recurring": 1, "past": 1, "unsupported": 1, "duplicate": 0}
+    assert info["countdowns"] == [{"name": "期末考试, 数学; 物理", "date": "2025/6/1", "time": "09:00", "tz": "Asia/Shanghai"}]
+    assert info["recurring"] == [{"name": "周测", "start": "2025/3/3", "rule": "FREQ=WEEKLY;BYDAY=MO", "exdates": ["2025/3/10", "2025/3/17"]}]
+    assert import_events(info, events, date(2025, 3, 4))["duplicate"] == 2
+
+
+def test_import_file_writes_loadable_config(tmp_path):
+    config_path = tmp_path / "config.json"
+    atomic_write_json(str(config_path), countdown_core.default_config())
+    ics_path = tmp_path / "日历.ics"
+    ics_path.write_bytes(b"\xef\xbb\xbf" + CALENDAR.encode("utf-8"))
+    counts = import_file(str(ics_path), str(config_path), today=date(2025, 3, 4))
+    assert counts["added"] == 1 and counts["recurring"] == 1
+    info, index = countdown_core.load_config(str(config_path))
+    assert "期末考试, 数学; 物理" in index
+    assert index.instant("期末考试, 数学; 物理") == 1748739600
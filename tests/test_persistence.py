@@ -0,0 +1,250 @@
+import json
+import os
+import time
+from datetime import date
+
+import pytest
+
+import countdown_core
+from persistence import JOURNAL_SUFFIX, ConfigStore, apply_op, atomic_write_json, move_aside, replay_journal
+
+
+def write_config(path, countdowns):
+    info = countdown_core.default_config()
+    info["countdowns"] = countdowns
+    atomic_write_json(str(path), info)
+    return info
+
+
+def read_lines(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def crash(store):
+    # 模拟程序在整理日志之前退出：尚未写入的配置丢弃，日志留在磁盘上
+    with store.cond:
+        store.pending = None
+    store.close()
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    return tmp_path / "config.json"
+
+
+def test_journal_append_and_replay(config_path):
+    info = write_config(config_path, [{"name": "期中", "date": "2025/3/1"}])
+    store = ConfigStore(str(config_path), delay=60, journal=True)
+    exam = {"name": "期末", "date": "2025/6/1"}
+    info["countdowns"].append(exam)
+    store.record(info, "add_exam", **exam)
+    info["countdowns"].remove({"name": "期中", "date": "2025/3/1"})
+    store.record(info, "remove_exam", name="期中", date="2025/3/1")
+    crash(store)
+    # 配置文件本身没有重写，修改都在日志里
+    assert countdown_core.read_config(str(config_path))["countdowns"] == [{"name": "期中", "date": "2025/3/1"}]
+    replayed = countdown_core.read_config(str(config_path))
+    assert replay_journal(str(config_path), replayed) == 2
+    assert replayed["countdowns"] == [{"name": "期末", "date": "2025/6/1"}]
+
+
+def test_journal_compacts_after_limit(config_path):
+    info = write_config(config_path, [])
+    store = ConfigStore(str(config_path), delay=0, journal=True, compact_every=3)
+    try:
+        for i in range(3):
+            exam = {"name": f"考试{i}", "date": f"2025/3/{i + 1}"}
+            info["countdowns"].append(exam)
+            store.record(info, "add_exam", **exam)
+        assert store.flush()
+    finally:
+        store.close()
+    assert [exam["name"] for exam in countdown_core.read_config(str(config_path))["countdowns"]] == ["考试0", "考试1", "考试2"]
+    # 整理之后日志只剩下基于新配置文件的第一行
+    lines = read_lines(str(config_path) + JOURNAL_SUFFIX)
+    assert len(lines) == 1
+    assert replay_journal(str(config_path), countdown_core.read_config(str(config_path))) == 0
+
+
+def test_replay_ignores_torn_last_line(config_path):
+    write_config(config_path, [])
+    base = json.dumps({"base": [os.stat(config_path).st_mtime_ns, os.stat(config_path).st_size]})
+    record = json.dumps({"op": "add_exam", "name": "期末", "date": "2025/6/1"}, ensure_ascii=False)
+    with open(str(config_path) + JOURNAL_SUFFIX, "w", encoding="utf-8") as f:
+        f.write(base + "\n" + record + "\n" + record[:10])
+    info = countdown_core.read_config(str(config_path))
+    assert replay_journal(str(config_path), info) == 1
+    assert info["countdowns"] == [{"name": "期末", "date": "2025/6/1"}]
+
+
+def test_replay_ignores_journal_of_replaced_config(config_path):
+    write_config(config_path, [])
+    record = json.dumps({"op": "add_exam", "name": "期末", "date": "2025/6/1"}, ensure_ascii=False)
+    with open(str(config_path) + JOURNAL_SUFFIX, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"base": [1, 2]}) + "\n" + record + "\n")
+    info = countdown_core.read_config(str(config_path))
+    assert replay_journal(str(config_path), info) == 0
+    assert info["countdowns"] == []
+
+
+def test_unknown_op_raises():
+    with pytest.raises(ValueError):
+        apply_op(countdown_core.default_config(), {"op": "rename_everything"})
+
+
+def aside_names(config_path):
+    return sorted(name for name in os.listdir(config_path.parent)
+                  if name.startswith("config.json.broken-") and not name.endswith(JOURNAL_SUFFIX))
+
+
+def test_unparsable_config_is_set_aside(config_path):
+    config_path.write_text('{"name": "倒计时", "countdowns": [', encoding="utf-8")
+    original = config_path.read_bytes()
+    with pytest.raises(countdown_core.ConfigFormatError) as excinfo:
+        countdown_core.load_config(str(config_path))
+    note = countdown_core.fallback_message(str(config_path), excinfo.value)
+    assert not config_path.exists()
+    aside = aside_names(config_path)
+    assert len(aside) == 1 and aside[0] in note
+    assert (config_path.parent / aside[0]).read_bytes() == original
+
+
+def test_missing_field_is_set_aside(config_path):
+    config_path.write_text('{"countdowns": []}', encoding="utf-8")
+    with pytest.raises(countdown_core.ConfigFormatError):
+        countdown_core.load_config(str(config_path))
+
+
+@pytest.mark.parametrize("countdowns, recurring", [
+    ([{"name": "期末", "date": "2025/13/40"}], []),
+    ([{"name": "托福", "date": "2025-06-01", "time": "09:00", "tz": "Nowhere/Nothing"}], []),
+    ([], [{"name": "周测", "start": "2025-03-01", "rule": "FREQ=SECONDLY"}]),
+])
+def test_recoverable_errors_keep_config(config_path, countdowns, recurring):
+    # 日期、时区、重复规则有误时不是 ConfigFormatError，原文件保持不变
+    info = write_config(config_path, countdowns)
+    info["recurring"] = recurring
+    atomic_write_json(str(config_path), info)
+    original = config_path.read_bytes()
+    with pytest.raises(ValueError) as excinfo:
+        loaded, index = countdown_core.load_config(str(config_path))
+        countdown_core.load_recurring(loaded, index, date(2025, 3, 1))
+    assert not isinstance(excinfo.value, countdown_core.ConfigFormatError)
+    note = countdown_core.fallback_message(str(config_path), excinfo.value)
+    assert "保持不变" in note
+    assert config_path.read_bytes() == original
+    assert aside_names(config_path) == []
+
+
+def test_read_error_keeps_config(config_path):
+    write_config(config_path, [])
+    note = countdown_core.fallback_message(str(config_path), PermissionError("文件被占用"))
+    assert config_path.exists() and aside_names(config_path) == []
+    assert "文件被占用" in note
+
+
+def test_set_aside_twice_in_same_second(config_path):
+    contents = []
+    for i in range(3):
+        write_config(config_path, [{"name": f"考试{i}", "date": "2025/6/1"}])
+        contents.append(config_path.read_bytes())
+        move_aside(str(config_path))
+    aside = aside_names(config_path)
+    assert len(aside) == 3
+    assert sorted((config_path.parent / name).read_bytes() for name in aside) == sorted(contents)
+
+
+def test_set_aside_keeps_journal_replayable(config_path):
+    info = write_config(config_path, [])
+    store = ConfigStore(str(config_path), delay=60, journal=True)
+    exam = {"name": "期末", "date": "2025/6/1"}
+    info["countdowns"].append(exam)
+    store.record(info, "add_exam", **exam)
+    crash(store)
+    countdown_core.set_aside_config(str(config_path))
+    aside = str(config_path.parent / aside_names(config_path)[0])
+    recovered = countdown_core.read_config(aside)
+    assert replay_journal(aside, recovered) == 1
+    assert recovered["countdowns"] == [exam]
+
+
+def test_replay_keeps_time_and_zone(config_path):
+    zoned = {"name": "托福", "date": "2025-06-01", "time": "09:00", "tz": "UTC"}
+    info = write_config(config_path, [zoned, {"name": "托福", "date": "2025-06-01"}])
+    store = ConfigStore(str(config_path), delay=60, journal=True)
+    moved = dict(zoned, time="13:30")
+    info["countdowns"][0] = moved
+    store.record(info, "update_exam", old=zoned, exam=moved)
+    del info["countdowns"][0]
+    store.record(info, "remove_exam", exam=moved)
+    crash(store)
+    replayed = countdown_core.read_config(str(config_path))
+    assert replay_journal(str(config_path), replayed) == 2
+    # 删除的是带时间的那一个，同名同日期的另一个条目保留
+    assert replayed["countdowns"] == [{"name": "托福", "date": "2025-06-01"}]
+
+
+def test_legacy_records_match_zoned_entry():
+    info = countdown_core.default_config()
+    info["countdowns"] = [{"name": "托福", "date": "2025-06-01", "tz": "UTC"}]
+    apply_op(info, {"op": "update_exam", "old_name": "托福", "old_date": "2025-06-01", "name": "托福", "date": "2025-06-02"})
+    assert info["countdowns"] == [{"name": "托福", "date": "2025-06-02"}]
+    apply_op(info, {"op": "remove_exam", "name": "托福", "date": "2025-06-02"})
+    assert info["countdowns"] == []
+    with pytest.raises(ValueError):
+        apply_op(info, {"op": "remove_exam", "name": "托福", "date": "2025-06-02"})
+
+
+class FakeWidget:
+    # 只提供 after：回调排队，由测试逐个执行
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+
+    def run(self, timeout=5):
+        deadline = time.monotonic() + timeout
+        while self.callbacks and time.monotonic() < deadline:
+            self.callbacks.pop(0)()
+            time.sleep(0.01)
+
+
+def test_when_saved_reports_after_write(config_path):
+    info = write_config(config_path, [])
+    store = ConfigStore(str(config_path), delay=0)
+    widget = FakeWidget()
+    results = []
+    try:
+        info["countdowns"].append({"name": "期末", "date": "2025/6/1"})
+        store.when_saved(widget, store.save(info), results.append)
+        widget.run()
+    finally:
+        store.close()
+    assert results == [None]
+    assert countdown_core.read_config(str(config_path))["countdowns"] == [{"name": "期末", "date": "2025/6/1"}]
+
+
+def test_when_saved_reports_write_error(tmp_path):
+    store = ConfigStore(str(tmp_path / "missing" / "config.json"), delay=0)
+    widget = FakeWidget()
+    results = []
+    try:
+        store.when_saved(widget, store.save(countdown_core.default_config()), results.append)
+        widget.run()
+    finally:
+        store.close()
+    assert len(results) == 1 and isinstance(results[0], OSError)
+
+
+def test_result_waits_for_write(config_path):
+    info = write_config(config_path, [])
+    store = ConfigStore(str(config_path), delay=60)
+    try:
+        generation = store.save(info, delay=60)
+        assert store.result(generation) == (False, None)
+        assert store.flush()
+        assert store.result(generation) == (True, None)
+    finally:
+        store.close()
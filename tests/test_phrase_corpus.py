@@ -0,0 +1,63 @@
+import os
+import random
+
+from phrase_corpus import INDEX_SUFFIX, EncouragementPicker, PhraseCorpus, ShuffleBag
+
+
+def write_lines(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def test_corpus_skips_blank_lines_and_bom(tmp_path):
+    path = tmp_path / "加油语.txt"
+    path.write_bytes("\ufeff第一句\n\n  \n第二句\r\n第三句".encode("utf-8"))
+    corpus = PhraseCorpus(str(path))
+    try:
+        assert [corpus[i] for i in range(len(corpus))] == ["第一句", "第二句", "第三句"]
+    finally:
+        corpus.close()
+    assert os.path.exists(str(path) + INDEX_SUFFIX)
+
+
+def test_shuffle_bag_visits_every_index_once_per_round():
+    bag = ShuffleBag(37, random.Random(5))
+    for _ in range(3):
+        assert sorted(bag.next() for _ in range(37)) == list(range(37))
+
+
+def test_picker_uses_inline_until_file_is_open(tmp_path):
+    path = tmp_path / "加油语.txt"
+    write_lines(path, [f"文件{i}" for i in range(10)])
+    picker = EncouragementPicker(lambda: ["配置"])
+    picker.set_file(str(path))
+    assert picker.loading is None  # 只记下文件名，不在调用方的线程中打开
+    picker.preload()
+    assert picker.wait(5)
+    assert picker.next().startswith("文件")
+    assert len(picker.upcoming(3)) == 3
+
+
+def test_picker_reopens_rewritten_file(tmp_path):
+    path = tmp_path / "加油语.txt"
+    write_lines(path, ["旧的"] * 5)
+    picker = EncouragementPicker(lambda: ["配置"])
+    picker.set_file(str(path))
+    picker.preload()
+    picker.wait(5)
+    assert picker.next() == "旧的"
+    write_lines(path, ["新的"])
+    os.utime(path, ns=(0, 10 ** 9))
+    # 重新打开期间使用配置中的加油语，不读已经失效的映射
+    assert picker.next() in ("配置", "新的")
+    picker.wait(5)
+    assert picker.next() == "新的"
+
+
+def test_picker_falls_back_when_file_is_missing(tmp_path):
+    picker = EncouragementPicker(lambda: ["配置"])
+    picker.set_file(str(tmp_path / "不存在.txt"))
+    picker.preload()
+    picker.wait(5)
+    assert picker.next() == "配置"
+    assert picker.path is None
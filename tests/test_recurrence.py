@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+from itertools import islice
+
+import pytest
+
+from recurrence import RecurringSchedule, occurrences, parse_rule
+
+
+def first(start, rule, count=5, exdates=(), after=None):
+    return list(islice(occurrences(start, parse_rule(rule), exdates, after), count))
+
+
+def test_parse_rule_rejects_unsupported():
+    with pytest.raises(ValueError):
+        parse_rule("FREQ=HOURLY")
+    with pytest.raises(ValueError):
+        parse_rule("FREQ=DAILY;BYHOUR=9")
+
+
+def test_weekly_byday():
+    assert first(date(2025, 3, 3), "FREQ=WEEKLY;BYDAY=MO,TH", 4) == [
+        date(2025, 3, 3), date(2025, 3, 6), date(2025, 3, 10), date(2025, 3, 13)]
+
+
+def test_weekly_interval_starts_on_start_day():
+    # 2025/3/5 是星期三，同一周的星期一已经过去
+    assert first(date(2025, 3, 5), "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,FR", 3) == [
+        date(2025, 3, 7), date(2025, 3, 17), date(2025, 3, 21)]
+
+
+def test_monthly_nth_weekday():
+    assert first(date(2025, 1, 1), "FREQ=MONTHLY;BYDAY=2MO", 3) == [date(2025, 1, 13), date(2025, 2, 10), date(2025, 3, 10)]
+    assert first(date(2025, 1, 1), "FREQ=MONTHLY;BYDAY=-1FR", 3) == [date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 28)]
+
+
+def test_monthly_skips_short_months():
+    assert first(date(2025, 1, 31), "FREQ=MONTHLY", 3) == [date(2025, 1, 31), date(2025, 3, 31), date(2025, 5, 31)]
+    assert first(date(2025, 1, 1), "FREQ=MONTHLY;BYMONTHDAY=-1", 3) == [date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31)]
+
+
+def test_yearly_leap_day_and_bymonth():
+    assert first(date(2024, 2, 29), "FREQ=YEARLY", 2) == [date(2024, 2, 29), date(2028, 2, 29)]
+    assert first(date(2025, 1, 1), "FREQ=YEARLY;BYMONTH=6,12;BYMONTHDAY=15", 3) == [
+        date(2025, 6, 15), date(2025, 12, 15), date(2026, 6, 15)]
+
+
+def test_count_until_and_exdates():
+    assert first(date(2025, 3, 1), "FREQ=DAILY;COUNT=3", 10) == [date(2025, 3, 1), date(2025, 3, 2), date(2025, 3, 3)]
+    assert first(date(2025, 3, 1), "FREQ=DAILY;UNTIL=20250303T235959Z", 10) == [date(2025, 3, 1), date(2025, 3, 2), date(2025, 3, 3)]
+    # 排除的日期仍然计入 COUNT
+    assert first(date(2025, 3, 1), "FREQ=DAILY;COUNT=3", 10, exdates=[date(2025, 3, 2)]) == [date(2025, 3, 1), date(2025, 3, 3)]
+    assert first(date(2025, 3, 1), "FREQ=DAILY;COUNT=3", 10, after=date(2025, 3, 3)) == [date(2025, 3, 3)]
+
+
+@pytest.mark.parametrize("start, rule", [
+    (date(2000, 1, 31), "FREQ=DAILY;INTERVAL=3"),
+    (date(2000, 1, 5), "FREQ=WEEKLY"),
+    (date(2000, 1, 5), "FREQ=WEEKLY;INTERVAL=3;BYDAY=MO,SU"),
+    (date(2000, 1, 31), "FREQ=MONTHLY;INTERVAL=5"),
+    (date(2000, 1, 1), "FREQ=MONTHLY;INTERVAL=2;BYDAY=-1FR,1MO"),
+    (date(2000, 2, 29), "FREQ=YEARLY"),
+    (date(2000, 1, 1), "FREQ=YEARLY;INTERVAL=3;BYMONTH=2;BYDAY=-1TU"),
+])
+def test_fast_skip_matches_full_expansion(start, rule):
+    # 跳到 after 所在周期的结果必须与从头逐个生成再过滤相同
+    for after in (date(2000, 1, 1), date(2003, 7, 17), date(2024, 2, 29), date(2025, 12, 31)):
+        expected = list(islice((d for d in occurrences(start, parse_rule(rule)) if d >= after), 20))
+        assert first(start, rule, 20, after=after) == expected
+
+
+def test_schedule_advances_past_dates():
+    series = [{"name": "周测", "start": "2025/3/3", "rule": "FREQ=WEEKLY;BYDAY=MO"},
+              {"name": "月考", "start": "2025/3/1", "rule": "FREQ=MONTHLY;COUNT=2"}]
+    schedule = RecurringSchedule(series, date(2025, 3, 4))
+    assert sorted(schedule.entries()) == [("周测", date(2025, 3, 10)), ("月考", date(2025, 4, 1))]
+    changes = schedule.advance(date(2025, 4, 2))
+    assert ("周测", date(2025, 3, 10), date(2025, 3, 17)) in changes
+    assert ("月考", date(2025, 4, 1), None) in changes
+    assert schedule.entries() == [("周测", date(2025, 4, 7))]
+
+
+def test_schedule_keeps_today():
+    schedule = RecurringSchedule([{"name": "周测", "start": "2025/3/3", "rule": "FREQ=WEEKLY"}], date(2025, 3, 10))
+    assert schedule.entries() == [("周测", date(2025, 3, 10))]
+    assert schedule.advance(date(2025, 3, 10)) == []
+    assert schedule.advance(date(2025, 3, 10) + timedelta(days=1))[0][2] == date(2025, 3, 17)
@@ -0,0 +1,130 @@
+from datetime import datetime
+
+import scheduler
+from scheduler import MAX_SLEEP_MS, MIDNIGHT_SLACK_MS, TickScheduler, ms_until_next_midnight
+
+
+class FakeWidget:
+    # 记录 after/after_cancel 调用，回调由测试执行
+    def __init__(self):
+        self.pending = {}
+        self.delays = {}
+        self.cancelled = []
+        self.next_id = 0
+
+    def after(self, delay, callback):
+        self.next_id += 1
+        self.pending[self.next_id] = callback
+        self.delays[self.next_id] = delay
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        self.cancelled.append(after_id)
+        del self.pending[after_id]
+
+    def fire(self):
+        # 执行最早到期的回调
+        after_id = min(self.pending, key=lambda i: (self.delays[i], i))
+        self.pending.pop(after_id)()
+
+
+class FakeMonotonic:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def make(next_delay=lambda: 60_000, callback=None):
+    widget = FakeWidget()
+    calls = []
+    tick = TickScheduler(widget, callback or (lambda: calls.append(1)), next_delay=next_delay)
+    return tick, widget, calls
+
+
+def test_start_arms_once():
+    tick, widget, _ = make()
+    tick.start()
+    tick.start()
+    assert len(widget.pending) == 1
+    assert list(widget.delays.values())[-1] == 60_000
+
+
+def test_repeated_requests_keep_one_pending(monkeypatch):
+    clock = FakeMonotonic()
+    monkeypatch.setattr(scheduler.time, "monotonic", clock)
+    tick, widget, calls = make()
+    tick.start()
+    tick.request()  # 比零点刷新早，替换掉它
+    for _ in range(10):
+        clock.now += 0.001
+        tick.request()
+    assert len(widget.pending) == 1
+    assert tick.merged == 10
+    assert len(widget.cancelled) == 1
+    widget.fire()
+    assert calls == [1]
+    # 触发后重新安排下一次唤醒，仍然只有一个
+    assert len(widget.pending) == 1
+
+
+def test_earlier_request_replaces_later(monkeypatch):
+    clock = FakeMonotonic()
+    monkeypatch.setattr(scheduler.time, "monotonic", clock)
+    tick, widget, _ = make()
+    tick.request(5000)
+    first = tick.pending
+    tick.request(100)
+    assert widget.cancelled == [first]
+    assert list(widget.pending) == [tick.pending]
+    assert widget.delays[tick.pending] == 100
+    # 更晚的请求合并进已有的刷新
+    tick.request(3000)
+    assert widget.cancelled == [first] and len(widget.pending) == 1
+    assert tick.merged == 1
+
+
+def test_request_from_callback_is_not_doubled():
+    holder = {}
+
+    def callback():
+        holder["tick"].request(0)
+    tick, widget, _ = make(callback=callback)
+    holder["tick"] = tick
+    tick.start()
+    widget.fire()
+    assert len(widget.pending) == 1
+    assert widget.delays[tick.pending] == 0
+
+
+def test_sleep_is_capped():
+    tick, widget, _ = make(next_delay=lambda: 24 * 3600 * 1000)
+    tick.start()
+    assert widget.delays[tick.pending] == MAX_SLEEP_MS
+
+
+def test_stop_cancels_pending():
+    tick, widget, _ = make()
+    tick.start()
+    tick.stop()
+    assert widget.pending == {}
+    tick.stop()
+    assert len(widget.cancelled) == 1
+
+
+def test_callback_error_still_rearms():
+    def callback():
+        raise RuntimeError("绘制失败")
+    tick, widget, _ = make(callback=callback)
+    tick.start()
+    try:
+        widget.fire()
+    except RuntimeError:
+        pass
+    assert len(widget.pending) == 1 and tick.ticks == 1
+
+
+def test_ms_until_next_midnight():
+    assert ms_until_next_midnight(datetime(2025, 3, 1, 23, 59, 59)) == 1000 + MIDNIGHT_SLACK_MS
+    assert ms_until_next_midnight(datetime(2025, 3, 1)) == 24 * 3600 * 1000 + MIDNIGHT_SLACK_MS
@@ -0,0 +1,150 @@
+from datetime import date, datetime
+
+import pytest
+
+from countdown_index import CountdownIndex
+from shared_snapshot import HEADER, LABEL_SIZE, MIN_SIZE, Publisher, QueryServer, SnapshotReader, SnapshotWriter
+
+
+def rows_for(names, first=date(2025, 3, 1)):
+    return [(name, first.toordinal() + i, i) for i, name in enumerate(names)]
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return str(tmp_path / "snapshot.bin")
+
+
+def test_write_and_read(snapshot_path):
+    writer = SnapshotWriter(snapshot_path)
+    today = date(2025, 3, 1)
+    writer.write(today.toordinal(), rows_for(["期中", "期末", "期中"]), "距离期中还有 0 天")
+    reader = SnapshotReader(snapshot_path)
+    assert reader.changed()
+    got_today, rows, label, published = reader.read()
+    assert got_today == today
+    assert rows == [("期中", date(2025, 3, 1), 0), ("期末", date(2025, 3, 2), 1), ("期中", date(2025, 3, 3), 2)]
+    assert label == "距离期中还有 0 天"
+    assert published > 0
+    assert not reader.changed()
+    writer.write_label("新标签")
+    assert reader.changed()
+    assert reader.read()[1:3] == (rows, "新标签")
+    reader.close()
+    writer.close()
+
+
+def test_label_truncated_on_character_boundary(snapshot_path):
+    writer = SnapshotWriter(snapshot_path)
+    writer.write(0, [], "考" * LABEL_SIZE)
+    reader = SnapshotReader(snapshot_path)
+    today, rows, label, _ = reader.read()
+    assert today is None and rows == []
+    # 每个汉字 3 个字节，不会留下半个字符
+    assert label == "考" * (LABEL_SIZE // 3)
+    reader.close()
+    writer.close()
+
+
+def test_read_waits_while_write_in_progress(snapshot_path):
+    writer = SnapshotWriter(snapshot_path)
+    writer.write(1, rows_for(["期中"]), "旧")
+    reader = SnapshotReader(snapshot_path)
+    writer.begin()  # seq 变成奇数，写入方还没写完
+    with pytest.raises(TimeoutError):
+        reader.read(attempts=5)
+    writer.commit()
+    assert reader.read()[2] == "旧"
+    reader.close()
+    writer.close()
+
+
+def test_read_retries_when_seq_changes(snapshot_path):
+    writer = SnapshotWriter(snapshot_path)
+    writer.write(1, rows_for(["期中"]), "旧")
+
+    class RacingReader(SnapshotReader):
+        # 第一次读完内容、检查 seq 之前，写入方写了一份新的快照
+        calls = 0
+
+        def current_seq(self):
+            self.calls += 1
+            if self.calls == 2:
+                writer.write(1, rows_for(["期末", "会考"]), "新")
+            return super().current_seq()
+
+    reader = RacingReader(snapshot_path)
+    _, rows, label, _ = reader.read()
+    assert reader.calls > 2
+    assert [row[0] for row in rows] == ["期末", "会考"]
+    assert label == "新"
+    assert reader.seq == writer.seq
+    reader.close()
+    writer.close()
+
+
+def test_reader_remaps_after_growth(snapshot_path):
+    writer = SnapshotWriter(snapshot_path)
+    writer.write(1, [], "")
+    reader = SnapshotReader(snapshot_path)
+    reader.read()
+    names = [f"考试{i:05d}" for i in range(MIN_SIZE // 20)]
+    writer.write(1, rows_for(names), "很多考试")
+    assert len(writer.map) > MIN_SIZE
+    _, rows, label, _ = reader.read()
+    assert len(rows) == len(names) and rows[-1][0] == names[-1]
+    assert len(reader.map) == len(writer.map)
+    reader.close()
+    writer.close()
+
+
+def test_reader_rejects_other_files(snapshot_path):
+    with open(snapshot_path, "wb") as f:
+        f.write(b"\0" * HEADER.size + b"x" * 100)
+    reader = SnapshotReader(snapshot_path)
+    with pytest.raises(ValueError):
+        reader.read()
+    reader.close()
+
+
+def test_reader_rejects_empty_file(snapshot_path):
+    open(snapshot_path, "wb").close()
+    with pytest.raises(ValueError):
+        SnapshotReader(snapshot_path)
+
+
+def test_query_answers():
+    rows = rows_for(["期中", "期末"])
+    server = QueryServer.__new__(QueryServer)  # 只测 answer，不监听端口
+    server.get_state = lambda: ("2025/03/01", rows, "标签")
+    assert server.answer("ping") == {"ok": True}
+    assert server.answer("label") == {"label": "标签"}
+    assert len(server.answer("list")["countdowns"]) == 2
+    assert server.answer("upcoming 1")["countdowns"] == [{"name": "期中", "date": "2025/03/01", "days": 0}]
+    assert server.answer("get 期末")["days"] == 1
+    with pytest.raises(ValueError):
+        server.answer("get 会考")
+    with pytest.raises(ValueError):
+        server.answer("upcoming x")
+    with pytest.raises(ValueError):
+        server.answer("restart")
+
+
+def test_publisher_writes_only_on_change(snapshot_path):
+    index = CountdownIndex([{"name": "期中", "date": "2025/3/10"}, {"name": "期末", "date": "2025/6/1"}])
+    publisher = Publisher(snapshot_path)
+    now = datetime(2025, 3, 1, 8)
+    publisher.publish(index, now, "标签")
+    publisher.publish(index, datetime(2025, 3, 1, 9), "标签")
+    assert publisher.writer.writes == 1
+    publisher.publish(index, datetime(2025, 3, 1, 9), "新标签")
+    assert publisher.writer.writes == 2
+    index.add({"name": "会考", "date": "2025/4/1"})
+    publisher.publish(index, now, "新标签")
+    assert publisher.writer.writes == 3
+    reader = SnapshotReader(snapshot_path)
+    _, rows, label, _ = reader.read()
+    assert [row[0] for row in rows] == ["期中", "会考", "期末"]
+    assert rows[0][2] == index.days_left("期中", now) and label == "新标签"
+    reader.close()
+    publisher.close()
@@ -0,0 +1,51 @@
+import os
+from datetime import date
+
+from signage import export, file_stems, plan
+
+WEEKLY = {"name": "周测", "start": "2025/3/3", "rule": "FREQ=WEEKLY;BYDAY=MO;COUNT=2"}
+
+
+def texts_by_day(jobs):
+    result = {}
+    for relpath, _, text in jobs:
+        folder, filename = relpath.split("/")
+        result.setdefault(folder, {})[filename] = text
+    return result
+
+
+def test_recurring_uses_next_occurrence():
+    # 2025-03-01 是星期六，周测在 3 月 3 日和 3 月 10 日；按白天 8 点的显示计算，当天不算一天
+    jobs = plan([{"name": "期末", "date": "2025/3/12"}], date(2025, 3, 1), 12, ["svg"], [WEEKLY])
+    days = texts_by_day(jobs)
+    assert days["2025-03-01"]["周测.svg"].endswith("还有 1 天")
+    assert days["2025-03-03"]["周测.svg"].endswith("还有 0 天")
+    # 3 月 3 日过去之后换成下一次
+    assert days["2025-03-04"]["周测.svg"].endswith("还有 5 天")
+    assert days["2025-03-10"]["周测.svg"].endswith("还有 0 天")
+    # 系列结束后不再生成
+    assert "周测.svg" not in days["2025-03-11"]
+    assert days["2025-03-12"] == {"期末.svg": days["2025-03-12"]["期末.svg"]}
+
+
+def test_countdown_entry_wins_over_recurring_name():
+    # 与界面相同：同名时先用 countdowns 中的日期
+    jobs = plan([{"name": "周测", "date": "2025/3/5"}], date(2025, 3, 1), 1, ["svg"], [WEEKLY])
+    assert [text for _, _, text in jobs] == ["距离周测还有 3 天"]
+
+
+def test_file_stems_are_unique():
+    stems = file_stems(["A/B", "A_B", "A_B-2", "exam", "EXAM", "期末"])
+    assert stems == {"A/B": "A_B", "A_B": "A_B-2", "A_B-2": "A_B-2-2", "exam": "exam", "EXAM": "EXAM-2", "期末": "期末"}
+
+
+def test_colliding_names_do_not_overwrite(tmp_path):
+    countdowns = [{"name": "物理/化学", "date": "2025/3/5"}, {"name": "物理_化学", "date": "2025/3/9"}]
+    made, skipped = export(countdowns, str(tmp_path), date(2025, 3, 1), jobs=1)
+    assert (made, skipped) == (2, 0)
+    folder = tmp_path / "2025-03-01"
+    assert sorted(os.listdir(folder)) == ["物理_化学-2.svg", "物理_化学.svg"]
+    assert "还有 3 天" in (folder / "物理_化学.svg").read_text(encoding="utf-8")
+    assert "还有 7 天" in (folder / "物理_化学-2.svg").read_text(encoding="utf-8")
+    # 内容没有变化时不重新生成
+    assert export(countdowns, str(tmp_path), date(2025, 3, 1), jobs=1) == (0, 2)
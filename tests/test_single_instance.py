@@ -0,0 +1,123 @@
+import json
+import os
+import threading
+
+import pytest
+
+import single_instance
+from single_instance import INFO_NAME, InstanceServer, acquire, claim, forward, parse_commands
+
+
+class FakeWidget:
+    # 代替 Tk 的 after：记下回调和调用它的线程，由测试在"界面线程"中执行
+    def __init__(self):
+        self.callbacks = []
+        self.threads = set()
+
+    def after(self, delay, callback):
+        self.threads.add(threading.get_ident())
+        self.callbacks.append(callback)
+
+    def run_pending(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+@pytest.fixture
+def server(tmp_path):
+    received = []
+    server = InstanceServer(str(tmp_path / INFO_NAME))
+    server.start(FakeWidget(), received.append)
+    server.received = received
+    yield server
+    server.sock.close()
+
+
+@pytest.fixture(autouse=True)
+def single_mode(monkeypatch):
+    monkeypatch.delenv("DAOJISHI_MULTI_INSTANCE", raising=False)
+    yield
+    single_instance.release()
+
+
+def test_parse_commands():
+    assert parse_commands([]) == [{"show": True}]
+    assert parse_commands(["--select", "期末", "--settings"]) == [{"select": "期末"}, {"settings": True}]
+    assert parse_commands(["--reload", "--unknown"]) == [{"reload": True}]
+    # --select 后面没有名称时忽略
+    assert parse_commands(["--select"]) == [{"show": True}]
+
+
+def test_acquire_is_exclusive(tmp_path):
+    path = str(tmp_path / "daojishi.lock")
+    first = acquire(path)
+    assert first is not None
+    assert acquire(path) is None
+    first.close()
+    second = acquire(path)
+    assert second is not None
+    second.close()
+
+
+def test_forward_delivers_commands(server):
+    info_path = server.info_path
+    with open(info_path, "r", encoding="utf-8") as f:
+        address = json.load(f)
+    assert address["token"] == server.token and address["pid"] == os.getpid()
+    assert forward(info_path, [{"select": "期末"}, {"reload": True}], timeout=1)
+    # 后台线程只放进队列，不调用 Tk；界面线程下一次轮询时才执行
+    assert server.received == []
+    assert server.widget.threads == {threading.get_ident()}
+    server.widget.run_pending()
+    assert server.received == [{"select": "期末"}, {"reload": True}]
+    assert len(server.widget.callbacks) == 1  # 轮询继续
+
+
+def test_poll_continues_after_handler_error(server):
+    def handler(command):
+        raise RuntimeError("界面出错")
+    server.handler = handler
+    assert forward(server.info_path, [{"show": True}], timeout=1)
+    with pytest.raises(RuntimeError):
+        server.widget.run_pending()
+    assert len(server.widget.callbacks) == 1
+
+
+def test_forward_with_wrong_token_is_rejected(server):
+    with open(server.info_path, "r", encoding="utf-8") as f:
+        address = json.load(f)
+    address["token"] = "0" * 32
+    with open(server.info_path, "w", encoding="utf-8") as f:
+        json.dump(address, f)
+    assert not forward(server.info_path, [{"settings": True}], timeout=0.2)
+    server.widget.run_pending()
+    assert server.received == []
+
+
+def test_forward_gives_up_without_server(tmp_path):
+    assert not forward(str(tmp_path / INFO_NAME), [{"show": True}], timeout=0.2)
+
+
+def test_claim_forwards_to_running_instance(tmp_path):
+    first = claim(str(tmp_path), ["daojishi"])
+    assert isinstance(first, InstanceServer)
+    held = single_instance.lock_file  # 第二次 claim 会覆盖这个全局变量，测试里手动保留
+    received = []
+    widget = FakeWidget()
+    first.start(widget, received.append)
+    try:
+        assert claim(str(tmp_path), ["daojishi", "--select", "期中"]) is None
+        widget.run_pending()
+        assert received == [{"select": "期中"}]
+    finally:
+        first.sock.close()
+        held.close()
+
+
+def test_multi_instance_skips_lock(tmp_path, monkeypatch):
+    monkeypatch.setenv("DAOJISHI_MULTI_INSTANCE", "1")
+    server = claim(str(tmp_path), ["daojishi"])
+    server.start(FakeWidget(), print)
+    assert server.sock is None
+    assert os.listdir(tmp_path) == []
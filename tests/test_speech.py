@@ -0,0 +1,174 @@
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from speech import FakeBackend, PowerShellBackend, SpeechBackend, SpeechEngine
+
+# 代替 PowerShell 的子进程：协议相同，"S 长" 朗读 30 秒，"S 崩溃" 不回复直接退出，其余命令立即完成
+FAKE_POWERSHELL = (
+    "import sys, time\n"
+    "for line in sys.stdin.buffer:\n"
+    "    parts = line.decode('utf-8').rstrip('\\n').split('\\t')\n"
+    "    if parts[0] == 'S' and parts[1] == '长':\n"
+    "        time.sleep(30)\n"
+    "    if parts[0] == 'S' and parts[1] == '崩溃':\n"
+    "        sys.exit(1)\n"
+    "    sys.stdout.buffer.write(b'.\\n')\n"
+    "    sys.stdout.buffer.flush()\n"
+)
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("等待超时")
+        time.sleep(0.005)
+
+
+class FailingBackend(FakeBackend):
+    def speak(self, text):
+        if text == "坏":
+            raise RuntimeError("语音设备不可用")
+        super().speak(text)
+
+
+@pytest.fixture
+def fake_powershell(monkeypatch):
+    def start(self):
+        self.process = subprocess.Popen([sys.executable, "-c", FAKE_POWERSHELL], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    monkeypatch.setattr(PowerShellBackend, "start", start)
+    backend = PowerShellBackend()
+    yield backend
+    backend.cancel()
+    backend.close()
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        SpeechBackend()
+
+    class SpeakOnly(SpeechBackend):
+        def speak(self, text):
+            pass
+
+    with pytest.raises(TypeError):
+        SpeakOnly()
+
+
+def test_engine_speaks_in_order():
+    backend = FakeBackend()
+    engine = SpeechEngine(backend)
+    for text in ("一", "二", "三"):
+        engine.say(text)
+    assert engine.wait_idle(5)
+    assert backend.spoken == ["一", "二", "三"]
+    assert engine.stats["spoken"] == 3 and len(engine.latencies) == 3
+    engine.close()
+
+
+def test_same_kind_is_merged_in_queue():
+    backend = FakeBackend(seconds_per_char=0.05)
+    engine = SpeechEngine(backend)
+    engine.say("加油加油加油", None)  # 朗读期间后面的播报都在排队
+    wait_until(lambda: engine.current is not None)
+    for days in (3, 2, 1):
+        engine.say(f"还有 {days} 天", "countdown")
+    assert engine.wait_idle(5)
+    assert backend.spoken == ["加油加油加油", "还有 1 天"]
+    assert engine.stats["merged"] == 2 and engine.stats["preempted"] == 0
+    engine.close()
+
+
+def test_same_kind_preempts_current_sentence():
+    backend = FakeBackend(seconds_per_char=1.0)
+    engine = SpeechEngine(backend)
+    engine.say("距离期中还有 10 天", "countdown")
+    wait_until(lambda: engine.current is not None)
+    started = time.monotonic()
+    engine.say("新", "countdown")
+    assert engine.wait_idle(5)
+    assert time.monotonic() - started < 5
+    assert backend.interrupted == ["距离期中还有 10 天"]
+    assert backend.spoken == ["新"]
+    assert engine.stats["preempted"] == 1
+    engine.close()
+
+
+def test_full_queue_drops_oldest():
+    backend = FakeBackend(seconds_per_char=0.05)
+    engine = SpeechEngine(backend, maxsize=2)
+    engine.say("阻塞阻塞")
+    wait_until(lambda: engine.current is not None)
+    for text in ("一", "二", "三"):
+        engine.say(text)
+    assert engine.wait_idle(5)
+    assert backend.spoken == ["阻塞阻塞", "二", "三"]
+    assert engine.stats["dropped"] == 1
+    engine.close()
+
+
+def test_failure_does_not_stop_worker(capsys):
+    backend = FailingBackend()
+    engine = SpeechEngine(backend)
+    engine.say("坏")
+    engine.say("好")
+    assert engine.wait_idle(5)
+    assert backend.spoken == ["好"]
+    assert engine.stats["failed"] == 1 and engine.stats["spoken"] == 1
+    assert "语音设备不可用" in capsys.readouterr().out
+    engine.close()
+
+
+def test_closed_engine_ignores_new_text():
+    backend = FakeBackend()
+    engine = SpeechEngine(backend)
+    engine.close()
+    engine.say("一")
+    engine.thread.join(5)
+    assert not engine.thread.is_alive()
+    assert backend.spoken == [] and engine.stats["queued"] == 0
+
+
+def test_powershell_cancel_interrupts_sentence(fake_powershell):
+    backend = fake_powershell
+    errors = []
+
+    def speak():
+        try:
+            backend.speak("长")
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=speak)
+    thread.start()
+    wait_until(lambda: backend.playing is not None)
+    first = backend.playing
+    backend.cancel()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert errors == []  # 被打断的句子不算失败
+    assert first.poll() is not None and backend.process is None
+    # 下一句话重新启动进程
+    backend.speak("短")
+    assert backend.process is not None and backend.process is not first
+
+
+def test_powershell_cancel_when_idle_keeps_process(fake_powershell):
+    backend = fake_powershell
+    backend.speak("短")
+    process = backend.process
+    backend.cancel()
+    backend.render("预热", "unused.wav")
+    assert backend.process is process and process.poll() is None
+
+
+def test_powershell_unexpected_exit_is_an_error(fake_powershell):
+    backend = fake_powershell
+    with pytest.raises(RuntimeError):
+        backend.speak("崩溃")
+    assert backend.process is None
+    backend.speak("短")
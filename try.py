@@ -1,88 +1,39 @@
 #pyinstaller --onefile --windowed --clean try.py
+import startup_profile  # 必须最先导入，记录启动起点
 import tkinter as tk
 from tkinter import messagebox
-from datetime import datetime, timedelta
-import subprocess
-import random
-import math
+from datetime import date, datetime, timedelta
 import os
+import sys
 import json
+import countdown_core
+import metrics
+import divisor_sum
+import single_instance
+from countdown_core import advance_recurring, announcement_text, ensure_config, exam_options, keep_selection, load_recurring, read_config, validate_config, warm_texts
+from scheduler import TickScheduler, ms_until_next_change
+from precision import PRECISION_PERIODS, PrecisionClock, format_clock, remaining_seconds
+from render import Renderer, requested_width
+from phrase_corpus import EncouragementPicker
+from countdown_index import CountdownIndex
+from config_watch import ConfigWatcher, reload_config
+from persistence import ConfigStore
 
-config_file_path = "D:/config.json"
-
-def calculate_divisor_sum(n):
-    try:
-        n = int(n)
-        total = 0
-        for i in range(1, int(math.isqrt(n)) + 1):
-            if n % i == 0:
-                if i == n // i:
-                    total += i
-                else:
-                    total += i + n // i
-        return total
-    except:
-        return -1
-    
-# 确保配置文件存在
-if not os.path.exists(config_file_path):
-    default_config = {
-        "name": "倒计时",
-        "countdowns": [
-            {"name": "考试1", "date": "2025/3/1"},
-            {"name": "考试2", "date": "2025/3/2"},
-            {"name": "考试3", "date": "2025/3/3"}
-        ],
-        "encouragements": [
-            "加油1",
-            "加油2",
-            "加油3"
-        ],
-        "start_countdown_index": 0,
-        "password": "1000"
-    }
-    with open(config_file_path, "w", encoding="utf-8") as f:
-        json.dump(default_config, f, ensure_ascii=False, indent=4)
+startup_profile.mark("导入核心模块")
+
+config_file_path = os.environ.get("DAOJISHI_CONFIG", "D:/config.json")
+audio_cache_dir = os.path.join(os.path.dirname(config_file_path), "daojishi_audio_cache")
+metrics_file_path = os.environ.get("DAOJISHI_METRICS_FILE", os.path.join(os.path.dirname(config_file_path), "daojishi_metrics.jsonl"))
+shared_file_path = os.environ.get("DAOJISHI_SHARED_FILE", os.path.join(os.path.dirname(config_file_path), "daojishi_countdowns.shm"))
+# 启动后多久再预热语音缓存（毫秒），避免和启动抢资源
+WARM_DELAY_MS = 5000
 
 def load_config():
-    try:
-        with open(config_file_path, "r", encoding="utf-8") as file:
-            info = json.load(file)
-        
-        # 检查必要字段
-        required_keys = ["name", "countdowns", "encouragements", "start_countdown_index", "password"]
-        for key in required_keys:
-            if key not in info:
-                raise ValueError(f"缺少必要配置项: {key}")
-                
-        # 检查countdowns格式
-        if not isinstance(info["countdowns"], list):
-            raise ValueError("countdowns必须是列表")
-        for exam in info["countdowns"]:
-            if not isinstance(exam, dict) or "name" not in exam or "date" not in exam:
-                raise ValueError("countdowns中的每个考试必须包含name和date字段")
-            datetime.strptime(exam["date"], "%Y/%m/%d")  # 验证日期格式
-            
-        return info
-    except Exception as e:
-        messagebox.showerror("配置文件错误", f"配置文件格式错误: {str(e)}\n将使用默认配置")
-        return {
-            "name": "倒计时",
-            "countdowns": [
-                {"name": "考试1", "date": "2025/3/1"},
-                {"name": "考试2", "date": "2025/3/2"},
-                {"name": "考试3", "date": "2025/3/3"}
-            ],
-            "encouragements": [
-                "加油1",
-                "加油2",
-                "加油3"
-            ],
-            "start_countdown_index": 0,
-            "password": "1000"
-        }
-
-info = load_config()
+    global countdown_index, recurring, config_loaded
+    info, countdown_index, recurring, config_loaded = countdown_core.load_or_default(
+        config_file_path, date.today(), lambda message: messagebox.showerror("配置文件错误", message))
+    return info
+
 
 
 class CountdownApp(tk.Tk):
@@ -95,17 +46,16 @@ class CountdownApp(tk.Tk):
         self.attributes('-topmost', True)
         self.overrideredirect(True)
 
-        screen_width = self.winfo_screenwidth()
+        self.screen_width = self.winfo_screenwidth()
         self.window_height = 60
-        self.geometry(f'+{(screen_width - self.winfo_width()) // 2}+0')
+        self.geometry(f'+{(self.screen_width - self.winfo_width()) // 2}+0')
         self.frame = tk.Frame(self)
         self.frame.pack()
 
         self.selected_exam = tk.StringVar(self)
-        self.exam_options = [exam["name"] for exam in info["countdowns"]] + ["设置"]
-        start_index = max(0, min(info.get("start_countdown_index", 0), len(info["countdowns"])-1))
-        self.selected_exam.set(info["countdowns"][start_index]["name"])
-        self.last_valid_exam = self.selected_exam.get()
+        self.exam_options = exam_options(info, countdown_index)
+        self.last_valid_exam = countdown_core.start_exam(info)
+        self.selected_exam.set(self.last_valid_exam)
         
         self.exam_menu = tk.OptionMenu(self.frame, self.selected_exam, *self.exam_options, command=self.on_exam_change)
         self.exam_menu.pack(side=tk.LEFT, padx=10, pady=10)
@@ -113,42 +63,193 @@ class CountdownApp(tk.Tk):
         self.label = tk.Label(self.frame, text='', font=('Helvetica', 36), bg='white', fg='black')
         self.label.pack(side=tk.LEFT, padx=1, pady=1)
         self.label.bind("<Button-1>", self.play_random_encouragement)
+        # 文字和窗口大小没有变化时，刷新不触碰任何控件
+        self.renderer = Renderer(self, self.label, ("tk", 36))
+
+        # 语音在第一次朗读或启动几秒后才加载
+        self.speech = None
+        # 密码窗口和设置窗口只创建一次，关闭时隐藏
+        self.pw_window = None
+        self.settings_window = None
+        self.speech_backend = None
+        self.warmed_date = None
+
+        # 配置中的 precision_mode 为 seconds 或 tenths 时，最后一天显示时:分:秒
+        self.clock = None
+        self.precise = False
+        self.set_precision(info.get("precision_mode"))
+        self.publisher = None
+        self.picker = EncouragementPicker(lambda: info["encouragements"])
+        self.announcer = None
 
+        # 只保留一个待执行的刷新，下一次唤醒安排在日期变化时
+        self.scheduler = TickScheduler(self, self.update_label, next_delay=self.next_tick_delay)
         self.update_label()
+        self.scheduler.start()
+        self.update()
+        startup_profile.mark("首次绘制")
+
+        # 部署工具推送新的配置文件后自动重新加载，不需要重启
+        self.config_watcher = ConfigWatcher(self, config_file_path, self.apply_config)
+        self.config_watcher.start()
+
+        # 配置在后台原子写入，界面不等待磁盘
+        self.config_store = ConfigStore(config_file_path, on_saved=self.config_watcher.sync)
+        if config_loaded:
+            self.config_store.compact_leftover(info)
+        # 只有用 --metrics 或 DAOJISHI_METRICS 开启时才会挂上
+        self.metrics = metrics.attach(self, metrics_file_path, lambda: self.speech)
+        # 接收再次启动时转发的命令，由界面线程定时取出执行
+        instance.start(self, self.handle_command)
+        self.set_encouragements_file()
+        self.set_sharing()
+        self.set_announcements()
+        self.request_update()  # 让刚启动的共享快照立即发布一次
         self.last_speak_time = datetime.now() - timedelta(seconds=5)
+        startup_profile.mark("后台服务启动")
+
+        self.after(WARM_DELAY_MS, self.warm_speech_cache)
+        within_budget = startup_profile.report()
+        if startup_profile.exit_after_startup:
+            self.destroy()
+            sys.exit(0 if within_budget else 1)
 
+    def load_speech(self):
+        # 常驻语音线程，避免每次朗读都启动一个新的 PowerShell；合成过的句子缓存为音频文件
+        if self.speech is None:
+            from speech import SpeechEngine, make_backend
+            from audio_cache import AudioCache, CachedBackend
+            voice = info.get("voice", "")
+            rate = info.get("rate", 0)
+            self.speech_backend = CachedBackend(make_backend(voice=voice, rate=rate), AudioCache(audio_cache_dir), voice, rate)
+            self.speech = SpeechEngine(self.speech_backend)
+        return self.speech
+
+    @metrics.timed("update_label")
     def update_label(self):
+        start = self.renderer.begin()
+        # 重复考试的日期过去后换成下一次，通常只比较一次堆顶；系列结束时从选项中去掉
+        if advance_recurring(recurring, countdown_index, date.today()):
+            self.refresh_menu()
         label_text = self.get_label_text()
-        self.label.config(text=label_text)
-        self.adjust_window_size(label_text)
-        self.after(1000, self.update_label)
+        drawn = self.renderer.set_text(label_text)
+        drawn = self.adjust_window_size(label_text) or drawn
+        self.renderer.end(start, drawn)
+        if self.publisher is not None:
+            self.publisher.publish(countdown_index, datetime.now(), label_text)
+        if self.speech is not None:
+            self.warm_speech_cache()
+
+    def request_update(self):
+        self.scheduler.request()
 
+    @metrics.timed("get_label_text")
     def get_label_text(self):
-        current_date = datetime.now()
         selected = self.selected_exam.get()
-        if selected == "设置":
-            return ""
-        
-        target_exam = next((exam for exam in info["countdowns"] if exam["name"] == selected), None)
-        if not target_exam:
-            return "无效的考试"
-        
-        target_date = datetime.strptime(target_exam["date"], "%Y/%m/%d")
-        delta = target_date - current_date
-        days = max(delta.days, 0)
-        return f'距离{selected}还有 {days} 天'
+        if self.clock is not None:
+            instant = countdown_index.instant(selected)
+            remaining = remaining_seconds(instant, self.clock.display_time()) if instant is not None else None
+            self.precise = remaining is not None
+            if self.precise:
+                return format_clock(selected, remaining, self.clock.period < 1)
+        return countdown_core.label_text(countdown_index, selected, datetime.now())
+
+    def handle_command(self, command):
+        # 再次启动程序时转发过来的命令（见 single_instance.py）
+        if "select" in command:
+            if command["select"] in countdown_index:
+                self.select_exam(command["select"])
+        elif "settings" in command:
+            self.open_password_check()
+        elif "reload" in command:
+            try:
+                self.apply_config(read_config(config_file_path))
+            except (OSError, ValueError) as e:
+                print(f"配置文件重新加载失败: {str(e)}")
+        self.deiconify()
+        self.lift()
+
+    def select_exam(self, name):
+        self.selected_exam.set(name)
+        self.last_valid_exam = name
+        self.request_update()
+
+    def set_precision(self, mode):
+        period = PRECISION_PERIODS.get(mode)
+        self.clock = PrecisionClock(period) if period else None
+        self.precise = False
+
+    def set_sharing(self):
+        if self.publisher is not None:
+            self.publisher.close()
+        self.publisher = countdown_core.open_publisher(info, shared_file_path)
+
+    def set_encouragements_file(self):
+        path = info.get("encouragements_file")
+        self.picker.set_file(os.path.join(os.path.dirname(config_file_path), path) if path else None)
+        self.picker.preload()
+
+    def set_announcements(self):
+        if self.announcer is not None:
+            self.announcer.stop()
+        self.announcer = countdown_core.start_announcer(self, info, self.announce)
 
-    def speak(self, text):
-        command = f'powershell.exe "Add-Type -AssemblyName System.Speech;' \
-                  f'(New-Object System.Speech.Synthesis.SpeechSynthesizer).Speak(\'{text}\')"'
-        subprocess.Popen(command, shell=True)
+    def next_tick_delay(self):
+        # 最后一天对齐整秒（或十分之一秒）刷新，其余时间只在零点（或带时间的考试天数变化时）刷新
+        if not self.precise:
+            return ms_until_next_change(countdown_index)
+        self.clock.observe(self.scheduler.fired_at)
+        return self.clock.next_delay()
+
+    def apply_config(self, new_info):
+        global recurring, config_loaded
+        # 设置窗口打开时先不重新加载，避免覆盖正在编辑的内容
+        if self.settings_window is not None and self.settings_window.winfo_viewable():
+            return False
+        changes = reload_config(info, countdown_index, recurring, new_info, date.today())
+        if changes is None:
+            return
+        diff, recurring = changes
+        self.config_store.rebase()
+        if diff["order_changed"] or "recurring" in diff["settings"]:
+            self.rebuild_menu()
+        if "precision_mode" in diff["settings"]:
+            self.set_precision(info.get("precision_mode"))
+        if "shared_snapshot" in diff["settings"] or "api_port" in diff["settings"]:
+            self.set_sharing()
+        if "encouragements_file" in diff["settings"]:
+            self.set_encouragements_file()
+        if "announcements" in diff["settings"]:
+            self.set_announcements()
+        divisor_sum.precompute(info["password"])
+        config_loaded = True
+        self.warmed_date = None
+        self.select_exam(keep_selection(info, countdown_index, self.last_valid_exam))
+
+    def warm_speech_cache(self):
+        now = datetime.now()
+        if self.warmed_date == now.date():
+            return
+        self.warmed_date = now.date()
+        self.load_speech()
+        self.speech_backend.warm(warm_texts(countdown_index, self.last_valid_exam, self.picker, now))
+
+    @metrics.timed("speak")
+    def speak(self, text, kind=None):
+        self.load_speech().say(text, kind)
+
+    def announce(self, rule):
+        speech = announcement_text(rule, countdown_index, self.last_valid_exam, self.picker, datetime.now())
+        if speech is not None:
+            self.speak(*speech)
 
     def play_random_encouragement(self, event):
         current_time = datetime.now()
         time_diff = (current_time - self.last_speak_time).total_seconds()
         if time_diff >= 5 and self.selected_exam.get() != "设置":
-            encouragement = random.choice(info["encouragements"])
-            self.speak(encouragement)
+            encouragement = self.picker.next()
+            if encouragement:
+                self.speak(encouragement, "encouragement")
             self.last_speak_time = current_time
 
     def on_exam_change(self, *args):
@@ -159,37 +260,54 @@ class CountdownApp(tk.Tk):
         else:
             self.last_valid_exam = selected
             label_text = self.get_label_text()
-            self.label.config(text=label_text)
+            self.renderer.set_text(label_text)
             self.adjust_window_size(label_text)
-            self.speak(label_text)
+            if self.clock is not None:
+                self.scheduler.start()  # 新选中的考试可能需要换成按秒刷新，或者换回按天
+            # 时:分:秒读出来没有意义，也无法缓存，播报时仍然按天
+            self.speak(label_text if not self.precise else countdown_core.label_text(countdown_index, selected, datetime.now()), "countdown")
 
+    @metrics.timed("adjust_window_size")
     def adjust_window_size(self, label_text):
-        label_width = self.label.winfo_reqwidth()
-        menu_width = self.exam_menu.winfo_reqwidth()
+        # 宽度都来自缓存，窗口大小和位置不变时不会调用 geometry
+        label_width = self.renderer.text_width(label_text)
+        # 选项菜单的宽度随选中的名称变化，同样按文字缓存
+        menu_width = self.renderer.widths.get("menu", self.selected_exam.get(), lambda: requested_width(self.exam_menu))
         total_width = label_width + menu_width + 40
-        self.geometry(f'{total_width}x{self.window_height}+{(self.winfo_screenwidth() - total_width) // 2}+0')
+        return self.renderer.set_geometry(total_width, self.window_height, (self.screen_width - total_width) // 2, 0)
 
     def open_password_check(self):
-        self.pw_window = tk.Toplevel(self)
-        self.pw_window.title("密码验证")
-        self.pw_window.geometry("400x150")
-        
-        tk.Label(self.pw_window, text=f"请输入密码").pack(pady=10)
-        self.answer_entry = tk.Entry(self.pw_window)
-        self.answer_entry.pack(pady=5)
-        
-        btn_frame = tk.Frame(self.pw_window)
-        btn_frame.pack(pady=5)
-        tk.Button(btn_frame, text="提交", command=self.check_password).pack(side=tk.LEFT, padx=10)
-        tk.Button(btn_frame, text="取消", command=self.pw_window.destroy).pack(side=tk.LEFT, padx=10)
+        if self.pw_window is None or not self.pw_window.winfo_exists():
+            self.pw_window = tk.Toplevel(self)
+            self.pw_window.title("密码验证")
+            self.pw_window.geometry("400x150")
+            self.pw_window.protocol("WM_DELETE_WINDOW", self.pw_window.withdraw)
+            
+            tk.Label(self.pw_window, text=f"请输入密码").pack(pady=10)
+            self.answer_entry = tk.Entry(self.pw_window)
+            self.answer_entry.pack(pady=5)
+            
+            btn_frame = tk.Frame(self.pw_window)
+            btn_frame.pack(pady=5)
+            tk.Button(btn_frame, text="提交", command=self.check_password).pack(side=tk.LEFT, padx=10)
+            tk.Button(btn_frame, text="取消", command=self.pw_window.withdraw).pack(side=tk.LEFT, padx=10)
+        self.answer_entry.delete(0, tk.END)
+        self.pw_window.deiconify()
+        self.pw_window.lift()
 
     def check_password(self):
+        if not self.pw_window.winfo_viewable():
+            return
         user_input = self.answer_entry.get()
-        correct_sum = calculate_divisor_sum(info["password"])
+        correct_sum = divisor_sum.lookup(info["password"], timeout=0.05)
+        if correct_sum is None:
+            # 密码刚被修改，后台还没有算完，稍后再检查
+            self.after(100, self.check_password)
+            return
         
         try:
             if int(user_input) == correct_sum:
-                self.pw_window.destroy()
+                self.pw_window.withdraw()
                 self.open_settings()
             else:
                 messagebox.showerror("错误", "不正确")
@@ -198,64 +316,92 @@ class CountdownApp(tk.Tk):
         finally:
             self.answer_entry.delete(0, tk.END)
 
+    @metrics.timed("settings_window")
     def open_settings(self):
-        self.settings_window = tk.Toplevel(self)
-        self.settings_window.title("设置")
-        self.settings_window.geometry("800x600")
+        if self.settings_window is None or not self.settings_window.winfo_exists():
+            self.settings_window = tk.Toplevel(self)
+            self.settings_window.title("设置")
+            self.settings_window.geometry("800x600")
+            self.settings_window.protocol("WM_DELETE_WINDOW", self.settings_window.withdraw)
+            
+            self.text_area = tk.Text(self.settings_window)
+            self.text_area.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+            
+            btn_frame = tk.Frame(self.settings_window)
+            btn_frame.pack(pady=10)
+            tk.Button(btn_frame, text="取消", command=self.settings_window.withdraw).pack(side=tk.LEFT, padx=10)
+            tk.Button(btn_frame, text="更改", command=self.save_settings).pack(side=tk.LEFT, padx=10)
         
+        # 每次打开都重新读取配置文件，窗口隐藏期间文件可能被修改过
         with open(config_file_path, "r", encoding="utf-8") as f:
             self.current_config_content = f.read()
-        
-        self.text_area = tk.Text(self.settings_window)
+        self.text_area.delete("1.0", tk.END)
         self.text_area.insert(tk.END, self.current_config_content)
-        self.text_area.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
-        
-        btn_frame = tk.Frame(self.settings_window)
-        btn_frame.pack(pady=10)
-        tk.Button(btn_frame, text="取消", command=self.settings_window.destroy).pack(side=tk.LEFT, padx=10)
-        tk.Button(btn_frame, text="更改", command=self.save_settings).pack(side=tk.LEFT, padx=10)
+        self.settings_window.deiconify()
+        self.settings_window.lift()
 
     def save_settings(self):
         new_content = self.text_area.get("1.0", tk.END).strip()
         try:
             temp_info = json.loads(new_content)
-            required_keys = ["name", "countdowns", "encouragements", "start_countdown_index", "password"]
-            if not all(key in temp_info for key in required_keys):
-                raise ValueError("缺少必要配置项")
-
-            for exam in temp_info["countdowns"]:
-                datetime.strptime(exam["date"], "%Y/%m/%d")
+            validate_config(temp_info)
+            temp_index = CountdownIndex(temp_info["countdowns"])
+            temp_recurring = load_recurring(temp_info, temp_index, date.today())
+        except Exception as e:
+            messagebox.showerror("配置错误", f"无效的配置内容：{str(e)}")
+            return
 
-            # 保存新的配置文件
-            with open(config_file_path, "w", encoding="utf-8") as f:
-                json.dump(temp_info, f, ensure_ascii=False, indent=4)
+        # 保存新的配置文件；写入在后台进行，写完之后才更新界面，写入失败时保持原来的配置
+        generation = self.config_store.save(temp_info)
+        self.config_store.when_saved(self, generation, lambda error: self.apply_settings(temp_info, temp_index, temp_recurring, error))
 
-            # 更新全局变量
-            global info
-            info = temp_info
+    def apply_settings(self, temp_info, temp_index, temp_recurring, error):
+        if error is not None:
+            messagebox.showerror("保存失败", f"无法写入配置文件：{str(error)}")
+            return
 
-            # 更新界面
-            self.update_config()
+        # 更新全局变量
+        global info, countdown_index, recurring
+        info = temp_info
+        countdown_index = temp_index
+        recurring = temp_recurring
+        divisor_sum.precompute(info["password"])
+        self.set_precision(info.get("precision_mode"))
+        self.set_sharing()
+        self.set_encouragements_file()
+        self.set_announcements()
 
-            self.settings_window.destroy()
-            messagebox.showinfo("成功", "配置已更新")
+        # 更新界面
+        self.update_config()
 
-        except Exception as e:
-            messagebox.showerror("配置错误", f"无效的配置内容：{str(e)}")
+        self.settings_window.withdraw()
+        messagebox.showinfo("成功", "配置已更新")
 
-    def update_config(self):
-        self.exam_options = [exam["name"] for exam in info["countdowns"]] + ["设置"]
+    def rebuild_menu(self):
+        self.exam_options = exam_options(info, countdown_index)
         menu = self.exam_menu["menu"]
         menu.delete(0, "end")
         for option in self.exam_options:
             menu.add_command(label=option, command=tk._setit(self.selected_exam, option))
 
-        start_index = max(0, min(info["start_countdown_index"], len(info["countdowns"])-1))
-        self.selected_exam.set(info["countdowns"][start_index]["name"])
-        self.last_valid_exam = self.selected_exam.get()
-        self.label.config(text=self.get_label_text())
-        self.adjust_window_size(self.get_label_text())
+    def refresh_menu(self):
+        # 重复考试系列结束后去掉它的选项；正在显示它时换回起始考试
+        self.rebuild_menu()
+        self.select_exam(keep_selection(info, countdown_index, self.last_valid_exam))
+
+    def update_config(self):
+        self.rebuild_menu()
+        self.select_exam(countdown_core.start_exam(info))
 
 if __name__ == '__main__':
+    # 已经有程序在运行时，把命令行参数转发给它然后退出，不再创建第二个窗口
+    instance = single_instance.claim(os.path.dirname(os.path.abspath(config_file_path)), sys.argv)
+    if instance is None:
+        sys.exit(0)
+    ensure_config(config_file_path)
+    info = load_config()
+    # 提前在后台算好密码对应的约数和，打开设置时不用等待
+    divisor_sum.precompute(info["password"])
+    startup_profile.mark("读取配置")
     app = CountdownApp()
     app.mainloop()
\ No newline at end of file
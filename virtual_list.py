@@ -0,0 +1,132 @@
+import tkinter as tk
+import customtkinter as ctk
+
+# 虚拟列表：只为可见的行创建控件，滚动时复用这些行显示不同的条目，
+# 条目再多，打开窗口的耗时和占用的内存也只和可见行数有关。
+
+ROW_HEIGHT = 40
+FILTER_DELAY_MS = 150
+
+
+class VirtualList(ctk.CTkFrame):
+    """get_items() 返回全部条目；make_row(parent) 创建一行控件，
+    fill_row(row, item) 把条目显示到这一行上，match(item, query) 用于搜索过滤。"""
+
+    def __init__(self, master, get_items, make_row, fill_row, match, row_height=ROW_HEIGHT, **kwargs):
+        super().__init__(master, **kwargs)
+        self.get_items = get_items
+        self.make_row = make_row
+        self.fill_row = fill_row
+        self.match = match
+        self.row_height = int(row_height * ctk.ScalingTracker.get_widget_scaling(self))
+        self.rows = []
+        self.view = get_items()
+        self.query = ""
+        self.offset = 0
+        self.filter_job = None
+
+        self.search_entry = ctk.CTkEntry(self, placeholder_text="搜索")
+        self.search_entry.pack(fill=tk.X, padx=5, pady=(5, 0))
+        self.search_entry.bind("<KeyRelease>", self.on_search)
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y, padx=(0, 5), pady=5)
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.body.bind("<Configure>", self.on_resize)
+
+        # 滚轮事件会冒泡到所在窗口，在窗口上绑定一次即可覆盖所有复用的行
+        toplevel = self.winfo_toplevel()
+        toplevel.bind("<MouseWheel>", self.on_wheel, add="+")
+        toplevel.bind("<Button-4>", self.on_wheel, add="+")
+        toplevel.bind("<Button-5>", self.on_wheel, add="+")
+
+    def visible_count(self):
+        return max(1, self.body.winfo_height() // self.row_height)
+
+    def on_resize(self, event=None):
+        # 只在窗口变高时补充新的行，已有的行一直复用
+        needed = self.visible_count()
+        while len(self.rows) < needed:
+            row = self.make_row(self.body)
+            self.rows.append(row)
+        self.render()
+
+    def render(self):
+        count = self.visible_count()
+        self.offset = max(0, min(self.offset, len(self.view) - count))
+        for i, row in enumerate(self.rows):
+            index = self.offset + i
+            if i < count and index < len(self.view):
+                self.fill_row(row, self.view[index])
+                row.place(x=0, y=i * self.row_height, relwidth=1, height=self.row_height)
+            else:
+                row.place_forget()
+        if self.view:
+            self.scrollbar.set(self.offset / len(self.view), min(1.0, (self.offset + count) / len(self.view)))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, len(self.view) - self.visible_count()))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def on_wheel(self, event):
+        # 只处理鼠标下面是本列表或其子控件的情况；按路径前缀比较时要带上 "."，
+        # 否则 .!virtuallist 也会匹配到相邻的 .!virtuallist2
+        widget = self.winfo_containing(event.x_root, event.y_root)
+        if widget is None or (widget != self and not str(widget).startswith(str(self) + ".")):
+            return
+        if event.num == 4:
+            step = -3
+        elif event.num == 5:
+            step = 3
+        else:
+            step = -int(event.delta / 120) * 3
+        self.scroll_to(self.offset + step)
+
+    def on_scroll(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(value) * len(self.view)))
+        elif unit == "pages":
+            self.scroll_to(self.offset + int(value) * self.visible_count())
+        else:
+            self.scroll_to(self.offset + int(value))
+
+    def on_search(self, *args):
+        if self.filter_job is not None:
+            self.after_cancel(self.filter_job)
+        self.filter_job = self.after(FILTER_DELAY_MS, self.apply_filter)
+
+    def apply_filter(self):
+        self.filter_job = None
+        query = self.search_entry.get().strip()
+        if query == self.query:
+            return
+        # 在原有搜索词后面继续输入时只需要在当前结果里继续筛选
+        source = self.view if self.query and query.startswith(self.query) else self.get_items()
+        self.query = query
+        self.view = [item for item in source if self.match(item, query)] if query else source
+        self.offset = 0
+        self.render()
+
+    def reset(self):
+        # 窗口重新打开时调用：清空搜索，回到第一行
+        if self.filter_job is not None:
+            self.after_cancel(self.filter_job)
+            self.filter_job = None
+        self.search_entry.delete(0, tk.END)
+        self.query = ""
+        self.view = self.get_items()
+        self.offset = 0
+        self.render()
+
+    def refresh(self, scroll_to_end=False):
+        # 条目增删之后调用
+        items = self.get_items()
+        self.view = [item for item in items if self.match(item, self.query)] if self.query else items
+        if scroll_to_end:
+            self.offset = len(self.view)
+        self.render()